@@ -0,0 +1,81 @@
+import hashlib
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict
+
+from fastapi import Request, Response
+
+from src.infrastructure.cache.collection_versions import collection_versions
+
+# Validators also roll over this often, bounding how long a client can keep
+# data changed behind the API's back (CLI jobs, other processes).
+ETAG_MAX_AGE = int(os.getenv("ETAG_MAX_AGE", "600"))
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: datetime
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Cache, but revalidate every time.
+            "Cache-Control": "no-cache",
+        }
+
+
+def validators(request: Request, *collections: str) -> Validators:
+    """
+    Validators for a read of `collections`: the ETag covers their versions
+    and the request's query and Accept header, so each page and format gets
+    its own tag.
+    """
+    parts = [collection_versions.boot, str(int(time.time() // ETAG_MAX_AGE) if ETAG_MAX_AGE else 0)]
+    parts += [f"{name}:{collection_versions.version(name)}" for name in collections]
+    parts += [request.url.path, str(request.query_params), request.headers.get("accept", "")]
+    digest = hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+    last_modified = max(collection_versions.modified_at(name) for name in collections)
+    return Validators(etag=f'W/"{digest}"', last_modified=last_modified)
+
+
+def body_headers(request: Request, seen: Validators, *collections: str) -> Dict[str, str]:
+    """
+    Headers for a body built after `seen` was taken. If a write landed while
+    the body was being built, it is unknown which version the body shows,
+    so it goes out without ETag and Last-Modified rather than under a tag
+    it may not match.
+    """
+    if validators(request, *collections).etag == seen.etag:
+        return seen.headers()
+    return {"Cache-Control": "no-cache"}
+
+
+def not_modified(request: Request, current: Validators) -> bool:
+    """RFC 9110: If-None-Match wins; If-Modified-Since is used only without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return current.etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return current.last_modified <= since
+    return False
+
+
+def not_modified_response(current: Validators) -> Response:
+    return Response(status_code=304, headers=current.headers())
@@ -9,6 +9,7 @@ from src.application.use_cases.login import LoginUseCase
 from src.application.use_cases.register import RegisterUseCase 
 from src.application.dto.auth_dto import LoginDTO
 from src.domain.interfaces.repositories.user_repository import UserRepository
+from src.infrastructure.security.password_hasher import PasswordHasherBusyError
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -22,6 +23,8 @@ async def login(payload: LoginRequest, use_case: LoginUseCase = Depends(get_logi
         dto = LoginDTO(username=payload.username, password=payload.password)
         result = await use_case.execute(dto)
         return result
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=401, detail=str(e))
     
@@ -1,4 +1,6 @@
-from fastapi import APIRouter , Depends
+from fastapi import APIRouter , Depends, Request, Response
+
+from src.api.conditional import not_modified, not_modified_response, validators
 
 from src.api.schemas.category_schema import CategoryResponse, CreateCategoryRequest
 from src.application.use_cases.create_category import CreateCategoryUseCase
@@ -16,7 +18,12 @@ async def create_category(request: CreateCategoryRequest, current_user: str = De
     return await use_case.execute(request)
 
 @router.get("/all", response_model=list[CategoryResponse])
-async def get_categories():
+async def get_categories(request: Request, response: Response):
+    current = validators(request, "categories")
+    if not_modified(request, current):
+        return not_modified_response(current)
+
     category_repo = MongoCategoryRepository()
     use_case = ListCategoriesUseCase(category_repo)
+    response.headers.update(current.headers())
     return await use_case.execute()
\ No newline at end of file
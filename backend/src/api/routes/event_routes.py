@@ -0,0 +1,126 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from src.domain.entities.geo_location import BoundingBox
+from src.infrastructure.events.event_bus import TOPICS, SlowConsumerError, Subscription, event_bus
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+SSE_MEDIA_TYPE = "text/event-stream"
+# Idle connections get a comment line this often so proxies keep them open
+# and closed clients are noticed.
+HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+MAX_POST_IDS = 100
+# Close code for a client dropped for falling behind (RFC 6455 "try again later").
+WS_TRY_AGAIN_LATER = 1013
+
+
+def _subscribe(topics: Optional[str], bbox: Optional[str], post_id: List[str], last_event_id: Optional[str]) -> Subscription:
+    """Validates the filters and registers the subscription; raises ValueError."""
+    wanted = {t.strip() for t in topics.split(",") if t.strip()} if topics else set(TOPICS)
+    if not wanted <= TOPICS:
+        raise ValueError(f"topics must be a subset of {', '.join(sorted(TOPICS))}")
+    if len(post_id) > MAX_POST_IDS:
+        raise ValueError(f"At most {MAX_POST_IDS} post_id filters")
+    if last_event_id is not None and not last_event_id.isdigit():
+        raise ValueError("Invalid Last-Event-ID")
+
+    return event_bus.subscribe(
+        topics=wanted,
+        bbox=BoundingBox.parse(bbox) if bbox else None,
+        post_ids=set(post_id),
+        last_event_id=int(last_event_id) if last_event_id is not None else None,
+    )
+
+
+async def sse_events(sub: Subscription) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                event = await sub.next(HEARTBEAT_SECONDS)
+            except SlowConsumerError:
+                # The browser reconnects with Last-Event-ID and is replayed.
+                return
+            if event is None:
+                yield ": ping\n\n"
+                continue
+            data = json.dumps(event.data, ensure_ascii=False, default=str)
+            yield f"id: {event.id}\nevent: {event.name}\ndata: {data}\n\n"
+    finally:
+        event_bus.unsubscribe(sub)
+
+
+@router.get("")
+async def stream_events(
+    topics: Optional[str] = Query(None, description="comma separated: posts, comments, reports"),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    post_id: List[str] = Query([]),
+    last_event_id: Optional[str] = Header(None),
+):
+    """
+    Server-sent events for new, edited and deleted posts, comments and
+    reports, optionally limited to a map viewport (`bbox`) or to given
+    posts (`post_id`, repeatable). Reconnecting with Last-Event-ID replays
+    what was missed; an event named `reset` means too much was missed and
+    the client should refetch.
+    """
+    try:
+        sub = _subscribe(topics, bbox, post_id, last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        sse_events(sub),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    topics: Optional[str] = None,
+    bbox: Optional[str] = None,
+    post_id: List[str] = Query([]),
+    last_event_id: Optional[str] = None,
+):
+    """Same feed as GET /events, one JSON message {id, event, data} per event."""
+    try:
+        sub = _subscribe(topics, bbox, post_id, last_event_id)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    try:
+        await websocket.accept()
+        sender = asyncio.create_task(_send_events(websocket, sub))
+        receiver = asyncio.create_task(_wait_for_close(websocket))
+        done, pending = await asyncio.wait({sender, receiver}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if isinstance(task.exception(), SlowConsumerError):
+                await websocket.close(code=WS_TRY_AGAIN_LATER, reason="Too slow, reconnect with last_event_id")
+    finally:
+        event_bus.unsubscribe(sub)
+
+
+async def _send_events(websocket: WebSocket, sub: Subscription) -> None:
+    while True:
+        event = await sub.next(HEARTBEAT_SECONDS)
+        await websocket.send_text(event.to_json() if event else '{"event": "ping"}')
+
+
+async def _wait_for_close(websocket: WebSocket) -> None:
+    # Client messages are not used; reading them is how a close is noticed.
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from src.infrastructure.database.models.post_document import PostDocument
 from src.infrastructure.database.models.comment_document import CommentDocument
-from src.infrastructure.database.models.report_document import ReportDocument
+from src.infrastructure.map.tile_cache import tile_cache
+from src.infrastructure.repositories.mongo_post_match_repository import MongoPostMatchRepository
+from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.infrastructure.repositories.mongo_comment_repository import CommentRepository, InvalidCommentError
+from src.infrastructure.repositories.mongo_report_repository import DuplicateReportError, ReportRepository
+from src.infrastructure.repositories.pagination import InvalidCursorError
 from src.infrastructure.security.auth_handler import AuthHandler
 from pydantic import BaseModel
 from typing import Optional
@@ -9,6 +14,10 @@ from beanie import PydanticObjectId
 
 router = APIRouter(prefix="/interact", tags=["Interactions"])
 
+REPORT_DELETE_THRESHOLD = 5
+MAX_THREADS_PAGE = 100
+MAX_REPLIES_PAGE = 100
+
 class CommentRequest(BaseModel):
     post_id: str
     content: str
@@ -20,17 +29,50 @@ async def get_comments(post_id: str):
         CommentDocument.post_id == post_id
     ).sort("+created_at").to_list()
 
-    return [
-        {
-            "id": str(c.id),
-            "post_id": c.post_id,
-            "publisher_username": c.publisher_username,
-            "content": c.content,
-            "parent_id": c.parent_id,
-            "reports_count": c.reports_count,
-            "created_at": c.created_at.isoformat(),
-        } for c in comments
-    ]
+    return [_comment_to_dict(c) for c in comments]
+
+@router.get("/comments/{post_id}/threads")
+async def get_comment_threads(
+    post_id: str,
+    limit: int = Query(20, ge=1, le=MAX_THREADS_PAGE),
+    replies: int = Query(3, ge=0, le=MAX_REPLIES_PAGE),
+    cursor: Optional[str] = None,
+):
+    """
+    A page of top-level comments, each with its first `replies` replies in
+    depth-first order. Pass `next_cursor` back as `cursor` for the next page
+    and a thread's `replies_cursor` to /replies/{root_id} for the rest of it.
+    """
+    try:
+        threads, next_cursor = await CommentRepository().get_threads(post_id, limit, replies, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "threads": [
+            {
+                **_comment_to_dict(t.comment),
+                "replies": [_comment_to_dict(r) for r in t.replies],
+                "replies_cursor": t.replies_cursor,
+            }
+            for t in threads
+        ],
+        "next_cursor": next_cursor,
+    }
+
+@router.get("/comments/{post_id}/replies/{root_id}")
+async def get_comment_replies(
+    post_id: str,
+    root_id: str,
+    limit: int = Query(20, ge=1, le=MAX_REPLIES_PAGE),
+    cursor: Optional[str] = None,
+):
+    try:
+        replies, next_cursor = await CommentRepository().get_replies(post_id, root_id, limit, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"replies": [_comment_to_dict(r) for r in replies], "next_cursor": next_cursor}
 
 @router.post("/comment")
 async def add_comment(req: CommentRequest, current_user: str = Depends(AuthHandler.get_current_user)):
@@ -43,15 +85,31 @@ async def add_comment(req: CommentRequest, current_user: str = Depends(AuthHandl
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    comment = CommentDocument(
-        post_id=req.post_id,
-        publisher_username=current_user, 
-        content=req.content,
-        parent_id=req.parent_id,
-    )
-    await comment.insert()
+    try:
+        comment = await CommentRepository().add_comment(
+            post_id=req.post_id,
+            publisher_username=current_user,
+            content=req.content,
+            parent_id=req.parent_id,
+        )
+    except InvalidCommentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     return {"id": str(comment.id), "status": "success"}
 
+def _comment_to_dict(c: CommentDocument) -> dict:
+    return {
+        "id": str(c.id),
+        "post_id": c.post_id,
+        "publisher_username": c.publisher_username,
+        "content": c.content,
+        "parent_id": c.parent_id,
+        "root_id": c.root_id,
+        "depth": c.depth,
+        "reports_count": c.reports_count,
+        "created_at": c.created_at.isoformat(),
+    }
+
 @router.post("/report/{target_type}/{target_id}")
 async def report_content(target_type: str, target_id: str, current_user: str = Depends(AuthHandler.get_current_user)):
     try:
@@ -59,29 +117,31 @@ async def report_content(target_type: str, target_id: str, current_user: str = D
     except:
         raise HTTPException(status_code=400, detail="Invalid ID")
 
-    if target_type == "post":
-        doc = await PostDocument.get(obj_id)
-    elif target_type == "comment":
-        doc = await CommentDocument.get(obj_id)
-    else:
+    if target_type not in ReportRepository.TARGETS:
         raise HTTPException(status_code=400, detail="Invalid type")
 
-    if not doc:
+    try:
+        target = await ReportRepository().add_report(target_type, obj_id, current_user)
+    except DuplicateReportError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if target is None:
         raise HTTPException(status_code=404, detail="Not found")
 
-    report = ReportDocument(
-        reporter_username=current_user, 
-        target_id=obj_id,
-        target_type=target_type,
-        reason="Report",
-    )
-    await report.insert()
-
-    doc.reports_count = getattr(doc, 'reports_count', 0) + 1
-    
-    if doc.reports_count >= 5:
-        await doc.delete()
-        return {"deleted": True, "reports_count": doc.reports_count}
-
-    await doc.save()
-    return {"deleted": False, "reports_count": doc.reports_count}
\ No newline at end of file
+    reports_count = target["reports_count"]
+
+    # Map tiles carry reports_count and must drop deleted posts.
+    if target_type == "post":
+        tile_cache.invalidate_location(target.get("location"))
+
+    # The count comes from the atomic increment, so exactly one request sees
+    # each value; deleting is idempotent if a few race past the threshold.
+    if reports_count >= REPORT_DELETE_THRESHOLD:
+        if target_type == "post":
+            await MongoPostRepository().delete(target_id)
+            await MongoPostMatchRepository().delete_for(target_id)
+        else:
+            await CommentRepository().delete(target_id)
+        return {"deleted": True, "reports_count": reports_count}
+
+    return {"deleted": False, "reports_count": reports_count}
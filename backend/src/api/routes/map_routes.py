@@ -1,45 +1,182 @@
-from fastapi import APIRouter
-from typing import List
+import json
 
-from src.api.schemas.map_schema import MapItemResponse, MapLocationSchema
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+
+from src.api.conditional import not_modified, not_modified_response, validators
+from src.api.streaming import stream_json, wants_ndjson
+from src.api.schemas.map_schema import MapClusterResponse, MapClustersResponse, MapItemResponse, MapLocationSchema
+from src.application.dto.map_item_dto import MapItemDTO
+from src.application.use_cases.get_map_clusters import GetMapClustersUseCase
 from src.application.use_cases.get_map_items import GetMapItemsUseCase
+from src.application.use_cases.get_map_tile import GetMapTileUseCase
+from src.domain.entities.geo_location import BoundingBox
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.map.tile_cache import MAX_TILE_ZOOM
+from src.infrastructure.map.vector_tile import MVT_MEDIA_TYPE
 from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
 
 router = APIRouter(prefix="/lostAndFoundItems", tags=["Map"])
 
+MAX_NEAR_RESULTS = 500
+SNAPSHOT_VERSION_HEADER = "X-Map-Snapshot-Version"
+
 
 @router.get("", response_model=List[MapItemResponse])
-async def get_map_items():
+async def get_map_items(
+    request: Request,
+    response: Response,
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_m: Optional[float] = Query(None, gt=0),
+    limit: int = Query(50, ge=1, le=MAX_NEAR_RESULTS),
+    stream: bool = False,
+):
     """
-    Returns all posts formatted for the map view.
+    Returns posts formatted for the map view.
     Frontend (useMapItems.ts) fetches from this endpoint.
+
+    - no parameters: every post
+    - bbox: only posts inside the viewport
+    - lat, lng, radius_m: the `limit` nearest posts within the radius,
+      closest first, each with `distance_m`
+    - stream=true or Accept: application/x-ndjson: the plain/bbox result
+      is streamed from the cursor instead of built in memory
+
+    Every mode answers 304 without any work while If-None-Match matches.
     """
+    near = (lat, lng, radius_m)
+    if any(v is not None for v in near) and not all(v is not None for v in near):
+        raise HTTPException(status_code=400, detail="lat, lng and radius_m must be given together")
+    if bbox and radius_m is not None:
+        raise HTTPException(status_code=400, detail="Use either bbox or lat/lng/radius_m, not both")
+    box = _parse_bbox(bbox)
+
+    current = validators(request, "posts", "categories")
+    if not_modified(request, current):
+        return not_modified_response(current)
+
     post_repo = MongoPostRepository()
     use_case = GetMapItemsUseCase(post_repo)
-    items = await use_case.execute()
-
-    result = []
-    for item in items:
-        location = None
-        if item.location:
-            location = MapLocationSchema(lat=item.location.lat, lng=item.location.lng)
-
-        result.append(
-            MapItemResponse(
-                id=item.id,
-                itemName=item.itemName,
-                status=item.status,
-                type=item.type,
-                title=item.title,
-                category_key=item.category_key,
-                tag=item.tag,
-                description=item.description,
-                publisher_username=item.publisher_username,
-                image_url=item.image_url,
-                reports_count=item.reports_count,
-                created_at=item.created_at,
-                location=location,
+
+    if radius_m is not None:
+        items = await use_case.execute_near(lat, lng, radius_m, limit)
+        response.headers.update(current.headers())
+        return [_to_response(item) for item in items]
+
+    if stream or wants_ndjson(request):
+        rows = (json.dumps(row, ensure_ascii=False) async for row in use_case.stream_rows(bbox=box))
+        streamed = stream_json(rows, ndjson=wants_ndjson(request))
+        streamed.headers.update(current.headers())
+        return streamed
+
+    # The body is pre-serialized from the map snapshot; returning a Response
+    # skips re-validating every item through the response model.
+    body = await use_case.execute_json(bbox=box)
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={SNAPSHOT_VERSION_HEADER: str(map_snapshot.version), **current.headers()},
+    )
+
+
+@router.get("/snapshot")
+async def get_map_snapshot_status():
+    """Size, version and age of the in-memory map snapshot, for monitoring."""
+    age = map_snapshot.age()
+    return {
+        "loaded": map_snapshot.loaded,
+        "items": len(map_snapshot),
+        "version": map_snapshot.version,
+        "age_seconds": round(age, 1) if age is not None else None,
+        "updated_at": map_snapshot.updated_at,
+    }
+
+
+@router.get("/clusters", response_model=MapClustersResponse)
+async def get_map_clusters(
+    zoom: int = Query(..., ge=0, le=22),
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+):
+    """
+    Returns grid clusters (count, centroid, lost/found split, dominant
+    category) for the viewport, or individual items once zoomed in close.
+    """
+    post_repo = MongoPostRepository()
+    use_case = GetMapClustersUseCase(post_repo)
+    result = await use_case.execute(zoom, bbox=_parse_bbox(bbox))
+
+    return MapClustersResponse(
+        zoom=result.zoom,
+        clustered=result.clustered,
+        clusters=[
+            MapClusterResponse(
+                id=c.id,
+                count=c.count,
+                centroid=MapLocationSchema(lat=c.centroid.lat, lng=c.centroid.lng),
+                lost_count=c.lost_count,
+                found_count=c.found_count,
+                dominant_category_key=c.dominant_category_key,
             )
-        )
+            for c in result.clusters
+        ],
+        items=[_to_response(item) for item in result.items],
+    )
+
+
+@router.get("/tiles/{z}/{x}/{y}.mvt", response_class=Response)
+async def get_map_tile(z: int, x: int, y: int):
+    """
+    Returns one Mapbox Vector Tile with a "posts" point layer
+    (id, type, category_key, reports_count).
+    """
+    if not (0 <= z <= MAX_TILE_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile not found")
+
+    post_repo = MongoPostRepository()
+    use_case = GetMapTileUseCase(post_repo)
+    tile = await use_case.execute(z, x, y)
+
+    return Response(
+        content=tile,
+        media_type=MVT_MEDIA_TYPE,
+        headers={"Cache-Control": "public, max-age=60"},
+    )
+
+
+def _parse_bbox(bbox: Optional[str]) -> Optional[BoundingBox]:
+    if not bbox:
+        return None
+    try:
+        return BoundingBox.parse(bbox)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _to_response(item: MapItemDTO) -> MapItemResponse:
+    location = None
+    if item.location:
+        location = MapLocationSchema(lat=item.location.lat, lng=item.location.lng)
 
-    return result
\ No newline at end of file
+    return MapItemResponse(
+        id=item.id,
+        itemName=item.itemName,
+        status=item.status,
+        type=item.type,
+        title=item.title,
+        category_key=item.category_key,
+        tag=item.tag,
+        description=item.description,
+        publisher_username=item.publisher_username,
+        image_url=item.image_url,
+        reports_count=item.reports_count,
+        created_at=item.created_at,
+        location=location,
+        distance_m=item.distance_m,
+        comments_count=item.comments_count,
+        last_activity_at=item.last_activity_at,
+        thumbnails=item.thumbnails,
+        title_fa=item.title_fa,
+        color_code=item.color_code,
+    )
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from src.infrastructure.media.image_store import image_store
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+# Stored files are named by their content hash and never change.
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+
+@router.get("/{file_path:path}", include_in_schema=False)
+async def get_media(file_path: str):
+    path = image_store.resolve(file_path)
+    if path is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(path, headers={"Cache-Control": IMMUTABLE_CACHE})
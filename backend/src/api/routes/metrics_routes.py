@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+from src.infrastructure.cache.single_flight import single_flight
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/coalescing")
+async def get_coalescing_stats():
+    """
+    Per query key: how many times it ran (`flights`), how many requests
+    asked for it (`callers`) and how many of those were served by another
+    request's call (`merged`). Most merged first.
+    """
+    return single_flight.stats()
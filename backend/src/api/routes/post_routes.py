@@ -1,5 +1,17 @@
-from fastapi import APIRouter, Depends
-from src.api.schemas.post_schema import PostResponse, CreatePostRequest, UpdatePostRequest
+import os
+from dataclasses import asdict
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+
+from beanie import PydanticObjectId
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter, ValidationError
+from src.api.schemas.post_schema import (
+    BulkCreateResponse, BulkPostRequest, PostMatchResponse, PostResponse, CreatePostRequest, SuggestionResponse, UpdatePostRequest,
+)
+from src.api.conditional import body_headers, not_modified, not_modified_response, validators
+from src.api.streaming import InvalidBodyError, read_json_items, stream_json, wants_ndjson
+from src.application.use_cases.bulk_create_posts import BulkCreatePostsUseCase
 from src.application.use_cases.create_post import CreatePostUseCase
 from src.application.use_cases.list_posts import ListPostsUseCase
 from src.application.use_cases.get_posts_by_publisher import GetPostsByPublisherUseCase
@@ -8,57 +20,308 @@ from src.application.use_cases.update_post import UpdatePostUseCase
 from src.application.use_cases.delete_post import DeletePostUseCase
 from src.application.use_cases.search_posts import SearchPostsUseCase
 from src.application.use_cases.get_posts_by_tag import GetPostsByTagUseCase
-from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.application.use_cases.suggest_posts import SuggestPostsUseCase
+from src.application.use_cases.query_posts import QueryPostsUseCase
+from src.application.use_cases.get_post_matches import GetPostMatchesUseCase
+from src.application.use_cases.upload_post_image import UploadPostImageUseCase
+from src.application.dto.post_dto import BulkItemResultDTO, PostDTO, PostPageDTO
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.entities.post import PostQuery
+from src.infrastructure.media.image_store import ImageTooLargeError, InvalidImageError, image_store
+from src.infrastructure.repositories.mongo_post_match_repository import MongoPostMatchRepository
+from src.infrastructure.repositories.mongo_post_repository import DuplicatePostError, InvalidQueryError, MongoPostRepository
+from src.infrastructure.repositories.pagination import InvalidCursorError
 from src.infrastructure.security.auth_handler import AuthHandler
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
+DEFAULT_PAGE_SIZE = int(os.getenv("POSTS_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = int(os.getenv("POSTS_MAX_PAGE_SIZE", "200"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_SUGGESTIONS = 20
+BULK_CHUNK_SIZE = int(os.getenv("POSTS_BULK_CHUNK_SIZE", "1000"))
+BULK_MAX_ITEMS = int(os.getenv("POSTS_BULK_MAX_ITEMS", "100000"))
+POST_LIST = TypeAdapter(List[PostResponse])
+
+
+class PageParams:
+    """
+    Paging is opt-in: without `limit` or `cursor` the whole list comes back
+    as before, since existing clients never follow X-Next-Cursor. A cursor
+    alone continues with pages of DEFAULT_PAGE_SIZE.
+    """
+
+    def __init__(
+        self,
+        limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+    ):
+        self.limit = DEFAULT_PAGE_SIZE if limit is None and cursor else limit
+        self.cursor = cursor
+
+
+async def _paged(response: Response, fetch) -> list:
+    """
+    Runs a paged use case and moves `next_cursor` into the X-Next-Cursor
+    header so the body stays a plain list of posts.
+    """
+    try:
+        page: PostPageDTO = await fetch
+    except (InvalidCursorError, InvalidQueryError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+def _render_posts(posts: List[PostDTO]) -> bytes:
+    return POST_LIST.dump_json([PostResponse.model_validate(asdict(post)) for post in posts])
+
+
+async def _serialized(posts: AsyncIterator[PostDTO]) -> AsyncIterator[str]:
+    async for post in posts:
+        yield PostResponse.model_validate(asdict(post)).model_dump_json()
+
+
+def _check_post_id(post_id: str) -> None:
+    if not PydanticObjectId.is_valid(post_id):
+        raise HTTPException(status_code=400, detail="Invalid ID")
+
+
+def _duplicate(e: DuplicatePostError) -> HTTPException:
+    return HTTPException(status_code=409, detail={"message": str(e), "duplicate_of": e.duplicate_of})
+
+
+def _stream_requested(request: Request, stream: bool) -> bool:
+    return stream or wants_ndjson(request)
+
 @router.get("/all", response_model=list[PostResponse])
-async def get_all_posts():
+async def get_all_posts(request: Request, response: Response, page: PageParams = Depends(), stream: bool = False):
+    """
+    One page of posts, newest first. With `stream=true` (or
+    `Accept: application/x-ndjson`) every post is streamed instead.
+    Answers 304 without querying when If-None-Match still matches.
+    """
+    current = validators(request, "posts", "categories")
+    if not_modified(request, current):
+        return not_modified_response(current)
+
     post_repo = MongoPostRepository()
     use_case = ListPostsUseCase(post_repo)
-    return await use_case.execute()
+    if _stream_requested(request, stream):
+        streamed = stream_json(_serialized(use_case.stream()), ndjson=wants_ndjson(request))
+        streamed.headers.update(current.headers())
+        return streamed
+    try:
+        body, next_cursor = await use_case.execute_rendered(_render_posts, limit=page.limit, cursor=page.cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = body_headers(request, current, "posts", "categories")
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.get("/publisher/{username}", response_model=list[PostResponse])
-async def get_posts_by_publisher(username: str):
+async def get_posts_by_publisher(username: str, response: Response, page: PageParams = Depends()):
     post_repo = MongoPostRepository()
     use_case = GetPostsByPublisherUseCase(post_repo)
-    return await use_case.execute(username)
+    return await _paged(response, use_case.execute(username, limit=page.limit, cursor=page.cursor))
 
 @router.get("/category/{category_key}", response_model=list[PostResponse])
-async def get_posts_by_category(category_key: str):
+async def get_posts_by_category(category_key: str, request: Request, response: Response, page: PageParams = Depends(), stream: bool = False):
     post_repo = MongoPostRepository()
     use_case = GetPostsByCategoryUseCase(post_repo)
-    return await use_case.execute(category_key)
+    if _stream_requested(request, stream):
+        return stream_json(_serialized(use_case.stream(category_key)), ndjson=wants_ndjson(request))
+    return await _paged(response, use_case.execute(category_key, limit=page.limit, cursor=page.cursor))
 
 @router.post("/add", response_model=PostResponse)
 async def create_post(request: CreatePostRequest, current_user: str = Depends(AuthHandler.get_current_user)):
     request.publisher_username = current_user 
     post_repo = MongoPostRepository()
-    use_case = CreatePostUseCase(post_repo)
-    return await use_case.execute(request)
+    use_case = CreatePostUseCase(post_repo, MongoPostMatchRepository())
+    try:
+        return await use_case.execute(request)
+    except DuplicatePostError as e:
+        raise _duplicate(e)
+
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def bulk_create_posts(
+    request: Request,
+    match: bool = False,
+    duplicates: Optional[Literal["reject", "flag", "off"]] = None,
+    current_user: str = Depends(AuthHandler.get_current_user),
+):
+    """
+    Imports many posts at once from a JSON array or an NDJSON stream
+    (Content-Type: application/x-ndjson) of CreatePostRequest items, each
+    optionally carrying its original `created_at`. Items are validated and
+    written in chunks with unordered insert_many; the response reports every
+    item by its position. Matching runs only with match=true; `duplicates`
+    overrides the near-duplicate policy for this import.
+    """
+    use_case = BulkCreatePostsUseCase(MongoPostRepository(), MongoPostMatchRepository() if match else None)
+    results = []
+    chunk = []
+
+    try:
+        async for index, raw, error in read_json_items(request):
+            if index >= BULK_MAX_ITEMS:
+                raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per import")
+            if error is None:
+                try:
+                    item = BulkPostRequest.model_validate(raw)
+                except ValidationError as e:
+                    error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            if error is not None:
+                results.append(BulkItemResultDTO(index=index, status="invalid", error=error))
+                continue
+
+            item.publisher_username = current_user
+            chunk.append((index, item))
+            if len(chunk) >= BULK_CHUNK_SIZE:
+                results.extend(await use_case.execute(chunk, duplicates))
+                chunk = []
+    except InvalidBodyError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if chunk:
+        results.extend(await use_case.execute(chunk, duplicates))
+
+    results.sort(key=lambda r: r.index)
+    created = sum(r.status == "created" for r in results)
+    return BulkCreateResponse(created=created, failed=len(results) - created, results=[asdict(r) for r in results])
 
 @router.put("/{post_id}", response_model=PostResponse)
 async def update_post(post_id: str, request: UpdatePostRequest, current_user: str = Depends(AuthHandler.get_current_user)):
     post_repo = MongoPostRepository()
-    use_case = UpdatePostUseCase(post_repo)
-    return await use_case.execute(post_id, request)
+    use_case = UpdatePostUseCase(post_repo, MongoPostMatchRepository())
+    try:
+        return await use_case.execute(post_id, request)
+    except DuplicatePostError as e:
+        raise _duplicate(e)
 
 @router.delete("/{post_id}")
 async def delete_post(post_id: str, current_user: str = Depends(AuthHandler.get_current_user)):
     post_repo = MongoPostRepository()
-    use_case = DeletePostUseCase(post_repo)
+    use_case = DeletePostUseCase(post_repo, MongoPostMatchRepository())
     await use_case.execute(post_id)
     return {"message": "Post deleted successfully"}
 
+@router.post("/{post_id}/image", response_model=PostResponse)
+async def upload_post_image(post_id: str, request: Request, current_user: str = Depends(AuthHandler.get_current_user)):
+    """
+    Replaces the post's photo with the raw request body (JPEG, PNG, GIF or
+    WebP). The image is stored under its content hash, thumbnails are
+    generated and their URLs returned in `thumbnails`.
+    """
+    _check_post_id(post_id)
+    post_repo = MongoPostRepository()
+    post = await post_repo.get_by_id(post_id)
+    if post is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    if post.publisher_username != current_user:
+        raise HTTPException(status_code=403, detail="Only the publisher can change the image")
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > image_store.max_bytes:
+        raise HTTPException(status_code=413, detail=f"Images are limited to {image_store.max_bytes} bytes")
+
+    use_case = UploadPostImageUseCase(post_repo, image_store)
+    try:
+        updated = await use_case.execute(post_id, request.stream())
+    except ImageTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImageError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return updated
+
+@router.get("/{post_id}/matches", response_model=list[PostMatchResponse])
+async def get_post_matches(post_id: str, limit: int = Query(10, ge=1, le=50)):
+    """
+    Candidate matches for a post: found posts for a lost one and vice versa,
+    best score first. Matches are computed when either post is created or
+    edited.
+    """
+    _check_post_id(post_id)
+    post_repo = MongoPostRepository()
+    use_case = GetPostMatchesUseCase(post_repo, MongoPostMatchRepository())
+    matches = await use_case.execute(post_id, limit)
+    if matches is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return matches
+
 @router.get("/search", response_model=list[PostResponse])
-async def search_posts(query: str):
+async def search_posts(query: str, response: Response, page: PageParams = Depends()):
+    """
+    Ranked full-text search over title, tag and description (BM25, Persian
+    normalized), best match first.
+    """
     post_repo = MongoPostRepository()
     use_case = SearchPostsUseCase(post_repo)
-    return await use_case.execute(query)
+    return await _paged(response, use_case.execute(query, limit=page.limit, cursor=page.cursor))
+
+@router.get("/query", response_model=list[PostResponse])
+async def query_posts(
+    request: Request,
+    response: Response,
+    type: Optional[Literal["lost", "found"]] = None,
+    category_key: Optional[str] = None,
+    tag: Optional[str] = None,
+    publisher: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    bbox: Optional[str] = Query(None, description="min_lng,min_lat,max_lng,max_lat"),
+    text: Optional[str] = Query(None, min_length=1, max_length=200),
+    sort: Literal["newest", "oldest", "relevance"] = "newest",
+    page: PageParams = Depends(),
+):
+    """
+    Posts matching every given criterion, run as a single indexed query.
+    `created_from` is inclusive and `created_to` exclusive; `text` matches
+    like /posts/search and is required by sort=relevance.
+    """
+    current = validators(request, "posts", "categories")
+    if not_modified(request, current):
+        return not_modified_response(current)
+
+    try:
+        parsed_bbox = BoundingBox.parse(bbox) if bbox else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    query = PostQuery(
+        type=type,
+        category_key=category_key,
+        tag=tag,
+        publisher_username=publisher,
+        created_from=created_from,
+        created_to=created_to,
+        bbox=parsed_bbox,
+        text=text,
+        sort=sort,
+    )
+    use_case = QueryPostsUseCase(MongoPostRepository())
+    posts = await _paged(response, use_case.execute(query, limit=page.limit, cursor=page.cursor))
+    response.headers.update(body_headers(request, current, "posts", "categories"))
+    return posts
+
+@router.get("/suggest", response_model=list[SuggestionResponse])
+async def suggest_posts(prefix: str = Query(..., min_length=1, max_length=100), limit: int = Query(10, ge=1, le=MAX_SUGGESTIONS)):
+    """
+    Autocomplete for the search box: titles and tags completing `prefix`,
+    tolerating a typo in the last word. Served from memory.
+    """
+    post_repo = MongoPostRepository()
+    use_case = SuggestPostsUseCase(post_repo)
+    return await use_case.execute(prefix, limit)
 
 @router.get("/tag/{tag}", response_model=list[PostResponse])
-async def get_posts_by_tag(tag: str):
+async def get_posts_by_tag(tag: str, response: Response, page: PageParams = Depends()):
     post_repo = MongoPostRepository()
     use_case = GetPostsByTagUseCase(post_repo)
-    return await use_case.execute(tag)
+    return await _paged(response, use_case.execute(tag, limit=page.limit, cursor=page.cursor))
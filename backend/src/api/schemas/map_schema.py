@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -21,4 +21,26 @@ class MapItemResponse(BaseModel):
     image_url: Optional[str] = None
     reports_count: int
     created_at: Optional[datetime] = None
-    location: Optional[MapLocationSchema] = None
\ No newline at end of file
+    location: Optional[MapLocationSchema] = None
+    distance_m: Optional[float] = None
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    thumbnails: Dict[str, str] = {}
+    title_fa: Optional[str] = None
+    color_code: Optional[str] = None
+
+
+class MapClusterResponse(BaseModel):
+    id: str
+    count: int
+    centroid: MapLocationSchema
+    lost_count: int
+    found_count: int
+    dominant_category_key: Optional[str] = None
+
+
+class MapClustersResponse(BaseModel):
+    zoom: int
+    clustered: bool
+    clusters: List[MapClusterResponse] = []
+    items: List[MapItemResponse] = []
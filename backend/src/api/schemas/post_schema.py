@@ -1,4 +1,4 @@
-from typing import Optional, List, Literal
+from typing import Dict, Optional, List, Literal
 from pydantic import BaseModel, Field
 from datetime import datetime, timezone
 
@@ -26,6 +26,28 @@ class PostResponse(BaseModel):
     image_url: Optional[str]
     created_at: datetime
 
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    duplicate_of: Optional[str] = None
+    thumbnails: Dict[str, str] = {}
+
+    title_fa: Optional[str] = None
+    color_code: Optional[str] = None
+
+
+class PostMatchResponse(BaseModel):
+    post: PostResponse
+    score: float
+    text_score: float
+    distance_m: Optional[float] = None
+    days_apart: float
+
+
+class SuggestionResponse(BaseModel):
+    text: str
+    kind: Literal["title", "tag"]
+    count: int
+
 
 class CreatePostRequest(BaseModel):
     type: Literal["lost", "found"]
@@ -39,6 +61,25 @@ class CreatePostRequest(BaseModel):
     image_url: Optional[str] = None
 
 
+class BulkPostRequest(CreatePostRequest):
+    # Imported records keep their original date.
+    created_at: Optional[datetime] = None
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "invalid", "duplicate", "error"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+    duplicate_of: Optional[str] = None
+
+
+class BulkCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+
 class UpdatePostRequest(BaseModel):
     title: Optional[str] = None
     category_key: Optional[str] = None
@@ -0,0 +1,96 @@
+import json
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+JSON_MEDIA_TYPE = "application/json"
+
+# Items per written chunk: large enough to keep syscalls and ASGI messages
+# few, small enough that the first bytes leave quickly.
+STREAM_CHUNK_ITEMS = 200
+
+
+class InvalidBodyError(ValueError):
+    pass
+
+
+def wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def sends_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("content-type", "")
+
+
+async def read_json_items(request: Request) -> AsyncIterator[Tuple[int, Any, Optional[str]]]:
+    """
+    Yields (index, item, error) for each item of a JSON array body, or of an
+    NDJSON body read line by line as it arrives. A line that is not valid
+    JSON yields its error instead of stopping the stream. A JSON body that
+    is not an array raises InvalidBodyError.
+    """
+    if not sends_ndjson(request):
+        try:
+            items = json.loads(await request.body())
+        except ValueError as e:
+            raise InvalidBodyError(f"Invalid JSON: {e}")
+        if not isinstance(items, list):
+            raise InvalidBodyError("Body must be a JSON array")
+        for index, item in enumerate(items):
+            yield index, item, None
+        return
+
+    index = 0
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield (index, *_parse_line(line))
+                index += 1
+    if buffer.strip():
+        yield (index, *_parse_line(buffer))
+
+
+def _parse_line(line: bytes) -> Tuple[Any, Optional[str]]:
+    try:
+        return json.loads(line), None
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+
+def stream_json(items: AsyncIterator[str], ndjson: bool) -> StreamingResponse:
+    """
+    Streams already-serialized JSON values as one JSON array, or as
+    newline-delimited JSON when `ndjson` is set.
+    """
+    async def body() -> AsyncIterator[bytes]:
+        chunk = []
+        count = 0
+        if not ndjson:
+            chunk.append("[")
+
+        async for item in items:
+            if ndjson:
+                chunk.append(item)
+                chunk.append("\n")
+            else:
+                if count:
+                    chunk.append(",")
+                chunk.append(item)
+            count += 1
+
+            if count % STREAM_CHUNK_ITEMS == 0:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+
+        if not ndjson:
+            chunk.append("]")
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
+
+    media_type = NDJSON_MEDIA_TYPE if ndjson else JSON_MEDIA_TYPE
+    return StreamingResponse(body(), media_type=media_type)
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -23,4 +23,28 @@ class MapItemDTO:
     image_url: Optional[str]
     reports_count: int
     created_at: Optional[datetime]
-    location: Optional[MapLocationDTO] = None
\ No newline at end of file
+    location: Optional[MapLocationDTO] = None
+    distance_m: Optional[float] = None
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    thumbnails: Dict[str, str] = field(default_factory=dict)
+    title_fa: Optional[str] = None      # category display fields
+    color_code: Optional[str] = None
+
+
+@dataclass
+class MapClusterDTO:
+    id: str                   # grid cell, "<x>:<y>"
+    count: int
+    centroid: MapLocationDTO
+    lost_count: int
+    found_count: int
+    dominant_category_key: Optional[str]
+
+
+@dataclass
+class MapClustersDTO:
+    zoom: int
+    clustered: bool
+    clusters: List[MapClusterDTO]
+    items: List[MapItemDTO]
@@ -1,8 +1,10 @@
-from dataclasses import dataclass
-from typing import List, Optional, Literal
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Literal
 from datetime import datetime
 
-from src.domain.entities.post import Post
+from src.domain.entities.post import Post, PostPage
+from src.domain.entities.suggestion import Suggestion
+from src.infrastructure.cache.category_cache import category_cache
 
 
 @dataclass
@@ -27,8 +29,18 @@ class PostDTO:
     image_url: Optional[str]
     created_at: datetime
 
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    duplicate_of: Optional[str] = None
+    thumbnails: Dict[str, str] = field(default_factory=dict)
+
+    # Display fields of the post's category, from the category cache.
+    title_fa: Optional[str] = None
+    color_code: Optional[str] = None
+
     @classmethod
     def from_entity(cls, post: Post) -> "PostDTO":
+        category = category_cache.get(post.category_key)
         return cls(
             id=post.id,
             type=post.type,
@@ -44,8 +56,52 @@ class PostDTO:
             reports_count=post.reports_count,
             image_url=post.image_url,
             created_at=post.created_at,
+            comments_count=post.comments_count,
+            last_activity_at=post.last_activity_at,
+            duplicate_of=post.duplicate_of,
+            thumbnails=post.thumbnails or {},
+            title_fa=category.title_fa if category else None,
+            color_code=category.color_code if category else None,
+        )
+
+@dataclass
+class PostPageDTO:
+    items: List[PostDTO]
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_page(cls, page: PostPage) -> "PostPageDTO":
+        return cls(
+            items=[PostDTO.from_entity(post) for post in page.items],
+            next_cursor=page.next_cursor,
         )
 
+@dataclass
+class BulkItemResultDTO:
+    index: int
+    status: Literal["created", "invalid", "duplicate", "error"]
+    id: Optional[str] = None
+    error: Optional[str] = None
+    duplicate_of: Optional[str] = None
+
+@dataclass
+class PostMatchDTO:
+    post: PostDTO
+    score: float
+    text_score: float
+    distance_m: Optional[float]
+    days_apart: float
+
+@dataclass
+class SuggestionDTO:
+    text: str
+    kind: Literal["title", "tag"]
+    count: int
+
+    @classmethod
+    def from_entity(cls, suggestion: Suggestion) -> "SuggestionDTO":
+        return cls(text=suggestion.text, kind=suggestion.kind, count=suggestion.count)
+
 @dataclass
 class CreatePostDTO:
     type: Literal["lost", "found"]
@@ -0,0 +1,29 @@
+from typing import List, Optional, Tuple
+
+from src.application.dto.post_dto import BulkItemResultDTO, CreatePostDTO
+from src.application.use_cases.create_post import post_from_request
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+
+
+class BulkCreatePostsUseCase:
+    def __init__(self, post_repo: IPostRepository, match_repo: Optional[IPostMatchRepository] = None):
+        self.post_repo = post_repo
+        self.match_repo = match_repo
+
+    async def execute(self, items: List[Tuple[int, CreatePostDTO]], duplicate_policy: Optional[str] = None) -> List[BulkItemResultDTO]:
+        """Writes one chunk of (request index, post) pairs and reports each item."""
+        posts = [post_from_request(data) for _, data in items]
+        written = await self.post_repo.create_many(posts, duplicate_policy=duplicate_policy)
+
+        results = []
+        for (index, _), result in zip(items, written):
+            if result.post is None:
+                status = "duplicate" if result.duplicate_of else "error"
+                results.append(BulkItemResultDTO(index=index, status=status, error=result.error, duplicate_of=result.duplicate_of))
+                continue
+
+            if self.match_repo:
+                await self.match_repo.refresh_for(result.post)
+            results.append(BulkItemResultDTO(index=index, status="created", id=result.post.id, duplicate_of=result.duplicate_of))
+        return results
@@ -1,30 +1,40 @@
+from typing import Optional
+
 from src.application.dto.post_dto import PostDTO, CreatePostDTO
 from src.domain.entities.post import Post
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
+def post_from_request(data: CreatePostDTO) -> Post:
+    return Post(
+        id=None,
+        type=data.type,
+        title=data.title,
+        category_key=data.category_key,
+        tag=data.tag,
+        description=data.description,
+        publisher_username=data.publisher_username,
+        location={
+            "type": data.location.type,
+            "coordinates": data.location.coordinates,
+        },
+        reports_count=0,
+        image_url=data.image_url,
+        created_at=getattr(data, "created_at", None),
+    )
+
+
 class CreatePostUseCase:
-    def __init__(self, post_repo: IPostRepository):
+    def __init__(self, post_repo: IPostRepository, match_repo: Optional[IPostMatchRepository] = None):
         self.post_repo = post_repo
+        self.match_repo = match_repo
 
     async def execute(self, data: CreatePostDTO) -> PostDTO:
-        post_entity = Post(
-            id=None,
-            type=data.type,
-            title=data.title,
-            category_key=data.category_key,
-            tag=data.tag,
-            description=data.description,
-            publisher_username=data.publisher_username,
-            location={
-                "type": data.location.type,
-                "coordinates": data.location.coordinates,
-            },
-            reports_count=0,
-            image_url=data.image_url,
-            created_at=None,
-        )
-
-        post = await self.post_repo.create(post_entity)
+        post = await self.post_repo.create(post_from_request(data))
+
+        # A new found post is scored against open lost posts and vice versa.
+        if self.match_repo:
+            await self.match_repo.refresh_for(post)
 
         return PostDTO.from_entity(post)
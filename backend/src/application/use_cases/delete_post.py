@@ -1,9 +1,16 @@
+from typing import Optional
+
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
 class DeletePostUseCase:
-    def __init__(self, post_repo: IPostRepository):
+    def __init__(self, post_repo: IPostRepository, match_repo: Optional[IPostMatchRepository] = None):
         self.post_repo = post_repo
+        self.match_repo = match_repo
 
     async def execute(self, post_id: str) -> None:
         await self.post_repo.delete(post_id)
+
+        if self.match_repo:
+            await self.match_repo.delete_for(post_id)
@@ -0,0 +1,44 @@
+from typing import Optional
+
+from src.application.dto.map_item_dto import MapClusterDTO, MapClustersDTO, MapLocationDTO
+from src.application.use_cases.get_map_items import GetMapItemsUseCase
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+
+# From this zoom on the map is zoomed in far enough to draw every pin.
+CLUSTER_MAX_ZOOM = 18
+# Grid cells per 256px map tile edge, i.e. one cluster per ~64px square.
+CELLS_PER_TILE = 4
+
+
+def cell_size_for_zoom(zoom: int) -> float:
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+class GetMapClustersUseCase:
+    def __init__(self, post_repo: IPostRepository):
+        self.post_repo = post_repo
+
+    async def execute(self, zoom: int, bbox: Optional[BoundingBox] = None) -> MapClustersDTO:
+        if zoom >= CLUSTER_MAX_ZOOM:
+            items = await GetMapItemsUseCase(self.post_repo).execute(bbox=bbox)
+            return MapClustersDTO(zoom=zoom, clustered=False, clusters=[], items=items)
+
+        clusters = await self.post_repo.cluster(bbox, cell_size_for_zoom(zoom))
+
+        return MapClustersDTO(
+            zoom=zoom,
+            clustered=True,
+            clusters=[
+                MapClusterDTO(
+                    id=f"{c.cell_x}:{c.cell_y}",
+                    count=c.count,
+                    centroid=MapLocationDTO(lat=c.lat, lng=c.lng),
+                    lost_count=c.lost_count,
+                    found_count=c.found_count,
+                    dominant_category_key=c.dominant_category_key,
+                )
+                for c in clusters
+            ],
+            items=[],
+        )
@@ -1,54 +1,127 @@
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 from src.application.dto.map_item_dto import MapItemDTO, MapLocationDTO
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.entities.post import Post
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+from src.infrastructure.cache.category_cache import category_cache
+from src.infrastructure.cache.single_flight import single_flight
+
+
+LOST_STATUS = "گم‌شده"
+FOUND_STATUS = "پیدا‌شده"
 
 
 class GetMapItemsUseCase:
     def __init__(self, post_repo: IPostRepository):
         self.post_repo = post_repo
 
-    async def execute(self) -> List[MapItemDTO]:
-        posts = await self.post_repo.list_all()
-
-        result: List[MapItemDTO] = []
-        for post in posts:
-            # Extract location
-            location = None
-            if post.location:
-                try:
-                    # location is stored as dict: {"type": "Point", "coordinates": [lng, lat]}
-                    if isinstance(post.location, dict):
-                        coords = post.location.get("coordinates")
-                        if coords and len(coords) >= 2:
-                            # GeoJSON: [longitude, latitude]
-                            location = MapLocationDTO(lat=coords[1], lng=coords[0])
-                    else:
-                        coords = post.location.coordinates
-                        if coords and len(coords) >= 2:
-                            location = MapLocationDTO(lat=coords[1], lng=coords[0])
-                except Exception:
-                    location = None
-
-            # Map type to Persian status
-            status = "گم‌شده" if post.type == "lost" else "پیدا‌شده"
-
-            result.append(
-                MapItemDTO(
-                    id=post.id,
-                    itemName=post.title,
-                    status=status,
-                    type=post.type,
-                    title=post.title,
-                    category_key=post.category_key,
-                    tag=post.tag,
-                    description=post.description,
-                    publisher_username=post.publisher_username,
-                    image_url=post.image_url,
-                    reports_count=post.reports_count,
-                    created_at=post.created_at,
-                    location=location,
-                )
-            )
-
-        return result
\ No newline at end of file
+    async def execute(self, bbox: Optional[BoundingBox] = None) -> List[MapItemDTO]:
+        if bbox:
+            posts = await self.post_repo.find_in_bbox(bbox)
+        else:
+            page = await self.post_repo.list_all()
+            posts = page.items
+
+        return [self._to_map_item(post) for post in posts]
+
+    async def execute_json(self, bbox: Optional[BoundingBox] = None) -> bytes:
+        """
+        The map feed as a ready JSON body from the in-memory snapshot.
+        Identical concurrent requests share one rendering.
+        """
+        # Items embed category fields, so cached encodings last one category version.
+        epoch = category_cache.version
+        return await single_flight.do(
+            f"map.json bbox={bbox} epoch={epoch}",
+            lambda: self.post_repo.map_snapshot_json(map_item_from_row, bbox, epoch=epoch),
+        )
+
+    async def stream_rows(self, bbox: Optional[BoundingBox] = None) -> AsyncIterator[dict]:
+        async for row in self.post_repo.stream_map_rows(bbox):
+            yield map_item_from_row(row)
+
+    async def execute_near(self, lat: float, lng: float, radius_m: float, limit: int) -> List[MapItemDTO]:
+        nearby = await self.post_repo.find_near(lat, lng, radius_m, limit)
+
+        return [self._to_map_item(n.post, distance_m=n.distance_m) for n in nearby]
+
+    @staticmethod
+    def _to_map_item(post: Post, distance_m: Optional[float] = None) -> MapItemDTO:
+        # Extract location
+        location = None
+        if post.location:
+            try:
+                # location is stored as dict: {"type": "Point", "coordinates": [lng, lat]}
+                if isinstance(post.location, dict):
+                    coords = post.location.get("coordinates")
+                    if coords and len(coords) >= 2:
+                        # GeoJSON: [longitude, latitude]
+                        location = MapLocationDTO(lat=coords[1], lng=coords[0])
+                else:
+                    coords = post.location.coordinates
+                    if coords and len(coords) >= 2:
+                        location = MapLocationDTO(lat=coords[1], lng=coords[0])
+            except Exception:
+                location = None
+
+        # Map type to Persian status
+        status = LOST_STATUS if post.type == "lost" else FOUND_STATUS
+        category = category_cache.get(post.category_key)
+
+        return MapItemDTO(
+            id=post.id,
+            itemName=post.title,
+            status=status,
+            type=post.type,
+            title=post.title,
+            category_key=post.category_key,
+            tag=post.tag,
+            description=post.description,
+            publisher_username=post.publisher_username,
+            image_url=post.image_url,
+            reports_count=post.reports_count,
+            created_at=post.created_at,
+            location=location,
+            distance_m=distance_m,
+            comments_count=post.comments_count,
+            last_activity_at=post.last_activity_at,
+            thumbnails=post.thumbnails or {},
+            title_fa=category.title_fa if category else None,
+            color_code=category.color_code if category else None,
+        )
+
+
+def map_item_from_row(row: dict) -> dict:
+    location = None
+    coords = (row.get("location") or {}).get("coordinates")
+    if coords and len(coords) >= 2:
+        # GeoJSON: [longitude, latitude]
+        location = {"lat": coords[1], "lng": coords[0]}
+
+    created_at = row.get("created_at")
+    last_activity_at = row.get("last_activity_at")
+    post_type = row.get("type")
+    category = category_cache.get(row.get("category_key"))
+
+    return {
+        "id": str(row["_id"]),
+        "itemName": row.get("title"),
+        "status": LOST_STATUS if post_type == "lost" else FOUND_STATUS,
+        "type": post_type,
+        "title": row.get("title"),
+        "category_key": row.get("category_key"),
+        "tag": row.get("tag"),
+        "description": row.get("description"),
+        "publisher_username": row.get("publisher_username"),
+        "image_url": row.get("image_url"),
+        "reports_count": row.get("reports_count", 0),
+        "created_at": created_at.isoformat() if created_at else None,
+        "location": location,
+        "distance_m": None,
+        "comments_count": row.get("comments_count", 0),
+        "last_activity_at": last_activity_at.isoformat() if last_activity_at else None,
+        "thumbnails": row.get("thumbnails") or {},
+        "title_fa": category.title_fa if category else None,
+        "color_code": category.color_code if category else None,
+    }
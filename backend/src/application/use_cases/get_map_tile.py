@@ -0,0 +1,40 @@
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+from src.infrastructure.map.tile_cache import TileCache, tile_cache
+from src.infrastructure.map.vector_tile import encode_point_layer, tile_query_bounds
+
+POSTS_LAYER = "posts"
+
+
+class GetMapTileUseCase:
+    def __init__(self, post_repo: IPostRepository, cache: TileCache = tile_cache):
+        self.post_repo = post_repo
+        self.cache = cache
+
+    async def execute(self, z: int, x: int, y: int) -> bytes:
+        cached = self.cache.get(z, x, y)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        # A planar box matches tile edges at every zoom, world tiles included.
+        posts = await self.post_repo.find_in_bbox(tile_query_bounds(z, x, y))
+
+        features = []
+        for post in posts:
+            location = post.location
+            if isinstance(location, dict):
+                coords = location.get("coordinates")
+            else:
+                coords = getattr(location, "coordinates", None)
+            if not coords or len(coords) < 2:
+                continue
+            features.append((coords[0], coords[1], {
+                "id": post.id,
+                "type": post.type,
+                "category_key": post.category_key,
+                "reports_count": post.reports_count,
+            }))
+
+        tile = encode_point_layer(POSTS_LAYER, z, x, y, features)
+        self.cache.put(z, x, y, tile, generation=generation)
+        return tile
@@ -0,0 +1,35 @@
+from typing import List, Optional
+
+from src.application.dto.post_dto import PostDTO, PostMatchDTO
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+
+
+class GetPostMatchesUseCase:
+    def __init__(self, post_repo: IPostRepository, match_repo: IPostMatchRepository):
+        self.post_repo = post_repo
+        self.match_repo = match_repo
+
+    async def execute(self, post_id: str, limit: int) -> Optional[List[PostMatchDTO]]:
+        """Best candidate matches for a post, or None if the post does not exist."""
+        post = await self.post_repo.get_by_id(post_id)
+        if post is None:
+            return None
+
+        matches = await self.match_repo.get_for(post, limit)
+        others = await self.post_repo.get_by_ids([match.other_id(post_id) for match in matches])
+
+        results = []
+        for match in matches:
+            # Candidates deleted since the match was stored are skipped.
+            other = others.get(match.other_id(post_id))
+            if other is None:
+                continue
+            results.append(PostMatchDTO(
+                post=PostDTO.from_entity(other),
+                score=match.score,
+                text_score=match.text_score,
+                distance_m=match.distance_m,
+                days_apart=match.days_apart,
+            ))
+        return results
@@ -1,4 +1,6 @@
-from src.application.dto.post_dto import PostDTO
+from typing import AsyncIterator, Optional
+
+from src.application.dto.post_dto import PostDTO, PostPageDTO
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
@@ -6,7 +8,11 @@ class GetPostsByCategoryUseCase:
     def __init__(self, post_repo: IPostRepository):
         self.post_repo = post_repo
 
-    async def execute(self, category_key: str) -> list[PostDTO]:
-        posts = await self.post_repo.get_by_category(category_key)
+    async def execute(self, category_key: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPageDTO:
+        page = await self.post_repo.get_by_category(category_key, limit=limit, cursor=cursor)
+
+        return PostPageDTO.from_page(page)
 
-        return [PostDTO.from_entity(post) for post in posts]
+    async def stream(self, category_key: str) -> AsyncIterator[PostDTO]:
+        async for post in self.post_repo.stream_by_category(category_key):
+            yield PostDTO.from_entity(post)
@@ -1,4 +1,6 @@
-from src.application.dto.post_dto import PostDTO
+from typing import Optional
+
+from src.application.dto.post_dto import PostPageDTO
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
@@ -6,7 +8,7 @@ class GetPostsByPublisherUseCase:
     def __init__(self, post_repo: IPostRepository):
         self.post_repo = post_repo
 
-    async def execute(self, username: str) -> list[PostDTO]:
-        posts = await self.post_repo.get_by_publisher(username)
+    async def execute(self, username: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPageDTO:
+        page = await self.post_repo.get_by_publisher(username, limit=limit, cursor=cursor)
 
-        return [PostDTO.from_entity(post) for post in posts]
+        return PostPageDTO.from_page(page)
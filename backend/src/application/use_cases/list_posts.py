@@ -1,12 +1,35 @@
-from src.application.dto.post_dto import PostDTO
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from src.application.dto.post_dto import PostDTO, PostPageDTO
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.cache.single_flight import single_flight
 
 
 class ListPostsUseCase:
     def __init__(self, post_repo: IPostRepository):
         self.post_repo = post_repo
 
-    async def execute(self) -> list[PostDTO]:
-        posts = await self.post_repo.list_all()
+    async def execute(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPageDTO:
+        page = await self.post_repo.list_all(limit=limit, cursor=cursor)
+
+        return PostPageDTO.from_page(page)
+
+    async def execute_rendered(
+        self, render: Callable[[List[PostDTO]], bytes], limit: Optional[int] = None, cursor: Optional[str] = None,
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        One page passed through `render`, with its next cursor. Identical
+        concurrent requests share the query and the rendering.
+        """
+        async def run():
+            page = await self.execute(limit=limit, cursor=cursor)
+            return render(page.items), page.next_cursor
+
+        # Versioned so a read issued after a write never joins a flight from before it.
+        version = f"{collection_versions.version('posts')}.{collection_versions.version('categories')}"
+        return await single_flight.do(f"posts.all v={version} limit={limit} cursor={cursor}", run)
 
-        return [PostDTO.from_entity(post) for post in posts]
+    async def stream(self) -> AsyncIterator[PostDTO]:
+        async for post in self.post_repo.stream_all():
+            yield PostDTO.from_entity(post)
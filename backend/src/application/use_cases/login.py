@@ -9,7 +9,7 @@ class LoginUseCase:
     async def execute(self, data: LoginDTO) -> dict:
         user = await self.user_repo.get_by_username(data.username)
 
-        if not user or not AuthHandler.verify_password(data.password, user.password):
+        if not user or not await AuthHandler.verify_password_async(data.password, user.password):
             raise Exception("نام کاربری یا رمز عبور اشتباه است.")
 
         token = AuthHandler.create_access_token({"sub": user.username})
@@ -0,0 +1,15 @@
+from typing import Optional
+
+from src.application.dto.post_dto import PostPageDTO
+from src.domain.entities.post import PostQuery
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+
+
+class QueryPostsUseCase:
+    def __init__(self, post_repo: IPostRepository):
+        self.post_repo = post_repo
+
+    async def execute(self, query: PostQuery, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPageDTO:
+        page = await self.post_repo.query(query, limit=limit, cursor=cursor)
+
+        return PostPageDTO.from_page(page)
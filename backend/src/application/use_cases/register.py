@@ -4,6 +4,7 @@ from src.infrastructure.database.models.otp_document import OTPDocument
 from src.infrastructure.database.models.user_document import UserDocument
 from src.infrastructure.security.email_handler import EmailHandler
 from src.infrastructure.security.auth_handler import AuthHandler
+from src.infrastructure.security.password_hasher import PasswordHasherBusyError
 from src.api.schemas.auth_schema import RegisterFinalRequest
 
 class RegisterUseCase:
@@ -22,7 +23,7 @@ class RegisterUseCase:
             otp_doc = OTPDocument(email=email, otp_code=otp, expire_at=expires)
             await otp_doc.insert()
         
-        await EmailHandler.send_verification_email(email, otp)
+        await EmailHandler.enqueue_verification_email(email, otp, expires_at=expires)
         return {"message": "Verification code sent to email"}
 
     async def verify_and_register(self, data: RegisterFinalRequest):
@@ -45,7 +46,10 @@ class RegisterUseCase:
         if user_exists:
             raise HTTPException(status_code=400, detail="Username is already taken")
 
-        hashed_password = AuthHandler.hash_password(data.password)
+        try:
+            hashed_password = await AuthHandler.hash_password_async(data.password)
+        except PasswordHasherBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e))
         new_user = UserDocument(
             username=data.username,
             email=data.email,
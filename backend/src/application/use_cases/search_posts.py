@@ -1,4 +1,6 @@
-from src.application.dto.post_dto import PostDTO
+from typing import Optional
+
+from src.application.dto.post_dto import PostPageDTO
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
@@ -6,6 +8,6 @@ class SearchPostsUseCase:
     def __init__(self, post_repo: IPostRepository):
         self.post_repo = post_repo
 
-    async def execute(self, query: str) -> list[PostDTO]:
-        posts = await self.post_repo.search_in_title_and_description(query)
-        return [PostDTO.from_entity(post) for post in posts]
+    async def execute(self, query: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPageDTO:
+        page = await self.post_repo.search_in_title_and_description(query, limit=limit, cursor=cursor)
+        return PostPageDTO.from_page(page)
@@ -0,0 +1,11 @@
+from src.application.dto.post_dto import SuggestionDTO
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+
+
+class SuggestPostsUseCase:
+    def __init__(self, post_repo: IPostRepository):
+        self.post_repo = post_repo
+
+    async def execute(self, prefix: str, limit: int) -> list[SuggestionDTO]:
+        suggestions = await self.post_repo.suggest(prefix, limit)
+        return [SuggestionDTO.from_entity(s) for s in suggestions]
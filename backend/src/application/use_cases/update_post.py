@@ -1,12 +1,19 @@
+from typing import Optional
+
 from src.application.dto.post_dto import PostDTO, UpdatePostDTO
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 
 
 class UpdatePostUseCase:
-    def __init__(self, post_repo: IPostRepository):
+    def __init__(self, post_repo: IPostRepository, match_repo: Optional[IPostMatchRepository] = None):
         self.post_repo = post_repo
+        self.match_repo = match_repo
 
     async def execute(self, post_id: str, data: UpdatePostDTO) -> PostDTO:
         post = await self.post_repo.update(post_id, data)
 
+        if self.match_repo:
+            await self.match_repo.refresh_for(post)
+
         return PostDTO.from_entity(post)
@@ -0,0 +1,17 @@
+from typing import AsyncIterator, Optional
+
+from src.application.dto.post_dto import PostDTO
+from src.domain.interfaces.repositories.IPostRepository import IPostRepository
+from src.infrastructure.media.image_store import ImageStore
+
+
+class UploadPostImageUseCase:
+    def __init__(self, post_repo: IPostRepository, image_store: ImageStore):
+        self.post_repo = post_repo
+        self.image_store = image_store
+
+    async def execute(self, post_id: str, chunks: AsyncIterator[bytes]) -> Optional[PostDTO]:
+        """Stores the image and points the post at it, or None if the post was deleted meanwhile."""
+        stored = await self.image_store.save(chunks)
+        post = await self.post_repo.set_image(post_id, stored.image_url, stored.digest, stored.thumbnails)
+        return PostDTO.from_entity(post) if post else None
@@ -6,3 +6,32 @@ from typing import List, Literal
 class GeoLocation:
     type: Literal["Point"] = "Point"
     coordinates: List[float] = None
+
+
+@dataclass
+class BoundingBox:
+    min_lng: float
+    min_lat: float
+    max_lng: float
+    max_lat: float
+
+    @classmethod
+    def parse(cls, value: str) -> "BoundingBox":
+        """Parses "min_lng,min_lat,max_lng,max_lat"."""
+        try:
+            min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(","))
+        except ValueError:
+            raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+
+        if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+            raise ValueError("bbox is out of range or inverted")
+
+        return cls(min_lng=min_lng, min_lat=min_lat, max_lng=max_lng, max_lat=max_lat)
+
+    def to_box(self) -> list:
+        """
+        Bottom-left and top-right corners for a planar `$box`. Unlike a
+        GeoJSON polygon, whose edges are geodesics and which must stay
+        under a hemisphere, a box keeps parallels as edges at any width.
+        """
+        return [[self.min_lng, self.min_lat], [self.max_lng, self.max_lat]]
@@ -1,8 +1,8 @@
-from dataclasses import dataclass
-from typing import Optional, Literal
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Literal
 from datetime import datetime
 
-from src.domain.entities.geo_location import GeoLocation
+from src.domain.entities.geo_location import BoundingBox, GeoLocation
 
 
 @dataclass
@@ -21,3 +21,45 @@ class Post:
     reports_count: int = 0
     image_url: Optional[str] = None
     created_at: Optional[datetime] = None
+
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+    duplicate_of: Optional[str] = None
+    image_hash: Optional[str] = None
+    thumbnails: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class PostPage:
+    items: List[Post] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+@dataclass
+class PostQuery:
+    """Compound post filter; every criterion left as None is not applied."""
+    type: Optional[Literal["lost", "found"]] = None
+    category_key: Optional[str] = None
+    tag: Optional[str] = None
+    publisher_username: Optional[str] = None
+    # created_from <= created_at < created_to
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    bbox: Optional[BoundingBox] = None
+    text: Optional[str] = None
+    # "relevance" ranks by BM25 score and needs `text`.
+    sort: Literal["newest", "oldest", "relevance"] = "newest"
+
+
+@dataclass
+class PostWriteResult:
+    """Outcome of one post in a bulk write: the stored post, or why it was not stored."""
+    post: Optional[Post] = None
+    error: Optional[str] = None
+    duplicate_of: Optional[str] = None
+
+
+@dataclass
+class NearbyPost:
+    post: Post
+    distance_m: float
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PostCluster:
+    cell_x: int
+    cell_y: int
+    count: int
+    lng: float
+    lat: float
+    lost_count: int = 0
+    found_count: int = 0
+    dominant_category_key: Optional[str] = None
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class PostMatch:
+    """A scored pairing between a lost post and a found post."""
+    lost_id: str
+    found_id: str
+    score: float
+    text_score: float = 0.0
+    distance_m: Optional[float] = None
+    days_apart: float = 0.0
+
+    def other_id(self, post_id: str) -> str:
+        return self.found_id if post_id == self.lost_id else self.lost_id
@@ -0,0 +1,10 @@
+from dataclasses import dataclass
+from typing import Literal
+
+
+@dataclass
+class Suggestion:
+    text: str
+    kind: Literal["title", "tag"]
+    count: int = 1          # posts carrying this title/tag
+    distance: int = 0       # edits between the typed prefix and the match
@@ -0,0 +1,21 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+from src.domain.entities.post import Post
+from src.domain.entities.post_match import PostMatch
+
+
+class IPostMatchRepository(ABC):
+
+    @abstractmethod
+    async def refresh_for(self, post: Post) -> List[PostMatch]:
+        """Scores `post` against the open posts of the opposite type and stores its best matches."""
+        pass
+
+    @abstractmethod
+    async def get_for(self, post: Post, limit: int) -> List[PostMatch]:
+        pass
+
+    @abstractmethod
+    async def delete_for(self, post_id: str) -> None:
+        pass
@@ -1,13 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Dict, List, Optional
 
-from src.domain.entities.post import Post
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.entities.post import NearbyPost, Post, PostPage, PostQuery, PostWriteResult
+from src.domain.entities.post_cluster import PostCluster
+from src.domain.entities.suggestion import Suggestion
 
 
 class IPostRepository(ABC):
 
     @abstractmethod
-    async def list_all(self) -> List[Post]:
+    async def list_all(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
         pass
 
     @abstractmethod
@@ -15,17 +18,26 @@ class IPostRepository(ABC):
         pass
 
     @abstractmethod
-    async def get_by_publisher(self, username: str) -> List[Post]:
+    async def get_by_ids(self, post_ids: List[str]) -> Dict[str, Post]:
+        """Existing posts among `post_ids`, keyed by id; invalid ids are skipped."""
         pass
 
     @abstractmethod
-    async def get_by_category(self, category_key: str) -> List[Post]:
+    async def get_by_publisher(self, username: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        pass
+
+    @abstractmethod
+    async def get_by_category(self, category_key: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
         pass
 
     @abstractmethod
     async def create(self, post: Post) -> Post:
         pass
 
+    @abstractmethod
+    async def create_many(self, posts: List[Post], duplicate_policy: Optional[str] = None) -> List[PostWriteResult]:
+        pass
+
     @abstractmethod
     async def update(self, post_id: str, post: Post) -> Post:
         pass
@@ -35,9 +47,56 @@ class IPostRepository(ABC):
         pass
 
     @abstractmethod
-    async def search_in_title_and_description(self, query: str):
+    async def set_image(self, post_id: str, image_url: str, image_hash: str, thumbnails: Dict[str, str]) -> Optional[Post]:
+        pass
+
+    @abstractmethod
+    async def search_in_title_and_description(self, query: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        pass
+
+    @abstractmethod
+    async def query(self, query: PostQuery, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        pass
+
+    @abstractmethod
+    async def suggest(self, prefix: str, limit: int) -> List[Suggestion]:
+        pass
+
+    @abstractmethod
+    async def get_by_tag(self, tag: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        pass
+
+    @abstractmethod
+    async def find_in_bbox(self, bbox: BoundingBox) -> List[Post]:
+        pass
+
+    @abstractmethod
+    async def find_near(self, lat: float, lng: float, radius_m: float, limit: int) -> List[NearbyPost]:
+        pass
+
+    @abstractmethod
+    async def cluster(self, bbox: Optional[BoundingBox], cell_size_deg: float) -> List[PostCluster]:
+        pass
+
+    @abstractmethod
+    async def map_snapshot_json(
+        self, render_item: Callable[[dict], dict], bbox: Optional[BoundingBox] = None, epoch: int = 0,
+    ) -> bytes:
+        """
+        JSON array of every map row (optionally inside bbox) passed through
+        `render_item`, served from memory. A new `epoch` discards items
+        rendered under the previous one.
+        """
+        pass
+
+    @abstractmethod
+    def stream_all(self) -> AsyncIterator[Post]:
+        pass
+
+    @abstractmethod
+    def stream_by_category(self, category_key: str) -> AsyncIterator[Post]:
         pass
 
     @abstractmethod
-    async def get_by_tag(self, tag: str):
+    def stream_map_rows(self, bbox: Optional[BoundingBox] = None) -> AsyncIterator[dict]:
         pass
@@ -0,0 +1,45 @@
+from typing import Dict, Iterable, List, Optional
+
+from src.domain.entities.category import Category
+
+
+class CategoryCache:
+    """
+    Every category held in memory, keyed by `key`.
+
+    Categories change only when one is created, so the cache is loaded once
+    at startup and written through by MongoCategoryRepository.create.
+    `version` is bumped on every change for caches of anything rendered
+    with category fields.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, Category] = {}
+        self.ready = False
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def load(self, categories: Iterable[Category]) -> None:
+        self._by_key = {category.key: category for category in categories}
+        self.ready = True
+        self.version += 1
+
+    def put(self, category: Category) -> None:
+        self._by_key[category.key] = category
+        self.version += 1
+
+    def get(self, key: Optional[str]) -> Optional[Category]:
+        return self._by_key.get(key) if key else None
+
+    def all(self) -> List[Category]:
+        return list(self._by_key.values())
+
+    def clear(self) -> None:
+        self._by_key = {}
+        self.ready = False
+        self.version += 1
+
+
+category_cache = CategoryCache()
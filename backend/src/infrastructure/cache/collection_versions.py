@@ -0,0 +1,39 @@
+import secrets
+from datetime import datetime, timezone
+from typing import Dict
+
+
+class CollectionVersions:
+    """
+    Change counters per collection, bumped by the repositories' write
+    paths, so a read endpoint can tell a client its copy is current without
+    querying anything.
+
+    Counters start over on restart; `boot` (random per process) keeps
+    validators from an earlier run from ever matching. `modified_at` starts
+    at boot time, since writes before it are unknown.
+    """
+
+    def __init__(self):
+        self.boot = secrets.token_hex(4)
+        self._versions: Dict[str, int] = {}
+        self._started_at = _now()
+        self._modified_at: Dict[str, datetime] = {}
+
+    def bump(self, collection: str) -> None:
+        self._versions[collection] = self._versions.get(collection, 0) + 1
+        self._modified_at[collection] = _now()
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def modified_at(self, collection: str) -> datetime:
+        return self._modified_at.get(collection, self._started_at)
+
+
+def _now() -> datetime:
+    # HTTP dates have whole seconds.
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+collection_versions = CollectionVersions()
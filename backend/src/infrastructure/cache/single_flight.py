@@ -0,0 +1,76 @@
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class FlightStats:
+    flights: int = 0     # times the call actually ran
+    callers: int = 0     # callers asking for it, including the ones that ran it
+
+    @property
+    def merged(self) -> int:
+        return self.callers - self.flights
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: while a call for a key is in
+    flight, later callers with the same key await its result instead of
+    starting their own. The result is shared, so callers must not mutate
+    it.
+
+    The call runs in its own task and callers await it shielded; a client
+    that disconnects does not cancel the work others are waiting on.
+    """
+
+    def __init__(self, max_keys: int = 1000):
+        self.max_keys = max_keys
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: "OrderedDict[str, FlightStats]" = OrderedDict()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        stats = self._stats_for(key)
+        stats.callers += 1
+
+        task = self._inflight.get(key)
+        if task is None:
+            stats.flights += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._landed(key, done))
+        return await asyncio.shield(task)
+
+    def stats(self) -> List[dict]:
+        rows = [
+            {"key": key, "flights": s.flights, "callers": s.callers, "merged": s.merged}
+            for key, s in self._stats.items()
+        ]
+        return sorted(rows, key=lambda row: row["merged"], reverse=True)
+
+    def clear(self) -> None:
+        self._inflight.clear()
+        self._stats.clear()
+
+    def _stats_for(self, key: str) -> FlightStats:
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = FlightStats()
+            while len(self._stats) > self.max_keys:
+                self._stats.popitem(last=False)
+        else:
+            self._stats.move_to_end(key)
+        return stats
+
+    def _landed(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Every waiter may have been cancelled; don't warn about an unread error.
+        if not task.cancelled():
+            task.exception()
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,100 @@
+"""
+Reconciliation of the counters denormalized onto posts.
+
+`comments_count`, `last_activity_at` and `reports_count` are maintained
+with atomic updates as comments and reports are written. This job
+recomputes all of them in bulk from the comments and reports collections
+and rewrites only the posts that drifted. Run it after imports, manual data
+fixes or on a schedule:
+
+    python -m src.infrastructure.database.counters
+    python -m src.infrastructure.database.counters --dry-run
+"""
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+from typing import Dict
+
+from pymongo import UpdateOne
+
+BULK_WRITE_SIZE = 1000
+
+
+@dataclass
+class CounterReport:
+    scanned: int = 0
+    fixed: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.fixed} of {self.scanned} posts had drifted counters"
+
+
+async def reconcile_post_counters(database, dry_run: bool = False) -> CounterReport:
+    comments: Dict[str, dict] = {}
+    async for row in database["comments"].aggregate([
+        {"$group": {"_id": "$post_id", "count": {"$sum": 1}, "last": {"$max": "$created_at"}}},
+    ]):
+        comments[str(row["_id"])] = row
+
+    reports: Dict[str, int] = {}
+    async for row in database["reports"].aggregate([
+        {"$match": {"target_type": "post"}},
+        {"$group": {"_id": "$target_id", "count": {"$sum": 1}}},
+    ]):
+        reports[str(row["_id"])] = row["count"]
+
+    report = CounterReport()
+    batch = []
+    projection = {"comments_count": 1, "last_activity_at": 1, "reports_count": 1}
+    async for post in database["posts"].find({}, projection=projection):
+        report.scanned += 1
+        post_id = str(post["_id"])
+        stats = comments.get(post_id, {})
+        expected = {
+            "comments_count": stats.get("count", 0),
+            "last_activity_at": stats.get("last"),
+            "reports_count": reports.get(post_id, 0),
+        }
+        if all(post.get(field) == value for field, value in expected.items()):
+            continue
+
+        report.fixed += 1
+        batch.append(UpdateOne({"_id": post["_id"]}, {"$set": expected}))
+        if len(batch) >= BULK_WRITE_SIZE:
+            await _flush(database, batch, dry_run)
+            batch = []
+
+    await _flush(database, batch, dry_run)
+    return report
+
+
+async def _flush(database, batch, dry_run: bool) -> None:
+    if batch and not dry_run:
+        await database["posts"].bulk_write(batch, ordered=False)
+
+
+async def _run_cli(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_uri)
+    try:
+        report = await reconcile_post_counters(client[args.mongo_db], dry_run=args.dry_run)
+    finally:
+        client.close()
+
+    print(("✅ " if not report.fixed else "⚠️  ") + str(report) + (" (dry run)" if args.dry_run else ""))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute the comment and report counters stored on posts.")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--mongo-db", default=os.getenv("MONGO_DB", "lost_and_found_v2"))
+    parser.add_argument("--dry-run", action="store_true", help="only count drifted posts")
+    return asyncio.run(_run_cli(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
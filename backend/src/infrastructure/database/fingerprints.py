@@ -0,0 +1,104 @@
+"""
+Backfill of the near-duplicate fingerprints stored on posts.
+
+Posts written before fingerprinting existed have no `fingerprint` or
+`fingerprint_bands`, so new posts cannot be compared with them. This job
+computes the missing ones in bulk (or all of them with --recompute) and,
+with --flag-duplicates, marks every post that near-duplicates an earlier
+post of the same publisher and type:
+
+    python -m src.infrastructure.database.fingerprints
+    python -m src.infrastructure.database.fingerprints --recompute --flag-duplicates
+"""
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass
+
+from pymongo import ASCENDING, UpdateOne
+
+from src.infrastructure.search.fingerprint import DuplicateBuckets, fingerprint_bands, post_fingerprint
+
+BULK_WRITE_SIZE = 1000
+MIN_SIMILARITY = float(os.getenv("DUPLICATE_MIN_SIMILARITY", "0.7"))
+
+
+@dataclass
+class FingerprintReport:
+    scanned: int = 0
+    fingerprinted: int = 0
+    duplicates: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.fingerprinted} of {self.scanned} posts fingerprinted, {self.duplicates} flagged as duplicates"
+
+
+async def backfill_fingerprints(database, recompute: bool = False, flag_duplicates: bool = False) -> FingerprintReport:
+    report = FingerprintReport()
+    # Same LSH buckets as the live check, held in memory for one pass in
+    # creation order so the earliest post of a group stays the original.
+    buckets = DuplicateBuckets(MIN_SIMILARITY)
+    batch = []
+
+    projection = {"publisher_username": 1, "type": 1, "title": 1, "description": 1, "tag": 1, "fingerprint": 1, "duplicate_of": 1}
+    cursor = database["posts"].find({}, projection=projection).sort([("created_at", ASCENDING), ("_id", ASCENDING)])
+    async for post in cursor:
+        report.scanned += 1
+        update = {}
+
+        fingerprint = post.get("fingerprint")
+        if recompute or not fingerprint:
+            fingerprint = post_fingerprint(post.get("title"), post.get("description"), post.get("tag"))
+            update["fingerprint"] = fingerprint
+            update["fingerprint_bands"] = fingerprint_bands(fingerprint)
+            report.fingerprinted += 1
+
+        owner = (post.get("publisher_username"), post.get("type"))
+        if flag_duplicates:
+            duplicate_of = buckets.best_match(owner, fingerprint)
+            if duplicate_of:
+                report.duplicates += 1
+            if duplicate_of != post.get("duplicate_of"):
+                update["duplicate_of"] = duplicate_of
+        buckets.add(owner, str(post["_id"]), fingerprint)
+
+        if update:
+            batch.append(UpdateOne({"_id": post["_id"]}, {"$set": update}))
+        if len(batch) >= BULK_WRITE_SIZE:
+            await database["posts"].bulk_write(batch, ordered=False)
+            batch = []
+
+    if batch:
+        await database["posts"].bulk_write(batch, ordered=False)
+    return report
+
+
+async def _run_cli(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(args.mongo_uri)
+    try:
+        report = await backfill_fingerprints(
+            client[args.mongo_db],
+            recompute=args.recompute,
+            flag_duplicates=args.flag_duplicates,
+        )
+    finally:
+        client.close()
+
+    print(f"✅ {report}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compute near-duplicate fingerprints for existing posts.")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--mongo-db", default=os.getenv("MONGO_DB", "lost_and_found_v2"))
+    parser.add_argument("--recompute", action="store_true", help="recompute fingerprints that already exist")
+    parser.add_argument("--flag-duplicates", action="store_true", help="set duplicate_of on later near-duplicates")
+    return asyncio.run(_run_cli(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
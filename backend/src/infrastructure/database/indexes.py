@@ -0,0 +1,239 @@
+"""
+Index management for the Beanie documents.
+
+Indexes are declared on each document's `Settings.indexes`. This module
+compares those declarations with what the database actually has, creates
+the missing ones and reports drift. It owns index creation: at startup
+`init_documents` syncs the indexes and then initializes Beanie with its own
+index step switched off. It also runs as a CLI against any database:
+
+    python -m src.infrastructure.database.indexes --check
+    python -m src.infrastructure.database.indexes --drop-extra --rebuild-conflicting
+    python -m src.infrastructure.database.indexes --dedupe reports
+
+An index that cannot be built (a unique index over existing duplicates) is
+reported as failed instead of stopping the app; --dedupe deletes the
+duplicates of a collection, keeping the oldest document of each group.
+"""
+import argparse
+import asyncio
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from beanie.odm.utils.init import Initializer
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+# Options that change index semantics; anything else (v, ns, background...)
+# is ignored when comparing.
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+class IndexDriftError(Exception):
+    pass
+
+
+@dataclass
+class IndexDrift:
+    collection: str
+    missing: List[str] = field(default_factory=list)
+    extra: List[str] = field(default_factory=list)
+    conflicting: List[str] = field(default_factory=list)
+    # Set by sync_indexes: declared indexes the server refused to build.
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not (self.missing or self.extra or self.conflicting or self.failed)
+
+    def __str__(self) -> str:
+        if self.clean:
+            return f"{self.collection}: in sync"
+        parts = []
+        if self.missing:
+            parts.append(f"missing {', '.join(self.missing)}")
+        if self.conflicting:
+            parts.append(f"conflicting {', '.join(self.conflicting)}")
+        if self.extra:
+            parts.append(f"undeclared {', '.join(self.extra)}")
+        if self.failed:
+            parts.append(f"failed to build {', '.join(self.failed)} (see --dedupe {self.collection})")
+        return f"{self.collection}: " + "; ".join(parts)
+
+
+def _normalize(key, options: dict) -> Tuple:
+    key = list(key.items()) if hasattr(key, "items") else list(key)
+    # The server reports text indexes as _fts/_ftsx plus a weights map.
+    if "weights" in options:
+        key = [(name, "text") for name in options["weights"]]
+    if any(direction == "text" for _, direction in key):
+        key = sorted((name, "text") for name, direction in key if direction == "text")
+    opts = tuple(sorted((k, str(options[k])) for k in COMPARED_OPTIONS if k in options))
+    return tuple(key), opts
+
+
+def _declared(model) -> Dict[str, IndexModel]:
+    indexes = getattr(model.Settings, "indexes", None) or []
+    return {index.document["name"]: index for index in indexes}
+
+
+async def check_indexes(database, models: Sequence) -> List[IndexDrift]:
+    drifts = []
+    for model in models:
+        collection = database[model.Settings.name]
+        existing = await collection.index_information()
+        existing.pop("_id_", None)
+        declared = _declared(model)
+
+        drift = IndexDrift(collection=model.Settings.name)
+        for name, index in declared.items():
+            spec = dict(index.document)
+            if name not in existing:
+                drift.missing.append(name)
+            elif _normalize(spec.pop("key"), spec) != _normalize(existing[name]["key"], existing[name]):
+                drift.conflicting.append(name)
+        drift.extra = [name for name in existing if name not in declared]
+        drifts.append(drift)
+    return drifts
+
+
+async def sync_indexes(
+    database,
+    models: Sequence,
+    drop_extra: bool = False,
+    rebuild_conflicting: bool = False,
+) -> List[IndexDrift]:
+    """
+    Creates missing indexes and returns the drift found before syncing, plus
+    the indexes that failed to build. Conflicting indexes (same name,
+    different definition) abort unless `rebuild_conflicting` is set, since
+    rebuilding a unique index on a large collection is not something to do
+    implicitly on boot.
+    """
+    drifts = await check_indexes(database, models)
+
+    conflicts = [d for d in drifts if d.conflicting]
+    if conflicts and not rebuild_conflicting:
+        raise IndexDriftError(
+            "Index definitions differ from the database: "
+            + "; ".join(str(d) for d in conflicts)
+            + ". Run `python -m src.infrastructure.database.indexes --rebuild-conflicting`."
+        )
+
+    for model, drift in zip(models, drifts):
+        collection = database[model.Settings.name]
+        declared = _declared(model)
+
+        for name in drift.conflicting:
+            await collection.drop_index(name)
+        if drop_extra:
+            for name in drift.extra:
+                await collection.drop_index(name)
+
+        # One at a time, so an index the data violates does not hold back the rest.
+        for name in drift.missing + drift.conflicting:
+            try:
+                await collection.create_indexes([declared[name]])
+            except OperationFailure as e:
+                drift.failed.append(f"{name}: {e}")
+
+    return drifts
+
+
+class _DocumentInitializer(Initializer):
+    # sync_indexes already built (or reported) every declared index; Beanie
+    # would otherwise build them a second time and fail on the ones the
+    # data violates.
+    async def init_indexes(self, cls, allow_index_dropping: bool = False):
+        return None
+
+
+async def init_documents(database, models: Sequence) -> List[IndexDrift]:
+    """
+    Syncs the indexes of `models`, then initializes Beanie for them without
+    touching indexes. Returns the drift from sync_indexes, so an index that
+    cannot be built is reported while the app still starts.
+    """
+    drifts = await sync_indexes(database, models)
+    await _DocumentInitializer(database=database, document_models=list(models))
+    return drifts
+
+
+async def dedupe_unique(database, models: Sequence, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Deletes the documents that keep each declared unique index of `models`
+    from being built, keeping the oldest (lowest _id) of every group of
+    duplicates. Returns how many were (or, with dry_run, would be) deleted
+    per index.
+    """
+    removed = {}
+    for model in models:
+        collection = database[model.Settings.name]
+        for name, index in _declared(model).items():
+            spec = index.document
+            if not spec.get("unique"):
+                continue
+            key = {f"k{i}": f"${path}" for i, path in enumerate(spec["key"])}
+            pipeline = [
+                {"$sort": {"_id": 1}},
+                {"$group": {"_id": key, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+            ]
+            extra = []
+            async for group in collection.aggregate(pipeline):
+                extra.extend(group["ids"][1:])
+            if extra and not dry_run:
+                await collection.delete_many({"_id": {"$in": extra}})
+            removed[f"{model.Settings.name}.{name}"] = len(extra)
+    return removed
+
+
+async def _run_cli(args) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from src.infrastructure.database.models import DOCUMENT_MODELS
+
+    client = AsyncIOMotorClient(args.mongo_uri)
+    try:
+        database = client[args.mongo_db]
+        if args.dedupe:
+            chosen = [model for model in DOCUMENT_MODELS if model.Settings.name in args.dedupe]
+            for index, count in (await dedupe_unique(database, chosen, dry_run=args.check)).items():
+                print(("⚠️  " if count else "✅ ") + f"{index}: {count} duplicates" + (" found" if args.check else " deleted"))
+        if args.check:
+            drifts = await check_indexes(database, DOCUMENT_MODELS)
+        else:
+            drifts = await sync_indexes(
+                database,
+                DOCUMENT_MODELS,
+                drop_extra=args.drop_extra,
+                rebuild_conflicting=args.rebuild_conflicting,
+            )
+    except IndexDriftError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        client.close()
+
+    for drift in drifts:
+        print(("✅ " if drift.clean else "⚠️  ") + str(drift))
+    return 1 if args.check and not all(d.clean for d in drifts) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check or create the declared MongoDB indexes.")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--mongo-db", default=os.getenv("MONGO_DB", "lost_and_found_v2"))
+    parser.add_argument("--check", action="store_true", help="only report drift; exit 1 if any")
+    parser.add_argument("--drop-extra", action="store_true", help="drop indexes that are not declared")
+    parser.add_argument("--rebuild-conflicting", action="store_true", help="drop and recreate indexes whose definition changed")
+    parser.add_argument(
+        "--dedupe", action="append", default=[], metavar="COLLECTION",
+        help="delete documents duplicating a unique index of COLLECTION, keeping the oldest (with --check, only count them)",
+    )
+    return asyncio.run(_run_cli(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+from src.infrastructure.database.models.user_document import UserDocument
+from src.infrastructure.database.models.otp_document import OTPDocument
+from src.infrastructure.database.models.category_document import CategoryDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.report_document import ReportDocument
+from src.infrastructure.database.models.email_outbox_document import EmailOutboxDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+
+DOCUMENT_MODELS = [
+    UserDocument,
+    OTPDocument,
+    CategoryDocument,
+    PostDocument,
+    CommentDocument,
+    ReportDocument,
+    EmailOutboxDocument,
+    PostMatchDocument,
+]
@@ -2,14 +2,25 @@ from beanie import Document, PydanticObjectId
 from datetime import datetime
 from typing import Optional
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 class CommentDocument(Document):
     post_id: str  
     publisher_username: str  
     content: str
     parent_id: Optional[str] = None
+    # Materialized path: "<root id>/<child id>/..." built from ObjectIds, so
+    # sorting by path gives each thread depth-first in creation order.
+    root_id: Optional[str] = None
+    path: Optional[str] = None
+    depth: int = 0
     reports_count: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
-        name = "comments"
\ No newline at end of file
+        name = "comments"
+        indexes = [
+            IndexModel([("post_id", ASCENDING), ("created_at", ASCENDING)]),
+            IndexModel([("post_id", ASCENDING), ("path", ASCENDING)]),
+            IndexModel([("post_id", ASCENDING), ("depth", ASCENDING), ("path", ASCENDING)]),
+        ]
\ No newline at end of file
@@ -0,0 +1,30 @@
+from beanie import Document
+from datetime import datetime
+from typing import Optional
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class EmailOutboxDocument(Document):
+    to: str
+    subject: str
+    # Emptied once the message leaves the queue; OTP mails carry the code.
+    html: str
+    status: str = Field(default="pending", pattern="^(pending|sending|sent|failed|expired)$")
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    # Messages still undelivered at this point are dropped, not sent late.
+    expires_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Settings:
+        name = "email_outbox"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)]),
+            # TTL cleanup of sent, failed and expired messages after a week;
+            # pending ones have no finished_at and are never removed.
+            IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=7 * 24 * 3600),
+        ]
@@ -1,5 +1,6 @@
 from beanie import Document
 from datetime import datetime, timedelta
+from pymongo import ASCENDING, IndexModel
 
 class OTPDocument(Document):
     email: str
@@ -7,4 +8,11 @@ class OTPDocument(Document):
     expire_at: datetime
 
     class Settings:
-        name = "otp_codes"
\ No newline at end of file
+        name = "otp_codes"
+        indexes = [
+            IndexModel([("email", ASCENDING)]),
+            # TTL cleanup of stale codes. The hour of grace keeps recently
+            # expired codes around so registration can say "expired"
+            # instead of "invalid".
+            IndexModel([("expire_at", ASCENDING)], expireAfterSeconds=3600),
+        ]
\ No newline at end of file
@@ -1,5 +1,7 @@
 from beanie import Document
-from typing import Optional
+from pymongo import ASCENDING, DESCENDING, GEO2D, GEOSPHERE, IndexModel
+from typing import Dict, List, Optional
+from pydantic import Field
 from datetime import datetime
 
 from src.infrastructure.database.models.geo_location import GeoLocation
@@ -17,8 +19,43 @@ class PostDocument(Document):
     location: Optional[GeoLocation] = None
 
     image_url: Optional[str] = None
+    # Set by uploads to the image store: SHA-256 of the original and the
+    # URL of each thumbnail size ("small", "medium", "large").
+    image_hash: Optional[str] = None
+    thumbnails: Dict[str, str] = Field(default_factory=dict)
     reports_count: int = 0
     created_at: datetime
 
+    # Denormalized from the comments collection (last_activity_at is the
+    # newest comment's created_at); kept current with atomic updates on
+    # write and recomputed by database.counters.
+    comments_count: int = 0
+    last_activity_at: Optional[datetime] = None
+
+    # MinHash of title+tag+description and its LSH band keys; a post whose
+    # bands collide with an earlier one by the same publisher is a
+    # near-duplicate candidate (see search.fingerprint).
+    fingerprint: Optional[List[int]] = None
+    fingerprint_bands: List[str] = Field(default_factory=list)
+    duplicate_of: Optional[str] = None
+
     class Settings:
         name = "posts"
+        # Listing indexes end in (created_at, _id) descending to serve the
+        # keyset pagination sort without an in-memory SORT stage (walked
+        # backwards for oldest first). /posts/query filters on type alone or
+        # with a category more than anything else; other combinations use
+        # the single-field prefix they include and filter the rest on fetch.
+        indexes = [
+            IndexModel([("location", GEOSPHERE)], name="location_2dsphere"),
+            # Bounding-box queries use a planar $box, which only a 2d index
+            # serves; the upper bound is exclusive, hence the margin past 180.
+            IndexModel([("location.coordinates", GEO2D)], name="location_coordinates_2d", min=-180.0, max=180.000001),
+            IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("type", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("type", ASCENDING), ("category_key", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("publisher_username", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("category_key", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("tag", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+            IndexModel([("publisher_username", ASCENDING), ("fingerprint_bands", ASCENDING)]),
+        ]
@@ -0,0 +1,24 @@
+from beanie import Document
+from datetime import datetime
+from typing import Optional
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+
+class PostMatchDocument(Document):
+    lost_id: str
+    found_id: str
+    score: float
+    text_score: float = 0.0
+    distance_m: Optional[float] = None
+    days_apart: float = 0.0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "post_matches"
+        # A pair is stored once and read from either side, best first.
+        indexes = [
+            IndexModel([("lost_id", ASCENDING), ("found_id", ASCENDING)], unique=True),
+            IndexModel([("lost_id", ASCENDING), ("score", DESCENDING)]),
+            IndexModel([("found_id", ASCENDING), ("score", DESCENDING)]),
+        ]
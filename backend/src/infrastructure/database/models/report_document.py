@@ -1,6 +1,7 @@
 from beanie import Document, PydanticObjectId
 from datetime import datetime
 from pydantic import Field
+from pymongo import ASCENDING, IndexModel
 
 class ReportDocument(Document):
     reporter_username: str  
@@ -10,4 +11,12 @@ class ReportDocument(Document):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
-        name = "reports"
\ No newline at end of file
+        name = "reports"
+        indexes = [
+            IndexModel([("target_id", ASCENDING)]),
+            # One report per user per target. Databases from before this
+            # index may hold duplicates: `python -m
+            # src.infrastructure.database.indexes --dedupe reports`, then
+            # database.counters to recount reports_count.
+            IndexModel([("reporter_username", ASCENDING), ("target_id", ASCENDING)], unique=True),
+        ]
\ No newline at end of file
@@ -1,5 +1,6 @@
 from beanie import Document
 from typing import Optional
+from pymongo import ASCENDING, IndexModel
 
 class UserDocument(Document):
     email: str
@@ -8,4 +9,8 @@ class UserDocument(Document):
     is_active: bool = True
 
     class Settings:
-        name = "users" 
\ No newline at end of file
+        name = "users"
+        indexes = [
+            IndexModel([("username", ASCENDING)], unique=True),
+            IndexModel([("email", ASCENDING)], unique=True),
+        ] 
\ No newline at end of file
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, Optional, Set, Tuple
+
+from src.domain.entities.geo_location import BoundingBox
+
+TOPICS = frozenset({"posts", "comments", "reports"})
+
+
+class SlowConsumerError(Exception):
+    pass
+
+
+@dataclass
+class Event:
+    id: int
+    topic: str                  # "posts" | "comments" | "reports"
+    name: str                   # e.g. "post.created", "comment.deleted"
+    post_id: Optional[str]
+    data: dict
+    point: Optional[Tuple[float, float]] = None   # (lng, lat) of the post
+
+    def to_json(self) -> str:
+        return json.dumps({"id": self.id, "event": self.name, "data": self.data}, ensure_ascii=False, default=str)
+
+
+@dataclass(eq=False)
+class Subscription:
+    """
+    One client's filter and bounded queue of pending events. Events replayed
+    on reconnect wait in `backlog` instead, so a gap longer than the queue
+    does not drop the client straight away.
+    """
+    topics: FrozenSet[str]
+    bbox: Optional[BoundingBox] = None
+    post_ids: FrozenSet[str] = frozenset()
+    queue: asyncio.Queue = field(default_factory=asyncio.Queue)
+    backlog: Deque[Event] = field(default_factory=deque)
+    dropped: bool = False
+
+    def matches(self, event: Event) -> bool:
+        if event.topic not in self.topics:
+            return False
+        if self.post_ids and event.post_id not in self.post_ids:
+            return False
+        if self.bbox:
+            if event.point is None:
+                return False
+            lng, lat = event.point
+            box = self.bbox
+            return box.min_lng <= lng <= box.max_lng and box.min_lat <= lat <= box.max_lat
+        return True
+
+    async def next(self, timeout: float) -> Optional[Event]:
+        """The next event, or None after `timeout` seconds of silence."""
+        if self.backlog:
+            return self.backlog.popleft()
+        if self.dropped:
+            raise SlowConsumerError("Client fell too far behind")
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBus:
+    """
+    In-process pub/sub for live updates.
+
+    Publishing never awaits: each matching subscriber gets the event with
+    put_nowait on a bounded queue, and a subscriber whose queue is full is
+    dropped rather than slowing everyone down (it reconnects with
+    Last-Event-ID and is replayed from the recent history). Subscriptions
+    filtered by post id are indexed by it, so an idle connection watching
+    one post costs a queue and a dict entry.
+    """
+
+    def __init__(self, max_queue: int = 100, history: int = 1000):
+        self.max_queue = max_queue
+        self._history: Deque[Event] = deque(maxlen=history)
+        self._last_id = 0
+        self._broad: Set[Subscription] = set()
+        self._by_post: Dict[str, Set[Subscription]] = {}
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._broad) + len({s for subs in self._by_post.values() for s in subs})
+
+    def subscribe(
+        self,
+        topics: Optional[Set[str]] = None,
+        bbox: Optional[BoundingBox] = None,
+        post_ids: Optional[Set[str]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Subscription:
+        sub = Subscription(
+            topics=frozenset(topics or TOPICS),
+            bbox=bbox,
+            post_ids=frozenset(post_ids or ()),
+            queue=asyncio.Queue(maxsize=self.max_queue),
+        )
+        if sub.post_ids:
+            for post_id in sub.post_ids:
+                self._by_post.setdefault(post_id, set()).add(sub)
+        else:
+            self._broad.add(sub)
+
+        if last_event_id is not None:
+            self._replay(sub, last_event_id)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._broad.discard(sub)
+        for post_id in sub.post_ids:
+            subs = self._by_post.get(post_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_post[post_id]
+
+    def publish(self, topic: str, name: str, data: dict, post_id: Optional[str] = None, location=None) -> Event:
+        self._last_id += 1
+        event = Event(id=self._last_id, topic=topic, name=name, post_id=post_id, data=data, point=_point(location))
+        self._history.append(event)
+
+        targets = list(self._broad)
+        if post_id is not None:
+            targets.extend(self._by_post.get(post_id, ()))
+        for sub in targets:
+            if sub.matches(event):
+                self._deliver(sub, event)
+        return event
+
+    def clear(self) -> None:
+        self._last_id = 0
+        self._history.clear()
+        self._broad.clear()
+        self._by_post.clear()
+
+    def _replay(self, sub: Subscription, last_event_id: int) -> None:
+        oldest = self._history[0].id if self._history else self._last_id + 1
+        if last_event_id > self._last_id or last_event_id < oldest - 1:
+            # Missed events are gone (or ids restarted): the client must refetch.
+            sub.backlog.append(Event(id=self._last_id, topic="", name="reset", post_id=None, data={}))
+            return
+        # Bounded by the history, not the queue; live events still queue behind it.
+        sub.backlog.extend(e for e in self._history if e.id > last_event_id and sub.matches(e))
+
+    def _deliver(self, sub: Subscription, event: Event) -> None:
+        if sub.dropped:
+            return
+        try:
+            sub.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            sub.dropped = True
+            self.dropped += 1
+            self.unsubscribe(sub)
+
+
+def _point(location) -> Optional[Tuple[float, float]]:
+    if not location:
+        return None
+    coords = location.get("coordinates") if isinstance(location, dict) else getattr(location, "coordinates", None)
+    if not coords or len(coords) < 2:
+        return None
+    return coords[0], coords[1]
+
+
+event_bus = EventBus(
+    max_queue=int(os.getenv("EVENTS_CLIENT_QUEUE", "100")),
+    history=int(os.getenv("EVENTS_HISTORY", "1000")),
+)
@@ -0,0 +1,160 @@
+import json
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.domain.entities.geo_location import BoundingBox
+
+Row = dict
+RenderItem = Callable[[Row], dict]
+
+
+class MapSnapshot:
+    """
+    Every post's map row (the MAP_PROJECTION fields) held in memory, with
+    each item's JSON and the full response body cached.
+
+    Writes patch single rows and drop only that item's encoding and the
+    joined body; the next read re-encodes the one item and joins bytes.
+    `version` increases with every change. Writes arriving while a load is
+    reading the collection are queued and replayed on top of it.
+    """
+
+    def __init__(self):
+        self._rows: Dict[str, Row] = {}
+        self._points: Dict[str, Tuple[float, float]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        self._body: Optional[bytes] = None
+        self._pending: Optional[List[Tuple[str, str, Optional[dict]]]] = None
+        self._epoch = 0
+        self.loaded = False
+        self.version = 0
+        self.built_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def loading(self) -> bool:
+        return self._pending is not None
+
+    def begin_load(self) -> None:
+        self._pending = []
+
+    def finish_load(self, rows: List[Row]) -> None:
+        pending, self._pending = self._pending or [], None
+        self._rows.clear()
+        self._points.clear()
+        self._encoded.clear()
+        for row in rows:
+            self._store(row)
+        self.loaded = True
+        for op, post_id, data in pending:
+            self._apply(op, post_id, data)
+        self.built_at = time.time()
+        self._changed()
+
+    def abort_load(self) -> None:
+        self._pending = None
+
+    def upsert(self, row: Row) -> None:
+        self._apply("upsert", str(row["_id"]), row)
+
+    def patch(self, post_id: str, **fields) -> None:
+        self._apply("patch", post_id, fields)
+
+    def remove(self, post_id: str) -> None:
+        self._apply("remove", post_id, None)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._points.clear()
+        self._encoded.clear()
+        self._body = None
+        self._pending = None
+        self.loaded = False
+        self.built_at = None
+
+    def render(self, render_item: RenderItem, bbox: Optional[BoundingBox] = None, epoch: int = 0) -> bytes:
+        """
+        JSON array of the rendered items, optionally only those inside bbox.
+        Encodings made under another `epoch` (e.g. before a category
+        changed) are discarded first.
+        """
+        if epoch != self._epoch:
+            self._epoch = epoch
+            self._encoded.clear()
+            self._changed()
+        if bbox is None:
+            if self._body is None:
+                self._body = self._join(self._rows, render_item)
+            return self._body
+
+        inside = [
+            post_id for post_id, (lng, lat) in self._points.items()
+            if bbox.min_lng <= lng <= bbox.max_lng and bbox.min_lat <= lat <= bbox.max_lat
+        ]
+        return self._join(inside, render_item)
+
+    def age(self) -> Optional[float]:
+        return time.time() - self.built_at if self.built_at else None
+
+    def _join(self, post_ids, render_item: RenderItem) -> bytes:
+        encoded = self._encoded
+        parts = []
+        for post_id in post_ids:
+            item = encoded.get(post_id)
+            if item is None:
+                item = encoded[post_id] = json.dumps(
+                    render_item(self._rows[post_id]), ensure_ascii=False, separators=(",", ":"),
+                ).encode()
+            parts.append(item)
+        return b"[" + b",".join(parts) + b"]"
+
+    def _apply(self, op: str, post_id: str, data: Optional[dict]) -> None:
+        if self._pending is not None:
+            self._pending.append((op, post_id, data))
+            return
+        if not self.loaded:
+            return
+
+        if op == "upsert":
+            self._store(data)
+        elif op == "patch":
+            row = self._rows.get(post_id)
+            if row is None:
+                return
+            row.update(data)
+        elif op == "remove":
+            if self._rows.pop(post_id, None) is None:
+                return
+            self._points.pop(post_id, None)
+        self._encoded.pop(post_id, None)
+        self.updated_at = time.time()
+        self._changed()
+
+    def _store(self, row: Row) -> None:
+        post_id = str(row["_id"])
+        self._rows[post_id] = row
+        coords = (row.get("location") or {}).get("coordinates")
+        if coords and len(coords) >= 2:
+            self._points[post_id] = (coords[0], coords[1])
+        else:
+            self._points.pop(post_id, None)
+
+    def _changed(self) -> None:
+        self._body = None
+        self.version += 1
+
+
+def as_stored(value: Optional[datetime]) -> Optional[datetime]:
+    """A datetime as it reads back from MongoDB: naive UTC, millisecond precision."""
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+map_snapshot = MapSnapshot()
@@ -0,0 +1,69 @@
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from src.infrastructure.map.vector_tile import tile_for_point
+
+MAX_TILE_ZOOM = 22
+
+TileKey = Tuple[int, int, int]
+
+
+class TileCache:
+    """
+    LRU cache of encoded vector tiles keyed by (z, x, y).
+
+    Writes evict only the tiles that contain the written point, one per
+    zoom level, so the rest of the cache stays warm.
+    """
+
+    def __init__(self, max_tiles: int = 4096):
+        self.max_tiles = max_tiles
+        self._tiles: "OrderedDict[TileKey, bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Bumped by every invalidation; a tile rendered from a query that
+        # started before a write must not be cached.
+        self.generation = 0
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        key = (z, x, y)
+        tile = self._tiles.get(key)
+        if tile is None:
+            self.misses += 1
+            return None
+        self._tiles.move_to_end(key)
+        self.hits += 1
+        return tile
+
+    def put(self, z: int, x: int, y: int, tile: bytes, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        self._tiles[(z, x, y)] = tile
+        self._tiles.move_to_end((z, x, y))
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+
+    def invalidate_location(self, location) -> None:
+        """Evicts every cached tile containing a GeoJSON point (dict or model)."""
+        if not location:
+            return
+        coords = location.get("coordinates") if isinstance(location, dict) else getattr(location, "coordinates", None)
+        if not coords or len(coords) < 2:
+            return
+
+        self.generation += 1
+        lng, lat = coords[0], coords[1]
+        for z in range(MAX_TILE_ZOOM + 1):
+            x, y = tile_for_point(lng, lat, z)
+            self._tiles.pop((z, x, y), None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._tiles.clear()
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+
+tile_cache = TileCache(max_tiles=int(os.getenv("MAP_TILE_CACHE_SIZE", "4096")))
@@ -0,0 +1,173 @@
+import math
+from typing import Dict, Iterable, List, Tuple, Union
+
+from src.domain.entities.geo_location import BoundingBox
+
+# Minimal Mapbox Vector Tile (v2.1) encoder for point layers. Only the bits of
+# the protobuf schema needed for points are written by hand, so no protobuf
+# runtime is required.
+#
+#   Tile    { repeated Layer layers = 3; }
+#   Layer   { name = 1; features = 2; keys = 3; values = 4; extent = 5; version = 15; }
+#   Feature { id = 1; tags = 2 (packed); type = 3; geometry = 4 (packed); }
+#   Value   { string_value = 1; uint_value = 5; sint_value = 6; bool_value = 7; }
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+EXTENT = 4096
+MAX_LAT = 85.0511287798
+# Share of a tile added on each side when querying for it, so points on an
+# edge are fetched whichever way rounding goes; the encoder then keeps only
+# the points the tile owns.
+QUERY_BUFFER = 1 / 64
+
+_POINT = 1
+_MOVE_TO = 1
+
+PropertyValue = Union[str, int, bool]
+
+
+def tile_bounds(z: int, x: int, y: int) -> BoundingBox:
+    n = 2 ** z
+
+    def lat(row: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return BoundingBox(
+        min_lng=x / n * 360.0 - 180.0,
+        min_lat=lat(y + 1),
+        max_lng=(x + 1) / n * 360.0 - 180.0,
+        max_lat=lat(y),
+    )
+
+
+def tile_query_bounds(z: int, x: int, y: int) -> BoundingBox:
+    """
+    tile_bounds plus QUERY_BUFFER. The top and bottom rows reach the poles,
+    since points beyond MAX_LAT are clamped into them.
+    """
+    n = 2 ** z
+    bounds = tile_bounds(z, x, y)
+    pad_lng = (bounds.max_lng - bounds.min_lng) * QUERY_BUFFER
+    pad_lat = (bounds.max_lat - bounds.min_lat) * QUERY_BUFFER
+    return BoundingBox(
+        min_lng=max(-180.0, bounds.min_lng - pad_lng),
+        min_lat=-90.0 if y == n - 1 else max(-90.0, bounds.min_lat - pad_lat),
+        max_lng=min(180.0, bounds.max_lng + pad_lng),
+        max_lat=90.0 if y == 0 else min(90.0, bounds.max_lat + pad_lat),
+    )
+
+
+def _world_xy(lng: float, lat: float) -> Tuple[float, float]:
+    """Web Mercator position normalized to [0, 1] on both axes."""
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    sin_lat = math.sin(math.radians(lat))
+    wx = (lng + 180.0) / 360.0
+    wy = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return wx, wy
+
+
+def tile_for_point(lng: float, lat: float, z: int) -> Tuple[int, int]:
+    n = 2 ** z
+    wx, wy = _world_xy(lng, lat)
+    return min(int(wx * n), n - 1), min(int(wy * n), n - 1)
+
+
+def encode_point_layer(
+    name: str,
+    z: int,
+    x: int,
+    y: int,
+    features: Iterable[Tuple[float, float, Dict[str, PropertyValue]]],
+) -> bytes:
+    """
+    Encodes (lng, lat, properties) points into a single-layer tile.
+    Points that do not belong to tile z/x/y are skipped.
+    """
+    n = 2 ** z
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, PropertyValue], int] = {}
+    encoded_features: List[bytes] = []
+
+    for lng, lat, properties in features:
+        # Same ownership rule as tile_for_point, so each point lives in
+        # exactly one tile per zoom and cache invalidation stays exact.
+        if tile_for_point(lng, lat, z) != (x, y):
+            continue
+        wx, wy = _world_xy(lng, lat)
+        px = round((wx * n - x) * EXTENT)
+        py = round((wy * n - y) * EXTENT)
+
+        tags: List[int] = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault((type(value), value), len(values)))
+
+        geometry = [_command(_MOVE_TO, 1), _zigzag(px), _zigzag(py)]
+        feature = (
+            _packed(2, tags)
+            + _field_varint(3, _POINT)
+            + _packed(4, geometry)
+        )
+        encoded_features.append(feature)
+
+    if not encoded_features:
+        return b""
+
+    layer = _field_varint(15, 2) + _field_bytes(1, name.encode("utf-8"))
+    for feature in encoded_features:
+        layer += _field_bytes(2, feature)
+    for key in keys:
+        layer += _field_bytes(3, key.encode("utf-8"))
+    for (_, value) in values:
+        layer += _field_bytes(4, _encode_value(value))
+    layer += _field_varint(5, EXTENT)
+
+    return _field_bytes(3, layer)
+
+
+# ---------- protobuf wire format ----------
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def _field_varint(field: int, value: int) -> bytes:
+    return _varint(field << 3) + _varint(value)
+
+
+def _field_bytes(field: int, payload: bytes) -> bytes:
+    return _varint((field << 3) | 2) + _varint(len(payload)) + payload
+
+
+def _packed(field: int, values: List[int]) -> bytes:
+    if not values:
+        return b""
+    return _field_bytes(field, b"".join(_varint(v) for v in values))
+
+
+def _encode_value(value: PropertyValue) -> bytes:
+    if isinstance(value, bool):
+        return _field_varint(7, int(value))
+    if isinstance(value, int):
+        if value >= 0:
+            return _field_varint(5, value)
+        return _field_varint(6, _zigzag(value))
+    return _field_bytes(1, str(value).encode("utf-8"))
@@ -0,0 +1,246 @@
+import os
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.entities.post_match import PostMatch
+from src.infrastructure.search.persian_text import tokenize
+
+EARTH_RADIUS_M = 6_371_000.0
+SECONDS_PER_DAY = 86_400.0
+
+# Weights of the three signals in the final score (they sum to 1).
+TEXT_WEIGHT = 0.5
+DISTANCE_WEIGHT = 0.3
+TIME_WEIGHT = 0.2
+
+# How much each field contributes to a post's text vector.
+FIELD_WEIGHTS = {"title": 2.0, "tag": 2.0, "description": 1.0}
+# Character trigrams let inflected forms ("کیفم", "کیفی") still overlap.
+TRIGRAM_WEIGHT = 0.5
+
+OPPOSITE = {"lost": "found", "found": "lost"}
+
+
+def _epoch(value: Optional[datetime]) -> float:
+    if value is None:
+        return datetime.now(timezone.utc).timestamp()
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class _Pool:
+    """
+    Column arrays for the open posts of one (type, category_key). Rows are
+    appended into spare capacity and removed by moving the last row into
+    the hole, so writes never copy the whole pool.
+    """
+
+    def __init__(self, dims: int, capacity: int = 64):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.lat = np.zeros(capacity)
+        self.lng = np.zeros(capacity)
+        self.has_location = np.zeros(capacity, dtype=bool)
+        self.ts = np.zeros(capacity)
+        self.vectors = np.zeros((capacity, dims), dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def put(self, post_id: str, lat: float, lng: float, has_location: bool, ts: float, vector: np.ndarray) -> None:
+        row = self.rows.get(post_id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.ts):
+                self._grow()
+            self.ids.append(post_id)
+            self.rows[post_id] = row
+        self.lat[row] = lat
+        self.lng[row] = lng
+        self.has_location[row] = has_location
+        self.ts[row] = ts
+        self.vectors[row] = vector
+
+    def remove(self, post_id: str) -> None:
+        row = self.rows.pop(post_id, None)
+        if row is None:
+            return
+        last = len(self.ids) - 1
+        if row != last:
+            moved = self.ids[last]
+            self.ids[row] = moved
+            self.rows[moved] = row
+            for column in (self.lat, self.lng, self.has_location, self.ts, self.vectors):
+                column[row] = column[last]
+        self.ids.pop()
+
+    def _grow(self) -> None:
+        capacity = len(self.ts) * 2
+        self.lat = np.resize(self.lat, capacity)
+        self.lng = np.resize(self.lng, capacity)
+        self.has_location = np.resize(self.has_location, capacity)
+        self.ts = np.resize(self.ts, capacity)
+        vectors = np.zeros((capacity, self.vectors.shape[1]), dtype=np.float32)
+        vectors[:len(self.ids)] = self.vectors[:len(self.ids)]
+        self.vectors = vectors
+
+
+class MatchEngine:
+    """
+    Scores a post against every open post of the opposite type in the same
+    category using NumPy column arrays:
+
+    - text: cosine of hashed bag-of-words/trigram vectors
+    - distance: exp(-d / distance_scale_m), haversine d; posts farther than
+      max_distance_m are dropped
+    - time: linear decay to 0 at window_days; posts outside it are dropped
+
+    The repository keeps the pools current on every post write and loads
+    them from the collection when `ready` is False.
+    """
+
+    def __init__(
+        self,
+        dims: int = 256,
+        window_days: float = 60.0,
+        max_distance_m: float = 20_000.0,
+        distance_scale_m: float = 2_000.0,
+        min_score: float = 0.25,
+    ):
+        self.dims = dims
+        self.window_days = window_days
+        self.max_distance_m = max_distance_m
+        self.distance_scale_m = distance_scale_m
+        self.min_score = min_score
+        self.ready = False
+        self._pools: Dict[Tuple[str, str], _Pool] = {}
+        self._where: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def add(
+        self,
+        post_id: str,
+        post_type: str,
+        category_key: str,
+        coordinates: Optional[Sequence[float]],
+        created_at: Optional[datetime],
+        title: str = "",
+        description: str = "",
+        tag: Optional[str] = "",
+    ) -> None:
+        if post_type not in OPPOSITE:
+            return
+        key = (post_type, category_key)
+        if self._where.get(post_id) != key:
+            self.remove(post_id)
+
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _Pool(self.dims)
+
+        lat, lng, has_location = self._point(coordinates)
+        vector = self.vectorize(title, description, tag)
+        pool.put(post_id, lat, lng, has_location, _epoch(created_at), vector)
+        self._where[post_id] = key
+
+    def remove(self, post_id: str) -> None:
+        key = self._where.pop(post_id, None)
+        if key is not None:
+            self._pools[key].remove(post_id)
+
+    def clear(self) -> None:
+        self._pools.clear()
+        self._where.clear()
+        self.ready = False
+
+    def vectorize(self, title: str = "", description: str = "", tag: Optional[str] = "") -> np.ndarray:
+        vector = np.zeros(self.dims, dtype=np.float32)
+        for field, text in (("title", title), ("tag", tag), ("description", description)):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text or ""):
+                vector[zlib.crc32(token.encode("utf-8")) % self.dims] += weight
+                padded = f"#{token}#"
+                for i in range(len(padded) - 2):
+                    gram = "3:" + padded[i:i + 3]
+                    vector[zlib.crc32(gram.encode("utf-8")) % self.dims] += weight * TRIGRAM_WEIGHT
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(
+        self,
+        post_id: str,
+        post_type: str,
+        category_key: str,
+        coordinates: Optional[Sequence[float]],
+        created_at: Optional[datetime],
+        title: str = "",
+        description: str = "",
+        tag: Optional[str] = "",
+        limit: int = 10,
+    ) -> List[PostMatch]:
+        """Best `limit` open posts of the opposite type, highest score first."""
+        pool = self._pools.get((OPPOSITE.get(post_type), category_key))
+        if not pool:
+            return []
+        n = len(pool)
+
+        vector = self.vectorize(title, description, tag)
+        text = pool.vectors[:n] @ vector
+
+        days = np.abs(pool.ts[:n] - _epoch(created_at)) / SECONDS_PER_DAY
+        time_score = 1.0 - days / self.window_days
+
+        lat, lng, has_location = self._point(coordinates)
+        both_located = pool.has_location[:n] & has_location
+        dlat = pool.lat[:n] - lat
+        dlng = pool.lng[:n] - lng
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat) * np.cos(pool.lat[:n]) * np.sin(dlng / 2) ** 2
+        distance = 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+        # A post without a location is neither near nor far.
+        distance_score = np.where(both_located, np.exp(-distance / self.distance_scale_m), 0.5)
+
+        score = TEXT_WEIGHT * text + DISTANCE_WEIGHT * distance_score + TIME_WEIGHT * time_score
+        eligible = (days <= self.window_days) & (~both_located | (distance <= self.max_distance_m))
+        score = np.where(eligible, score, -np.inf)
+
+        k = min(limit, n)
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind="stable")]
+
+        matches = []
+        for row in top:
+            if score[row] < self.min_score:
+                break
+            other_id = pool.ids[row]
+            lost_id, found_id = (post_id, other_id) if post_type == "lost" else (other_id, post_id)
+            matches.append(PostMatch(
+                lost_id=lost_id,
+                found_id=found_id,
+                score=round(float(score[row]), 4),
+                text_score=round(float(text[row]), 4),
+                distance_m=round(float(distance[row]), 1) if both_located[row] else None,
+                days_apart=round(float(days[row]), 2),
+            ))
+        return matches
+
+    @staticmethod
+    def _point(coordinates: Optional[Sequence[float]]) -> Tuple[float, float, bool]:
+        if coordinates and len(coordinates) >= 2:
+            # GeoJSON: [longitude, latitude]
+            return float(np.radians(coordinates[1])), float(np.radians(coordinates[0])), True
+        return 0.0, 0.0, False
+
+
+match_engine = MatchEngine(
+    dims=int(os.getenv("MATCH_TEXT_DIMS", "256")),
+    window_days=float(os.getenv("MATCH_WINDOW_DAYS", "60")),
+    max_distance_m=float(os.getenv("MATCH_MAX_DISTANCE_M", "20000")),
+    distance_scale_m=float(os.getenv("MATCH_DISTANCE_SCALE_M", "2000")),
+    min_score=float(os.getenv("MATCH_MIN_SCORE", "0.25")),
+)
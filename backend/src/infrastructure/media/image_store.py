@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Longest edge in pixels of each generated thumbnail.
+THUMBNAIL_SIZES = {"small": 160, "medium": 480, "large": 1024}
+THUMBNAIL_QUALITY = 82
+
+# Magic bytes of the formats accepted for upload.
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+
+
+class InvalidImageError(Exception):
+    pass
+
+
+class ImageTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class StoredImage:
+    digest: str
+    extension: str
+    size: int
+    image_url: str
+    thumbnails: Dict[str, str] = field(default_factory=dict)
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    for signature, extension in _SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _make_thumbnails(source: str, targets: List[Tuple[int, str]], quality: int) -> None:
+    """Runs in a worker process: decodes once, writes one JPEG per size."""
+    from PIL import Image, ImageOps
+
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            for edge, path in targets:
+                thumb = image.copy()
+                thumb.thumbnail((edge, edge))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+                thumb.save(tmp, "JPEG", quality=quality, optimize=True, progressive=True)
+                os.replace(tmp, path)
+    except Image.DecompressionBombError as e:
+        # A small file that decodes to a huge bitmap.
+        raise ImageTooLargeError(f"Image dimensions are too large: {e}")
+
+
+def _discard(paths: List[str]) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class ImageStore:
+    """
+    Content-addressed image storage on local disk.
+
+    Uploads stream to a temp file while being hashed (SHA-256) and are then
+    moved to originals/<2 hex>/<digest>.<ext>; the same bytes uploaded twice
+    are stored once and reuse their thumbnails. Thumbnails are generated in
+    a process pool so decoding and resizing never block the event loop.
+    Files never change once written, so they can be cached forever.
+    """
+
+    def __init__(self, root: str, base_url: str = "/media", max_bytes: int = 10 * 1024 * 1024, workers: int = 2):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def save(self, chunks: AsyncIterator[bytes]) -> StoredImage:
+        tmp_dir = os.path.join(self.root, "tmp")
+        await asyncio.to_thread(os.makedirs, tmp_dir, exist_ok=True)
+        tmp = os.path.join(tmp_dir, uuid.uuid4().hex)
+
+        digest = hashlib.sha256()
+        size = 0
+        head = b""
+        try:
+            with open(tmp, "wb") as out:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageTooLargeError(f"Images are limited to {self.max_bytes} bytes")
+                    if len(head) < 16:
+                        head += chunk[:16]
+                    digest.update(chunk)
+                    await asyncio.to_thread(out.write, chunk)
+
+            extension = _sniff(head)
+            if extension is None:
+                raise InvalidImageError("Only JPEG, PNG, GIF and WebP images are accepted")
+
+            stored = StoredImage(digest=digest.hexdigest(), extension=extension, size=size, image_url="")
+            path = self.original_path(stored.digest, extension)
+            created = False
+            if os.path.exists(path):
+                os.remove(tmp)
+            else:
+                await asyncio.to_thread(os.makedirs, os.path.dirname(path), exist_ok=True)
+                os.replace(tmp, path)
+                created = True
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        stored.image_url = self.url(os.path.relpath(path, self.root))
+        try:
+            stored.thumbnails = await self._thumbnails(stored.digest, path)
+        except (InvalidImageError, ImageTooLargeError):
+            # The bytes do not decode, so only the original this call wrote
+            # is dropped. Anything else (a cancelled request) leaves the
+            # files: originals are shared by identical uploads, and the next
+            # one regenerates whichever thumbnail is missing.
+            if created:
+                await asyncio.to_thread(_discard, [path])
+            raise
+        return stored
+
+    def original_path(self, digest: str, extension: str) -> str:
+        return os.path.join(self.root, "originals", digest[:2], f"{digest}.{extension}")
+
+    def thumbnail_path(self, digest: str, size: str) -> str:
+        return os.path.join(self.root, "thumbs", size, digest[:2], f"{digest}.jpg")
+
+    def url(self, relative_path: str) -> str:
+        return f"{self.base_url}/{relative_path.replace(os.sep, '/')}"
+
+    def resolve(self, relative_path: str) -> Optional[str]:
+        """Absolute path of a stored file, or None if it escapes the store or is missing."""
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, relative_path))
+        if not path.startswith(root + os.sep):
+            return None
+        if os.path.relpath(path, root).split(os.sep)[0] not in ("originals", "thumbs"):
+            return None
+        return path if os.path.isfile(path) else None
+
+    async def _thumbnails(self, digest: str, source: str) -> Dict[str, str]:
+        paths = {size: self.thumbnail_path(digest, size) for size in THUMBNAIL_SIZES}
+        missing = [(THUMBNAIL_SIZES[size], path) for size, path in paths.items() if not os.path.exists(path)]
+        if missing:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor(), _make_thumbnails, source, missing, THUMBNAIL_QUALITY)
+            except (OSError, ValueError) as e:
+                # Pillow raises these for bytes that look like an image but do not decode.
+                await asyncio.to_thread(_discard, [path for _, path in missing])
+                raise InvalidImageError(f"Unreadable image: {e}")
+            except ImageTooLargeError:
+                await asyncio.to_thread(_discard, [path for _, path in missing])
+                raise
+        return {size: self.url(os.path.relpath(path, self.root)) for size, path in paths.items()}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+image_store = ImageStore(
+    root=os.getenv("MEDIA_ROOT", "media"),
+    base_url=os.getenv("MEDIA_BASE_URL", "/media"),
+    max_bytes=int(os.getenv("MEDIA_MAX_IMAGE_BYTES", str(10 * 1024 * 1024))),
+    workers=int(os.getenv("MEDIA_THUMBNAIL_WORKERS", "2")),
+)
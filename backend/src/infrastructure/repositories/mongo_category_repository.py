@@ -2,23 +2,16 @@ from typing import List
 
 from src.domain.entities.category import Category
 from src.domain.interfaces.repositories.ICategoryRepository import ICategoryRepository
+from src.infrastructure.cache.category_cache import category_cache
+from src.infrastructure.cache.collection_versions import collection_versions
 from src.infrastructure.database.models.category_document import CategoryDocument
 
 
 class MongoCategoryRepository(ICategoryRepository):
 
     async def list_all(self) -> List[Category]:
-        docs = await CategoryDocument.find_all().to_list()
-
-        return [
-            Category(
-                id=str(doc.id),
-                key=doc.key,
-                title_fa=doc.title_fa,
-                color_code=doc.color_code,
-            )
-            for doc in docs
-        ]
+        await self.ensure_category_cache()
+        return category_cache.all()
 
     async def create(self, category: Category) -> Category:
         doc = CategoryDocument(
@@ -28,6 +21,20 @@ class MongoCategoryRepository(ICategoryRepository):
         )
         await doc.insert()
 
+        created = self._to_entity(doc)
+        category_cache.put(created)
+        collection_versions.bump("categories")
+        return created
+
+    async def ensure_category_cache(self) -> None:
+        """Loads the category cache from the collection unless it is already live."""
+        if category_cache.ready:
+            return
+        docs = await CategoryDocument.find_all().to_list()
+        category_cache.load(self._to_entity(doc) for doc in docs)
+
+    @staticmethod
+    def _to_entity(doc: CategoryDocument) -> Category:
         return Category(
             id=str(doc.id),
             key=doc.key,
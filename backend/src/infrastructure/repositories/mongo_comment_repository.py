@@ -1,11 +1,220 @@
-from ..database.models.comment_document import CommentDocument
-from ..persistence import db 
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import ASCENDING, ReturnDocument
+
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.events.event_bus import event_bus
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.repositories.pagination import InvalidCursorError
+
+PATH_SEPARATOR = "/"
+# The character right after PATH_SEPARATOR; "<root>/" <= path < "<root>0"
+# selects exactly the replies under <root>.
+_PATH_UPPER = chr(ord(PATH_SEPARATOR) + 1)
+
+
+class InvalidCommentError(ValueError):
+    pass
+
+
+@dataclass
+class CommentThread:
+    comment: CommentDocument
+    replies: List[CommentDocument] = field(default_factory=list)
+    replies_cursor: Optional[str] = None
+
 
 class CommentRepository:
-    async def add_comment(self, comment: CommentDocument):
-        result = await db.comments.insert_one(comment.dict())
-        return str(result.inserted_id)
 
-    async def get_by_post(self, post_id: str):
-        cursor = db.comments.find({"post_id": post_id})
-        return await cursor.to_list(length=100)
\ No newline at end of file
+    async def add_comment(
+        self,
+        post_id: str,
+        publisher_username: str,
+        content: str,
+        parent_id: Optional[str] = None,
+    ) -> CommentDocument:
+        comment_id = PydanticObjectId()
+        comment = CommentDocument(
+            id=comment_id,
+            post_id=post_id,
+            publisher_username=publisher_username,
+            content=content,
+            parent_id=parent_id,
+        )
+
+        if parent_id:
+            parent = await self._get(parent_id)
+            if parent is None or parent.post_id != post_id:
+                raise InvalidCommentError("Parent comment not found on this post")
+            comment.root_id = parent.root_id or str(parent.id)
+            comment.path = f"{parent.path or parent.id}{PATH_SEPARATOR}{comment_id}"
+            comment.depth = parent.depth + 1
+        else:
+            comment.root_id = str(comment_id)
+            comment.path = str(comment_id)
+
+        await comment.insert()
+        location = await self._bump_post(post_id, 1, comment.created_at)
+        event_bus.publish("comments", "comment.created", {
+            "id": str(comment.id),
+            "post_id": post_id,
+            "parent_id": parent_id,
+            "root_id": comment.root_id,
+            "depth": comment.depth,
+            "publisher_username": publisher_username,
+            "content": content,
+            "created_at": comment.created_at,
+        }, post_id=post_id, location=location)
+        return comment
+
+    async def delete(self, comment_id: str) -> None:
+        comment = await self._get(comment_id)
+        if comment:
+            await comment.delete()
+            location = await self._bump_post(comment.post_id, -1)
+            event_bus.publish(
+                "comments", "comment.deleted", {"id": comment_id, "post_id": comment.post_id},
+                post_id=comment.post_id, location=location,
+            )
+
+    async def get_threads(
+        self,
+        post_id: str,
+        limit: int,
+        replies_per_thread: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[CommentThread], Optional[str]]:
+        """
+        One page of top-level comments, oldest first, each with its first
+        `replies_per_thread` replies. Two queries whatever the thread depth.
+        """
+        query = {"post_id": post_id, "depth": 0}
+        if cursor:
+            self._check_id(cursor)
+            query["path"] = {"$gt": cursor}
+
+        roots = await CommentDocument.find(query).sort([("path", ASCENDING)]).limit(limit + 1).to_list()
+        next_cursor = None
+        if len(roots) > limit:
+            roots = roots[:limit]
+            next_cursor = roots[-1].path
+
+        threads = [CommentThread(comment=root) for root in roots]
+        if not roots or replies_per_thread == 0:
+            return threads, next_cursor
+
+        # One round trip for every thread's first replies: sort by path,
+        # group per root and keep the head of each group.
+        pipeline = [
+            {"$match": {"post_id": post_id, "root_id": {"$in": [str(r.id) for r in roots]}, "depth": {"$gt": 0}}},
+            {"$sort": {"path": 1}},
+            {"$group": {"_id": "$root_id", "replies": {"$push": "$$ROOT"}, "total": {"$sum": 1}}},
+            {"$project": {"total": 1, "replies": {"$slice": ["$replies", replies_per_thread]}}},
+        ]
+        groups: Dict[str, dict] = {
+            group["_id"]: group for group in await CommentDocument.aggregate(pipeline).to_list()
+        }
+
+        for thread in threads:
+            group = groups.get(str(thread.comment.id))
+            if not group:
+                continue
+            thread.replies = [CommentDocument.model_validate(raw) for raw in group["replies"]]
+            if group["total"] > len(thread.replies):
+                thread.replies_cursor = thread.replies[-1].path
+
+        return threads, next_cursor
+
+    async def get_replies(
+        self,
+        post_id: str,
+        root_id: str,
+        limit: int,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[CommentDocument], Optional[str]]:
+        """Replies of one thread after `cursor`, depth-first, in a single query."""
+        self._check_id(root_id)
+        lower = f"{root_id}{PATH_SEPARATOR}"
+        if cursor:
+            if not cursor.startswith(lower):
+                raise InvalidCursorError("Invalid cursor")
+            path_range = {"$gt": cursor, "$lt": f"{root_id}{_PATH_UPPER}"}
+        else:
+            path_range = {"$gte": lower, "$lt": f"{root_id}{_PATH_UPPER}"}
+
+        replies = await CommentDocument.find(
+            {"post_id": post_id, "path": path_range}
+        ).sort([("path", ASCENDING)]).limit(limit + 1).to_list()
+
+        next_cursor = None
+        if len(replies) > limit:
+            replies = replies[:limit]
+            next_cursor = replies[-1].path
+        return replies, next_cursor
+
+    async def backfill_paths(self) -> int:
+        """Fills root_id/path/depth on comments written before threading existed."""
+        paths: Dict[str, Tuple[str, str, int]] = {}
+        updated = 0
+
+        async for comment in CommentDocument.find({"path": None}).sort([("_id", ASCENDING)]):
+            parent = None
+            if comment.parent_id:
+                parent = paths.get(comment.parent_id)
+                if parent is None:
+                    doc = await self._get(comment.parent_id)
+                    if doc is not None and doc.path:
+                        parent = (doc.root_id, doc.path, doc.depth)
+
+            if parent:
+                root_id, parent_path, parent_depth = parent
+                values = (root_id, f"{parent_path}{PATH_SEPARATOR}{comment.id}", parent_depth + 1)
+            else:
+                # Orphaned replies (parent deleted) become top-level.
+                values = (str(comment.id), str(comment.id), 0)
+
+            paths[str(comment.id)] = values
+            await CommentDocument.get_motor_collection().update_one(
+                {"_id": comment.id},
+                {"$set": {"root_id": values[0], "path": values[1], "depth": values[2]}},
+            )
+            updated += 1
+
+        return updated
+
+    # ---------- private ----------
+
+    @staticmethod
+    async def _bump_post(post_id: str, delta: int, activity_at: Optional[datetime] = None) -> Optional[dict]:
+        """Applies the counter update and returns the post's location for event routing."""
+        if not PydanticObjectId.is_valid(post_id):
+            return None
+        update = {"$inc": {"comments_count": delta}}
+        if activity_at:
+            update["$set"] = {"last_activity_at": activity_at}
+        post = await PostDocument.get_motor_collection().find_one_and_update(
+            {"_id": PydanticObjectId(post_id)},
+            update,
+            projection={"location": 1, "comments_count": 1, "last_activity_at": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if post is None:
+            return None
+        map_snapshot.patch(post_id, comments_count=post["comments_count"], last_activity_at=post.get("last_activity_at"))
+        collection_versions.bump("posts")
+        return post.get("location")
+
+    @staticmethod
+    def _check_id(value: str) -> None:
+        if not PydanticObjectId.is_valid(value):
+            raise InvalidCursorError("Invalid cursor")
+
+    async def _get(self, comment_id: str) -> Optional[CommentDocument]:
+        if not PydanticObjectId.is_valid(comment_id):
+            return None
+        return await CommentDocument.get(PydanticObjectId(comment_id))
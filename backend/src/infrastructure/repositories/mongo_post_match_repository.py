@@ -0,0 +1,102 @@
+import os
+from typing import List
+
+from pymongo import DESCENDING, UpdateOne
+
+from src.domain.entities.post import Post
+from src.domain.entities.post_match import PostMatch
+from src.domain.interfaces.repositories.IPostMatchRepository import IPostMatchRepository
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.matching.match_engine import match_engine
+
+MATCHES_PER_POST = int(os.getenv("MATCHES_PER_POST", "10"))
+
+MATCH_PROJECTION = {
+    "type": 1,
+    "category_key": 1,
+    "location": 1,
+    "created_at": 1,
+    "title": 1,
+    "description": 1,
+    "tag": 1,
+}
+
+
+class MongoPostMatchRepository(IPostMatchRepository):
+
+    async def refresh_for(self, post: Post) -> List[PostMatch]:
+        await self.ensure_match_engine()
+        matches = match_engine.score(
+            post.id,
+            post.type,
+            post.category_key,
+            self._coordinates(post.location),
+            post.created_at,
+            post.title,
+            post.description,
+            post.tag,
+            limit=MATCHES_PER_POST,
+        )
+
+        # Every stored pair with this post is replaced, including pairs found
+        # from the other side: their scores predate the post's current text.
+        side = "lost_id" if post.type == "lost" else "found_id"
+        await PostMatchDocument.get_motor_collection().delete_many({side: post.id})
+        if matches:
+            await PostMatchDocument.get_motor_collection().bulk_write([
+                UpdateOne(
+                    {"lost_id": m.lost_id, "found_id": m.found_id},
+                    {"$set": PostMatchDocument(**m.__dict__).model_dump(exclude={"id", "revision_id"})},
+                    upsert=True,
+                )
+                for m in matches
+            ], ordered=False)
+        return matches
+
+    async def get_for(self, post: Post, limit: int) -> List[PostMatch]:
+        side = "lost_id" if post.type == "lost" else "found_id"
+        docs = await PostMatchDocument.find({side: post.id}).sort([("score", DESCENDING)]).limit(limit).to_list()
+        return [
+            PostMatch(
+                lost_id=doc.lost_id,
+                found_id=doc.found_id,
+                score=doc.score,
+                text_score=doc.text_score,
+                distance_m=doc.distance_m,
+                days_apart=doc.days_apart,
+            )
+            for doc in docs
+        ]
+
+    async def delete_for(self, post_id: str) -> None:
+        await PostMatchDocument.get_motor_collection().delete_many(
+            {"$or": [{"lost_id": post_id}, {"found_id": post_id}]}
+        )
+
+    async def ensure_match_engine(self) -> None:
+        """Loads every post into the match engine unless it is already live."""
+        if match_engine.ready:
+            return
+        match_engine.clear()
+        rows = PostDocument.get_motor_collection().find({}, projection=MATCH_PROJECTION)
+        async for row in rows.batch_size(500):
+            match_engine.add(
+                str(row["_id"]),
+                row.get("type"),
+                row.get("category_key"),
+                self._coordinates(row.get("location")),
+                row.get("created_at"),
+                row.get("title"),
+                row.get("description"),
+                row.get("tag"),
+            )
+        match_engine.ready = True
+
+    @staticmethod
+    def _coordinates(location):
+        if not location:
+            return None
+        if isinstance(location, dict):
+            return location.get("coordinates")
+        return getattr(location, "coordinates", None)
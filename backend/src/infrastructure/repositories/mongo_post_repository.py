@@ -1,33 +1,110 @@
-from typing import List, Optional
+import os
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
 
-from src.domain.entities.post import Post
-from src.domain.entities.geo_location import GeoLocation
+from beanie import PydanticObjectId
+from pymongo.errors import BulkWriteError
+
+from src.domain.entities.post import NearbyPost, Post, PostPage, PostQuery, PostWriteResult
+from src.domain.entities.post_cluster import PostCluster
+from src.domain.entities.suggestion import Suggestion
+from src.domain.entities.geo_location import BoundingBox
 from src.domain.interfaces.repositories.IPostRepository import IPostRepository
 from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.cache.single_flight import single_flight
+from src.infrastructure.events.event_bus import event_bus
+from src.infrastructure.map.map_snapshot import as_stored, map_snapshot
+from src.infrastructure.map.tile_cache import tile_cache
+from src.infrastructure.matching.match_engine import match_engine
+from src.infrastructure.repositories.pagination import (
+    InvalidCursorError, KEYSET_SORT, KEYSET_SORT_OLDEST, decode_rank_cursor, encode_cursor, encode_rank_cursor,
+    keyset_filter,
+)
+from src.infrastructure.search.fingerprint import DuplicateBuckets, fingerprint_bands, post_fingerprint, similarity
+from src.infrastructure.search.search_index import search_index
+from src.infrastructure.search.suggest_index import suggest_index
+
+
+# Fields the map feed reads; anything else (and any field added to posts
+# later) never leaves the database on that path. `description` is the
+# largest of them but stays: MapItemResponse has always carried it and the
+# map opens a PostCard showing it straight from the feed item. What the
+# projection drops are the fingerprints, image hash and duplicate bookkeeping.
+MAP_PROJECTION = {
+    "type": 1,
+    "title": 1,
+    "category_key": 1,
+    "tag": 1,
+    "description": 1,
+    "publisher_username": 1,
+    "image_url": 1,
+    "thumbnails": 1,
+    "reports_count": 1,
+    "created_at": 1,
+    "location": 1,
+    "comments_count": 1,
+    "last_activity_at": 1,
+}
+
+
+STREAM_BATCH_SIZE = 500
+# Seconds before the in-memory map snapshot is rebuilt from the collection;
+# 0 keeps it until restart (only this process's writes are patched in).
+MAP_SNAPSHOT_MAX_AGE = float(os.getenv("MAP_SNAPSHOT_MAX_AGE", "600"))
+
+SEARCH_PROJECTION = {"title": 1, "description": 1, "tag": 1}
+# Up to this many text matches join a /posts/query filter as an _id list;
+# beyond that the filtered query is walked in index order and each post is
+# checked against the matches in memory.
+QUERY_TEXT_IN_LIMIT = int(os.getenv("POSTS_QUERY_TEXT_IN_LIMIT", "1000"))
+# Ranked text matches checked against the other criteria per round trip.
+QUERY_RANKED_CHUNK = 500
+# Equality criteria of a PostQuery, in the order build_query emits them.
+QUERY_EQUALITY_FIELDS = ("type", "category_key", "tag", "publisher_username")
+
+# "flag" stores a near-duplicate of the publisher's own post with
+# duplicate_of set, "reject" refuses it (409), "off" skips the check.
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POST_POLICY", "flag")
+DUPLICATE_MIN_SIMILARITY = float(os.getenv("DUPLICATE_MIN_SIMILARITY", "0.7"))
+# Upper bound on bucket collisions verified per write.
+DUPLICATE_MAX_CANDIDATES = 50
+# Above this many located posts in one bulk write, dropping the whole tile
+# cache is cheaper than evicting tile by tile.
+BULK_TILE_INVALIDATION_LIMIT = 100
+
+
+class DuplicatePostError(Exception):
+    def __init__(self, duplicate_of: str):
+        super().__init__("You already posted a very similar item")
+        self.duplicate_of = duplicate_of
+
+
+class InvalidQueryError(ValueError):
+    pass
 
 
 class MongoPostRepository(IPostRepository):
 
-    async def list_all(self) -> List[Post]:
-        docs = await PostDocument.find_all().to_list()
-        return [self._to_entity(doc) for doc in docs]
+    async def list_all(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        return await self._find_page({}, limit, cursor)
 
     async def get_by_id(self, post_id: str) -> Optional[Post]:
         doc = await PostDocument.get(post_id)
         return self._to_entity(doc) if doc else None
 
-    async def get_by_publisher(self, username: str) -> List[Post]:
-        docs = await PostDocument.find(
-            PostDocument.publisher_username == username
-        ).to_list()
-        return [self._to_entity(doc) for doc in docs]
+    async def get_by_ids(self, post_ids: List[str]) -> Dict[str, Post]:
+        ids = [PydanticObjectId(post_id) for post_id in post_ids if PydanticObjectId.is_valid(post_id)]
+        if not ids:
+            return {}
+        docs = await PostDocument.find({"_id": {"$in": ids}}).to_list()
+        return {str(doc.id): self._to_entity(doc) for doc in docs}
 
-    async def get_by_category(self, category_key: str) -> List[Post]:
-        docs = await PostDocument.find(
-            PostDocument.category_key == category_key
-        ).to_list()
-        return [self._to_entity(doc) for doc in docs]
+    async def get_by_publisher(self, username: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        return await self._find_page({"publisher_username": username}, limit, cursor)
+
+    async def get_by_category(self, category_key: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        return await self._find_page({"category_key": category_key}, limit, cursor)
 
     async def create(self, post: Post) -> Post:
         doc = PostDocument(
@@ -45,39 +122,566 @@ class MongoPostRepository(IPostRepository):
             reports_count=post.reports_count,
             created_at=datetime.now(),
         )
+        await self._fingerprint(doc)
         await doc.insert()
+        tile_cache.invalidate_location(doc.location)
+        self._index_in_memory(doc)
+        map_snapshot.upsert(self._map_row(doc))
+        collection_versions.bump("posts")
+        self._publish("post.created", doc)
         return self._to_entity(doc)
 
+    async def create_many(self, posts: List[Post], duplicate_policy: Optional[str] = None) -> List[PostWriteResult]:
+        """
+        Stores a batch with one duplicate lookup and one unordered
+        insert_many; a failing item does not stop the others.
+        `duplicate_policy` overrides DUPLICATE_POLICY for this batch.
+        """
+        policy = duplicate_policy or DUPLICATE_POLICY
+        now = datetime.now()
+        docs = []
+        for post in posts:
+            doc = PostDocument(
+                id=PydanticObjectId(),
+                type=post.type,
+                title=post.title,
+                category_key=post.category_key,
+                tag=post.tag,
+                description=post.description,
+                publisher_username=post.publisher_username,
+                location={
+                    "type": post.location["type"],
+                    "coordinates": post.location["coordinates"],
+                },
+                image_url=post.image_url,
+                reports_count=post.reports_count,
+                created_at=post.created_at or now,
+            )
+            doc.fingerprint = post_fingerprint(doc.title, doc.description, doc.tag)
+            doc.fingerprint_bands = fingerprint_bands(doc.fingerprint)
+            docs.append(doc)
+
+        results = [PostWriteResult() for _ in docs]
+        if policy != "off":
+            await self._mark_batch_duplicates(docs)
+            for doc, result in zip(docs, results):
+                if doc.duplicate_of and policy == "reject":
+                    result.error = str(DuplicatePostError(doc.duplicate_of))
+                    result.duplicate_of = doc.duplicate_of
+
+        pending = [(doc, result) for doc, result in zip(docs, results) if result.error is None]
+        failed = {}
+        if pending:
+            try:
+                await PostDocument.insert_many([doc for doc, _ in pending], ordered=False)
+            except BulkWriteError as e:
+                failed = {err["index"]: err.get("errmsg", "Write failed") for err in e.details.get("writeErrors", [])}
+
+        stored = []
+        for i, (doc, result) in enumerate(pending):
+            if i in failed:
+                result.error = failed[i]
+                continue
+            result.post = self._to_entity(doc)
+            result.duplicate_of = doc.duplicate_of
+            self._index_in_memory(doc)
+            map_snapshot.upsert(self._map_row(doc))
+            self._publish("post.created", doc)
+            stored.append(doc)
+
+        if stored:
+            collection_versions.bump("posts")
+        if len(stored) > BULK_TILE_INVALIDATION_LIMIT:
+            tile_cache.clear()
+        else:
+            for doc in stored:
+                tile_cache.invalidate_location(doc.location)
+        return results
+
     async def update(self, post_id: str, post: Post) -> Post:
         doc = await PostDocument.get(post_id)
         if not doc:
             raise ValueError("Post not found")
 
-        for field, value in post.__dict__.items():
-            if value is not None:
-                setattr(doc, field, value)
+        old_location = doc.location
+        changes = {field: value for field, value in post.__dict__.items() if value is not None}
 
-        await doc.save()
+        if changes.keys() & {"title", "description", "tag"}:
+            edited = doc.model_copy(update=changes)
+            await self._fingerprint(edited)
+            changes.update(
+                fingerprint=edited.fingerprint,
+                fingerprint_bands=edited.fingerprint_bands,
+                duplicate_of=edited.duplicate_of,
+            )
+
+        # $set only the edited fields so counters bumped concurrently by
+        # comments and reports are not overwritten with stale values.
+        if changes:
+            await doc.set(changes)
+        tile_cache.invalidate_location(old_location)
+        tile_cache.invalidate_location(doc.location)
+        self._index_in_memory(doc)
+        map_snapshot.upsert(self._map_row(doc))
+        collection_versions.bump("posts")
+        self._publish("post.updated", doc)
         return self._to_entity(doc)
 
     async def delete(self, post_id: str) -> None:
         doc = await PostDocument.get(post_id)
         if doc:
             await doc.delete()
+            tile_cache.invalidate_location(doc.location)
+            search_index.remove(str(doc.id))
+            suggest_index.remove(str(doc.id))
+            match_engine.remove(str(doc.id))
+            map_snapshot.remove(str(doc.id))
+            collection_versions.bump("posts")
+            event_bus.publish("posts", "post.deleted", {"id": str(doc.id)}, post_id=str(doc.id), location=doc.location)
+
+    async def set_image(self, post_id: str, image_url: str, image_hash: str, thumbnails: Dict[str, str]) -> Optional[Post]:
+        doc = await PostDocument.get(post_id)
+        if not doc:
+            return None
+        await doc.set({"image_url": image_url, "image_hash": image_hash, "thumbnails": thumbnails})
+        tile_cache.invalidate_location(doc.location)
+        map_snapshot.upsert(self._map_row(doc))
+        collection_versions.bump("posts")
+        self._publish("post.updated", doc)
+        return self._to_entity(doc)
+
+    async def search_in_title_and_description(self, query: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        # Results are ranked, so the cursor is simply the rank to resume from.
+        offset = self._decode_offset(cursor)
+        await self.ensure_search_index()
+        hits, total = search_index.search(query, offset=offset, limit=limit)
+        if not hits:
+            return PostPage()
+
+        ids = [PydanticObjectId(doc_id) for doc_id, _ in hits]
+        docs = {str(doc.id): doc for doc in await PostDocument.find({"_id": {"$in": ids}}).to_list()}
+        posts = [self._to_entity(docs[doc_id]) for doc_id, _ in hits if doc_id in docs]
+
+        next_offset = offset + len(hits)
+        return PostPage(items=posts, next_cursor=str(next_offset) if next_offset < total else None)
+
+    async def query(self, query: PostQuery, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        """
+        Posts matching every criterion of `query` as one indexed find. Text
+        is matched in the search index first; "relevance" pages through the
+        whole ranking by (score, _id), the other orders by keyset.
+        """
+        if query.sort == "relevance" and not query.text:
+            raise InvalidQueryError("sort=relevance needs text")
+        if query.created_from and query.created_to and query.created_from >= query.created_to:
+            raise InvalidQueryError("created_from must be before created_to")
+
+        newest_first = query.sort != "oldest"
+        if not query.text:
+            mongo_filter, _ = self.build_query(query)
+            return await self._find_page(mongo_filter, limit, cursor, newest_first)
 
-    async def search_in_title_and_description(self, query: str):
-        return await PostDocument.find(
-            {"$text": {"$search": query}}
-        ).to_list()
+        await self.ensure_search_index()
+        ranked, total = search_index.search(query.text)
+        if not ranked:
+            return PostPage()
 
-    async def get_by_tag(self, tag: str):
-        docs = await PostDocument.find(
-            PostDocument.tag == tag
-        ).to_list()
+        if query.sort == "relevance":
+            mongo_filter, _ = self.build_query(query)
+            return await self._ranked_page(mongo_filter, ranked, limit, cursor)
+        if total <= QUERY_TEXT_IN_LIMIT:
+            mongo_filter, _ = self.build_query(query, [doc_id for doc_id, _ in ranked])
+            return await self._find_page(mongo_filter, limit, cursor, newest_first)
+        mongo_filter, _ = self.build_query(query)
+        return await self._matching_page(mongo_filter, {doc_id for doc_id, _ in ranked}, limit, cursor, newest_first)
+
+    @staticmethod
+    def build_query(query: PostQuery, text_ids: Optional[List[str]] = None) -> Tuple[dict, list]:
+        """
+        The Mongo filter and sort for `query`. Equality criteria, then the
+        created_at range, then the sort keys: the order the compound indexes
+        on PostDocument are declared in.
+        """
+        mongo_filter = {}
+        for name in QUERY_EQUALITY_FIELDS:
+            value = getattr(query, name)
+            if value is not None:
+                mongo_filter[name] = value
+
+        created_at = {}
+        if query.created_from:
+            created_at["$gte"] = as_stored(query.created_from)
+        if query.created_to:
+            created_at["$lt"] = as_stored(query.created_to)
+        if created_at:
+            mongo_filter["created_at"] = created_at
+
+        mongo_filter.update(MongoPostRepository._bbox_query(query.bbox))
+        if text_ids is not None:
+            mongo_filter["_id"] = {"$in": [PydanticObjectId(doc_id) for doc_id in text_ids]}
+
+        return mongo_filter, KEYSET_SORT_OLDEST if query.sort == "oldest" else KEYSET_SORT
+
+    async def suggest(self, prefix: str, limit: int) -> List[Suggestion]:
+        await self.ensure_search_index()
+        return suggest_index.suggest(prefix, limit)
+
+    async def ensure_search_index(self) -> None:
+        """Loads the search and suggest indexes from the collection unless they are already live."""
+        if search_index.ready and suggest_index.ready:
+            return
+        search_index.clear()
+        suggest_index.clear()
+        rows = PostDocument.get_motor_collection().find({}, projection=SEARCH_PROJECTION)
+        async for row in rows.batch_size(STREAM_BATCH_SIZE):
+            post_id = str(row["_id"])
+            search_index.add(post_id, row.get("title"), row.get("description"), row.get("tag"))
+            suggest_index.add(post_id, row.get("title"), row.get("tag"))
+        search_index.ready = True
+        suggest_index.ready = True
+
+    async def get_by_tag(self, tag: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> PostPage:
+        return await self._find_page({"tag": tag}, limit, cursor)
+
+    async def find_in_bbox(self, bbox: BoundingBox) -> List[Post]:
+        docs = await PostDocument.find(self._bbox_query(bbox)).to_list()
         return [self._to_entity(doc) for doc in docs]
-    
+
+    async def map_snapshot_json(
+        self, render_item: Callable[[dict], dict], bbox: Optional[BoundingBox] = None, epoch: int = 0,
+    ) -> bytes:
+        await self.ensure_map_snapshot()
+        return map_snapshot.render(render_item, bbox, epoch=epoch)
+
+    async def ensure_map_snapshot(self) -> None:
+        """
+        Loads the map snapshot, or reloads it once older than
+        MAP_SNAPSHOT_MAX_AGE to pick up writes made by other processes.
+        Concurrent callers share one load; while a reload runs, the previous
+        snapshot keeps serving.
+        """
+        if map_snapshot.loaded:
+            age = map_snapshot.age()
+            if map_snapshot.loading or not (MAP_SNAPSHOT_MAX_AGE and age > MAP_SNAPSHOT_MAX_AGE):
+                return
+        await single_flight.do("posts.map_snapshot", self._load_map_snapshot)
+
+    async def _load_map_snapshot(self) -> None:
+        map_snapshot.begin_load()
+        try:
+            rows = await self._fetch_map_rows()
+        except BaseException:
+            map_snapshot.abort_load()
+            raise
+        map_snapshot.finish_load(rows)
+
+    async def _fetch_map_rows(self) -> List[dict]:
+        # Straight Motor: no Beanie document construction or validation.
+        cursor = PostDocument.get_motor_collection().find({}, projection=MAP_PROJECTION)
+        return await cursor.to_list(length=None)
+
+    async def stream_all(self) -> AsyncIterator[Post]:
+        async for doc in PostDocument.find({}).sort(KEYSET_SORT):
+            yield self._to_entity(doc)
+
+    async def stream_by_category(self, category_key: str) -> AsyncIterator[Post]:
+        async for doc in PostDocument.find({"category_key": category_key}).sort(KEYSET_SORT):
+            yield self._to_entity(doc)
+
+    async def stream_map_rows(self, bbox: Optional[BoundingBox] = None) -> AsyncIterator[dict]:
+        cursor = PostDocument.get_motor_collection().find(self._bbox_query(bbox), projection=MAP_PROJECTION)
+        async for row in cursor.batch_size(STREAM_BATCH_SIZE):
+            yield row
+
+    async def find_near(self, lat: float, lng: float, radius_m: float, limit: int) -> List[NearbyPost]:
+        # $geoNear must be the first stage and sorts by distance itself.
+        pipeline = [
+            {
+                "$geoNear": {
+                    "near": {"type": "Point", "coordinates": [lng, lat]},
+                    # Posts also have a planar 2d index; name the 2dsphere one
+                    # so the GeoJSON point and meter distance apply to it.
+                    "key": "location",
+                    "distanceField": "distance_m",
+                    "maxDistance": radius_m,
+                    "spherical": True,
+                }
+            },
+            {"$limit": limit},
+        ]
+        raws = await single_flight.do(
+            f"posts.near v={collection_versions.version('posts')} lat={lat} lng={lng} radius_m={radius_m} limit={limit}",
+            lambda: PostDocument.aggregate(pipeline).to_list(),
+        )
+        return [
+            NearbyPost(
+                post=self._to_entity(PostDocument.model_validate(raw)),
+                distance_m=raw["distance_m"],
+            )
+            for raw in raws
+        ]
+
+    async def cluster(self, bbox: Optional[BoundingBox], cell_size_deg: float) -> List[PostCluster]:
+        if bbox:
+            match = self._bbox_query(bbox)
+        else:
+            match = {"location.coordinates": {"$exists": True}}
+
+        # Cells are snapped to a global grid so clusters stay put while panning.
+        # The first $group splits each cell by category so the second one can
+        # pick the dominant category with $first after sorting by count.
+        pipeline = [
+            {"$match": match},
+            {
+                "$project": {
+                    "type": 1,
+                    "category_key": 1,
+                    "lng": {"$arrayElemAt": ["$location.coordinates", 0]},
+                    "lat": {"$arrayElemAt": ["$location.coordinates", 1]},
+                }
+            },
+            {
+                "$group": {
+                    "_id": {
+                        "x": {"$floor": {"$divide": ["$lng", cell_size_deg]}},
+                        "y": {"$floor": {"$divide": ["$lat", cell_size_deg]}},
+                        "category_key": "$category_key",
+                    },
+                    "count": {"$sum": 1},
+                    "lost_count": {"$sum": {"$cond": [{"$eq": ["$type", "lost"]}, 1, 0]}},
+                    "sum_lng": {"$sum": "$lng"},
+                    "sum_lat": {"$sum": "$lat"},
+                }
+            },
+            {"$sort": {"count": -1, "_id.category_key": 1}},
+            {
+                "$group": {
+                    "_id": {"x": "$_id.x", "y": "$_id.y"},
+                    "count": {"$sum": "$count"},
+                    "lost_count": {"$sum": "$lost_count"},
+                    "sum_lng": {"$sum": "$sum_lng"},
+                    "sum_lat": {"$sum": "$sum_lat"},
+                    "dominant_category_key": {"$first": "$_id.category_key"},
+                }
+            },
+        ]
+        rows = await PostDocument.aggregate(pipeline).to_list()
+        return [
+            PostCluster(
+                cell_x=int(row["_id"]["x"]),
+                cell_y=int(row["_id"]["y"]),
+                count=row["count"],
+                lng=row["sum_lng"] / row["count"],
+                lat=row["sum_lat"] / row["count"],
+                lost_count=row["lost_count"],
+                found_count=row["count"] - row["lost_count"],
+                dominant_category_key=row["dominant_category_key"],
+            )
+            for row in rows
+        ]
+
+    async def find_duplicate(self, publisher_username: str, post_type: str, fingerprint: Optional[List[int]], exclude_id=None) -> Optional[str]:
+        """
+        Id of the publisher's most similar post of the same type, if it is a
+        near-duplicate. Only posts sharing an LSH band are compared, through
+        the (publisher_username, fingerprint_bands) index.
+        """
+        bands = fingerprint_bands(fingerprint)
+        if not bands:
+            return None
+
+        query = {"publisher_username": publisher_username, "fingerprint_bands": {"$in": bands}, "type": post_type}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": exclude_id}
+        rows = PostDocument.get_motor_collection().find(query, projection={"fingerprint": 1})
+
+        best_id, best = None, DUPLICATE_MIN_SIMILARITY
+        async for row in rows.limit(DUPLICATE_MAX_CANDIDATES):
+            score = similarity(fingerprint, row.get("fingerprint") or [])
+            if score >= best:
+                best_id, best = str(row["_id"]), score
+        return best_id
+
     # ---------- private ----------
 
+    async def _mark_batch_duplicates(self, docs: List[PostDocument]) -> None:
+        """
+        Sets duplicate_of on each doc from stored posts sharing an LSH band
+        (one query for the whole batch) and from earlier docs in the batch.
+        """
+        buckets = DuplicateBuckets(DUPLICATE_MIN_SIMILARITY)
+        query = {
+            "publisher_username": {"$in": list({doc.publisher_username for doc in docs})},
+            "fingerprint_bands": {"$in": list({band for doc in docs for band in doc.fingerprint_bands})},
+        }
+        projection = {"publisher_username": 1, "type": 1, "fingerprint": 1}
+        async for row in PostDocument.get_motor_collection().find(query, projection=projection):
+            buckets.add((row.get("publisher_username"), row.get("type")), str(row["_id"]), row.get("fingerprint"))
+
+        for doc in docs:
+            owner = (doc.publisher_username, doc.type)
+            doc.duplicate_of = buckets.best_match(owner, doc.fingerprint)
+            if not doc.duplicate_of:
+                buckets.add(owner, str(doc.id), doc.fingerprint)
+
+    async def _fingerprint(self, doc: PostDocument) -> None:
+        doc.fingerprint = post_fingerprint(doc.title, doc.description, doc.tag)
+        doc.fingerprint_bands = fingerprint_bands(doc.fingerprint)
+        doc.duplicate_of = None
+        if DUPLICATE_POLICY == "off":
+            return
+
+        duplicate_of = await self.find_duplicate(doc.publisher_username, doc.type, doc.fingerprint, exclude_id=doc.id)
+        if duplicate_of and DUPLICATE_POLICY == "reject":
+            raise DuplicatePostError(duplicate_of)
+        doc.duplicate_of = duplicate_of
+
+    @staticmethod
+    def _map_row(doc: PostDocument) -> dict:
+        """The MAP_PROJECTION row of a document as the database would return it."""
+        row = doc.model_dump(include=set(MAP_PROJECTION))
+        row["_id"] = doc.id
+        for field in ("created_at", "last_activity_at"):
+            row[field] = as_stored(row.get(field))
+        return row
+
+    @staticmethod
+    def _publish(name: str, doc: PostDocument) -> None:
+        # Enough for a client to place or refresh the post without refetching it.
+        post_id = str(doc.id)
+        event_bus.publish("posts", name, {
+            "id": post_id,
+            "type": doc.type,
+            "title": doc.title,
+            "category_key": doc.category_key,
+            "tag": doc.tag,
+            "publisher_username": doc.publisher_username,
+            "image_url": doc.image_url,
+            "thumbnails": doc.thumbnails,
+            "location": doc.location.model_dump() if doc.location else None,
+            "reports_count": doc.reports_count,
+            "comments_count": doc.comments_count,
+            "created_at": doc.created_at,
+        }, post_id=post_id, location=doc.location)
+
+    @staticmethod
+    def _index_in_memory(doc: PostDocument) -> None:
+        post_id = str(doc.id)
+        search_index.add(post_id, doc.title, doc.description, doc.tag)
+        suggest_index.add(post_id, doc.title, doc.tag)
+        match_engine.add(
+            post_id,
+            doc.type,
+            doc.category_key,
+            doc.location.coordinates if doc.location else None,
+            doc.created_at,
+            doc.title,
+            doc.description,
+            doc.tag,
+        )
+
+    @staticmethod
+    def _decode_offset(cursor: Optional[str]) -> int:
+        if not cursor:
+            return 0
+        if not cursor.isdigit():
+            raise InvalidCursorError("Invalid cursor")
+        return int(cursor)
+
+    @staticmethod
+    def _bbox_query(bbox: Optional[BoundingBox]) -> dict:
+        if not bbox:
+            return {}
+        # Planar, on the coordinate pair the 2d index covers.
+        return {"location.coordinates": {"$geoWithin": {"$box": bbox.to_box()}}}
+
+    async def _find_page(
+        self, query: dict, limit: Optional[int], cursor: Optional[str], newest_first: bool = True,
+    ) -> PostPage:
+        # Versioned so a read issued after a write never joins a flight from before it.
+        version = collection_versions.version("posts")
+        key = f"posts.page v={version} {query!r} limit={limit} cursor={cursor} newest_first={newest_first}"
+        return await single_flight.do(key, lambda: self._query_page(query, limit, cursor, newest_first))
+
+    async def _query_page(
+        self, query: dict, limit: Optional[int], cursor: Optional[str], newest_first: bool = True,
+    ) -> PostPage:
+        after = keyset_filter(cursor, newest_first)
+        if after:
+            query = {"$and": [query, after]} if query else after
+
+        find = PostDocument.find(query).sort(KEYSET_SORT if newest_first else KEYSET_SORT_OLDEST)
+        if limit is None:
+            docs = await find.to_list()
+            return PostPage(items=[self._to_entity(doc) for doc in docs])
+
+        # One extra row tells us whether another page exists without a count query.
+        docs = await find.limit(limit + 1).to_list()
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+
+        return PostPage(items=[self._to_entity(doc) for doc in docs], next_cursor=next_cursor)
+
+    async def _matching_page(
+        self, mongo_filter: dict, matches: set, limit: Optional[int], cursor: Optional[str], newest_first: bool,
+    ) -> PostPage:
+        # Walks ids and keys in index order, keeping text matches until a row
+        # past the page proves there is another one; then loads the page.
+        after = keyset_filter(cursor, newest_first)
+        if after:
+            mongo_filter = {"$and": [mongo_filter, after]} if mongo_filter else after
+
+        rows = PostDocument.get_motor_collection().find(mongo_filter, projection={"created_at": 1}).sort(
+            KEYSET_SORT if newest_first else KEYSET_SORT_OLDEST,
+        )
+        kept = []
+        async for row in rows.batch_size(STREAM_BATCH_SIZE):
+            if str(row["_id"]) in matches:
+                kept.append(row)
+                if limit is not None and len(kept) > limit:
+                    break
+
+        next_cursor = None
+        if limit is not None and len(kept) > limit:
+            kept = kept[:limit]
+            next_cursor = encode_cursor(kept[-1]["created_at"], kept[-1]["_id"])
+        return PostPage(items=await self._load_in_order([str(row["_id"]) for row in kept]), next_cursor=next_cursor)
+
+    async def _ranked_page(
+        self, mongo_filter: dict, ranked: List[Tuple[str, float]], limit: Optional[int], cursor: Optional[str],
+    ) -> PostPage:
+        # Ranked hits after the cursor are checked against the other criteria
+        # a chunk at a time, so a page never holds more than a chunk of ids.
+        start = 0
+        if cursor:
+            last = decode_rank_cursor(cursor)
+            start = next((i for i, (doc_id, score) in enumerate(ranked) if (score, doc_id) < last), len(ranked))
+
+        collection = PostDocument.get_motor_collection()
+        kept = []
+        while start < len(ranked) and (limit is None or len(kept) <= limit):
+            chunk = ranked[start:start + QUERY_RANKED_CHUNK]
+            start += len(chunk)
+            in_chunk = {"_id": {"$in": [PydanticObjectId(doc_id) for doc_id, _ in chunk]}}
+            rows = await collection.find(
+                {"$and": [mongo_filter, in_chunk]} if mongo_filter else in_chunk, projection={"_id": 1},
+            ).to_list(length=None)
+            passed = {str(row["_id"]) for row in rows}
+            kept.extend(hit for hit in chunk if hit[0] in passed)
+
+        next_cursor = None
+        if limit is not None and len(kept) > limit:
+            kept = kept[:limit]
+            next_cursor = encode_rank_cursor(kept[-1][1], kept[-1][0])
+        return PostPage(items=await self._load_in_order([doc_id for doc_id, _ in kept]), next_cursor=next_cursor)
+
+    async def _load_in_order(self, post_ids: List[str]) -> List[Post]:
+        posts = await self.get_by_ids(post_ids)
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
+
     def _to_entity(self, doc: PostDocument) -> Post:
         return Post(
             id=str(doc.id),
@@ -94,4 +698,9 @@ class MongoPostRepository(IPostRepository):
             reports_count=doc.reports_count,
             image_url=doc.image_url,
             created_at=doc.created_at,
+            comments_count=doc.comments_count,
+            last_activity_at=doc.last_activity_at,
+            duplicate_of=doc.duplicate_of,
+            image_hash=doc.image_hash,
+            thumbnails=doc.thumbnails,
         )
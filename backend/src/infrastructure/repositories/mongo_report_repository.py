@@ -1,10 +1,68 @@
-from ..persistence import db
+from typing import Optional
+
+from beanie import PydanticObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.report_document import ReportDocument
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.events.event_bus import event_bus
+from src.infrastructure.map.map_snapshot import map_snapshot
+
+
+class DuplicateReportError(Exception):
+    pass
+
 
 class ReportRepository:
-    async def add_report(self, target_type: str, target_id: str, reporter: str):
-        await db.reports.insert_one({
+    TARGETS = {"post": PostDocument, "comment": CommentDocument}
+
+    async def add_report(
+        self,
+        target_type: str,
+        target_id: PydanticObjectId,
+        reporter: str,
+        reason: str = "Report",
+    ) -> Optional[dict]:
+        """
+        Records one report and atomically bumps the target's reports_count.
+
+        Returns the target's `_id`, `reports_count`, `location` (posts) and
+        `post_id` (comments) after the increment, or None if the target does
+        not exist. Raises DuplicateReportError if `reporter` already reported
+        this target.
+        """
+        report = ReportDocument(
+            reporter_username=reporter,
+            target_id=target_id,
+            target_type=target_type,
+            reason=reason,
+        )
+        try:
+            await report.insert()
+        except DuplicateKeyError:
+            raise DuplicateReportError("You have already reported this item")
+
+        target = await self.TARGETS[target_type].get_motor_collection().find_one_and_update(
+            {"_id": target_id},
+            {"$inc": {"reports_count": 1}},
+            projection={"reports_count": 1, "location": 1, "post_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if target is None:
+            await report.delete()
+            return target
+
+        post_id = str(target_id) if target_type == "post" else target.get("post_id")
+        if target_type == "post":
+            map_snapshot.patch(post_id, reports_count=target["reports_count"])
+            collection_versions.bump("posts")
+        event_bus.publish("reports", f"{target_type}.reported", {
             "target_type": target_type,
-            "target_id": target_id,
-            "reporter": reporter
-        })
-        return await db.reports.count_documents({"target_id": target_id})
\ No newline at end of file
+            "target_id": str(target_id),
+            "post_id": post_id,
+            "reports_count": target["reports_count"],
+        }, post_id=post_id, location=target.get("location"))
+        return target
@@ -0,0 +1,64 @@
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import ASCENDING, DESCENDING
+
+# Newest first; _id breaks ties between posts created in the same instant.
+KEYSET_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+# The same keys walked the other way; served by the same indexes.
+KEYSET_SORT_OLDEST = [("created_at", ASCENDING), ("_id", ASCENDING)]
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, doc_id) -> str:
+    raw = f"{created_at.isoformat()}|{doc_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at, doc_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), PydanticObjectId(doc_id)
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def encode_rank_cursor(score: float, doc_id: str) -> str:
+    raw = f"{score!r}|{doc_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        score, doc_id = raw.split("|", 1)
+        PydanticObjectId(doc_id)
+        return float(score), doc_id
+    except Exception:
+        raise InvalidCursorError("Invalid cursor")
+
+
+def keyset_filter(cursor: Optional[str], newest_first: bool = True) -> dict:
+    """
+    Mongo filter selecting everything strictly after `cursor` in KEYSET_SORT
+    order, or KEYSET_SORT_OLDEST order when `newest_first` is False.
+    """
+    if not cursor:
+        return {}
+
+    created_at, doc_id = decode_cursor(cursor)
+    after = "$lt" if newest_first else "$gt"
+    return {
+        "$or": [
+            {"created_at": {after: created_at}},
+            {"created_at": created_at, "_id": {after: doc_id}},
+        ]
+    }
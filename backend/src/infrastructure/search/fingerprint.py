@@ -0,0 +1,93 @@
+import hashlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.infrastructure.search.persian_text import tokenize
+
+NUM_PERMUTATIONS = 32
+# 8 bands of 4 rows: pairs with Jaccard >= ~0.6 share a band with high
+# probability, so band equality is the candidate lookup.
+BANDS = 8
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Every operand is reduced below the prime, so a * x + b < 2**64 and the
+# uint64 arithmetic never wraps before the modulo.
+_PRIME = np.uint64(4294967291)          # largest prime below 2**32
+_rng = np.random.default_rng(20240501)  # fixed: fingerprints are persisted
+_A = _rng.integers(1, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, int(_PRIME), NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(text: str) -> set:
+    """Normalized words plus their character trigrams."""
+    features = set()
+    for token in tokenize(text):
+        features.add(token)
+        padded = f"#{token}#"
+        features.update("3:" + padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def minhash(features: set) -> Optional[List[int]]:
+    if not features:
+        return None
+    x = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "big") for f in features),
+        dtype=np.uint64,
+        count=len(features),
+    ) % _PRIME
+    # (a * x + b) mod p for every permutation/feature pair, min per permutation.
+    hashed = (np.outer(_A, x) + _B[:, None]) % _PRIME
+    return hashed.min(axis=1).astype(np.int64).tolist()
+
+
+def post_fingerprint(title: str, description: str, tag: Optional[str]) -> Optional[List[int]]:
+    return minhash(shingles(" ".join(part for part in (title, tag, description) if part)))
+
+
+def fingerprint_bands(fingerprint: Optional[List[int]]) -> List[str]:
+    """LSH bucket keys ("<band>:<digest>") stored on the post and indexed."""
+    if not fingerprint:
+        return []
+    bands = []
+    for band in range(BANDS):
+        rows = fingerprint[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(repr(rows).encode("ascii"), digest_size=6).hexdigest()
+        bands.append(f"{band}:{digest}")
+    return bands
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """MinHash estimate of the Jaccard similarity of the two shingle sets."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERMUTATIONS
+
+
+class DuplicateBuckets:
+    """
+    In-memory LSH buckets for batch work (imports, backfills): fingerprints
+    are grouped per owner (publisher, type) and band, so a lookup only
+    compares posts that share a band.
+    """
+
+    def __init__(self, min_similarity: float):
+        self.min_similarity = min_similarity
+        self._buckets: Dict[Tuple[Hashable, str], List[Tuple[str, List[int]]]] = defaultdict(list)
+
+    def add(self, owner: Hashable, post_id: str, fingerprint: Optional[List[int]]) -> None:
+        for band in fingerprint_bands(fingerprint):
+            self._buckets[(owner, band)].append((post_id, fingerprint))
+
+    def best_match(self, owner: Hashable, fingerprint: Optional[List[int]]) -> Optional[str]:
+        best_id, best = None, self.min_similarity
+        seen = set()
+        for band in fingerprint_bands(fingerprint):
+            for other_id, other in self._buckets.get((owner, band), ()):
+                if other_id in seen:
+                    continue
+                seen.add(other_id)
+                score = similarity(fingerprint, other)
+                if score >= best:
+                    best_id, best = other_id, score
+        return best_id
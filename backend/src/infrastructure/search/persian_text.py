@@ -0,0 +1,46 @@
+import re
+from typing import List
+
+# Arabic code points that Persian keyboards and pasted text mix in, mapped to
+# the Persian form; digits (Persian and Arabic-Indic) become ASCII.
+_CHAR_MAP = str.maketrans({
+    "ي": "ی",
+    "ى": "ی",
+    "ئ": "ی",
+    "ك": "ک",
+    "ة": "ه",
+    "ۀ": "ه",
+    "أ": "ا",
+    "إ": "ا",
+    "ٱ": "ا",
+    "ؤ": "و",
+    **{chr(0x06F0 + i): str(i) for i in range(10)},
+    **{chr(0x0660 + i): str(i) for i in range(10)},
+})
+
+# Harakat, superscript alef and tatweel carry no meaning for matching.
+_DROP = re.compile("[\u064B-\u065F\u0670\u0640]")
+# ZWNJ and friends join the parts of one word ("کتاب‌ها"); removing them makes
+# "کتاب‌ها" and "کتابها" the same token.
+_JOINERS = re.compile("[\u200C\u200D\u200E\u200F\u00AD]")
+_TOKEN = re.compile(r"\w+")
+
+STOPWORDS = frozenset({
+    "و", "در", "به", "از", "که", "این", "آن", "را", "با", "برای", "تا",
+    "یا", "هم", "نیز", "یک", "های", "ها", "است", "بود", "شد", "می", "من",
+})
+
+
+def normalize(text: str) -> str:
+    if not text:
+        return ""
+    text = _JOINERS.sub("", _DROP.sub("", text.translate(_CHAR_MAP)))
+    return text.lower()
+
+
+def word_tokens(text: str) -> List[str]:
+    return _TOKEN.findall(normalize(text))
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in word_tokens(text) if t not in STOPWORDS]
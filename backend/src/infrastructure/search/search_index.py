@@ -0,0 +1,101 @@
+import heapq
+import math
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from src.infrastructure.search.persian_text import tokenize
+
+# A title hit says more about a post than a description hit.
+FIELD_WEIGHTS = {"title": 3.0, "tag": 2.0, "description": 1.0}
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over post title, tag and description, ranked
+    with BM25 (field weights scale term frequencies and lengths, BM25F-style).
+
+    The repository keeps it current on every write and rebuilds it from the
+    collection when `ready` is False (startup, or after `clear`).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ready = False
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_terms: Dict[str, Dict[str, float]] = {}
+        self._doc_len: Dict[str, float] = {}
+        self._total_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def add(self, doc_id: str, title: str = "", description: str = "", tag: Optional[str] = "") -> None:
+        self.remove(doc_id)
+
+        terms: Dict[str, float] = defaultdict(float)
+        for field, text in (("title", title), ("tag", tag), ("description", description)):
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text or ""):
+                terms[token] += weight
+
+        length = sum(terms.values())
+        for term, tf in terms.items():
+            self._postings[term][doc_id] = tf
+        self._doc_terms[doc_id] = dict(terms)
+        self._doc_len[doc_id] = length
+        self._total_len += length
+
+    def remove(self, doc_id: str) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(doc_id)
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_len.clear()
+        self._total_len = 0.0
+        self.ready = False
+
+    def search(self, query: str, offset: int = 0, limit: Optional[int] = None) -> Tuple[List[Tuple[str, float]], int]:
+        """
+        Returns the (doc_id, score) hits ranked offset..offset+limit and the
+        total number of matching documents. Any query term may match.
+        """
+        n = len(self._doc_len)
+        if not n:
+            return [], 0
+
+        avg_len = self._total_len / n or 1.0
+        scores: Dict[str, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        # Ties go to the newer post (ObjectIds grow with time).
+        rank = lambda hit: (hit[1], hit[0])
+        if limit is None:
+            ranked = sorted(scores.items(), key=rank, reverse=True)[offset:]
+        else:
+            ranked = heapq.nlargest(offset + limit, scores.items(), key=rank)[offset:]
+        return ranked, len(scores)
+
+
+search_index = SearchIndex(
+    k1=float(os.getenv("SEARCH_BM25_K1", "1.2")),
+    b=float(os.getenv("SEARCH_BM25_B", "0.75")),
+)
@@ -0,0 +1,200 @@
+import heapq
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.domain.entities.suggestion import Suggestion
+from src.infrastructure.search.persian_text import word_tokens
+
+EntryKey = Tuple[str, str]          # (kind, normalized text)
+
+
+class _Node:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.entries: Set[EntryKey] = set()
+        # Best entries in this subtree, computed on demand and dropped
+        # whenever an entry below this node changes.
+        self.top: Optional[List[EntryKey]] = None
+
+
+class _Entry:
+    __slots__ = ("text", "tokens", "posts")
+
+    def __init__(self, text: str, tokens: List[str]):
+        self.text = text
+        self.tokens = tokens
+        self.posts: Set[str] = set()
+
+
+class SuggestIndex:
+    """
+    Prefix trie over the words of post titles and tags for autocomplete.
+
+    Every word of a title or tag points back to the whole title/tag, so
+    "سامس" completes "گوشی سامسونگ". The last word typed is matched as a
+    prefix with a small edit budget (Levenshtein over the trie); earlier
+    words must match exactly. Ranking: fewer edits, then more posts.
+    """
+
+    def __init__(self, node_cache_size: int = 50):
+        self.node_cache_size = node_cache_size
+        self.ready = False
+        self._root = _Node()
+        self._entries: Dict[EntryKey, _Entry] = {}
+        self._posts: Dict[str, List[EntryKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, post_id: str, title: Optional[str], tag: Optional[str]) -> None:
+        self.remove(post_id)
+        keys = []
+        for kind, text in (("title", title), ("tag", tag)):
+            tokens = word_tokens(text or "")
+            if not tokens:
+                continue
+            key = (kind, " ".join(tokens))
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(" ".join((text or "").split()), tokens)
+                for token in set(tokens):
+                    self._node_for(token, create=True).entries.add(key)
+            entry.posts.add(post_id)
+            self._invalidate(entry.tokens)
+            keys.append(key)
+        self._posts[post_id] = keys
+
+    def remove(self, post_id: str) -> None:
+        for key in self._posts.pop(post_id, []):
+            entry = self._entries[key]
+            entry.posts.discard(post_id)
+            if not entry.posts:
+                del self._entries[key]
+                for token in set(entry.tokens):
+                    self._node_for(token).entries.discard(key)
+            self._invalidate(entry.tokens)
+
+    def clear(self) -> None:
+        self._root = _Node()
+        self._entries.clear()
+        self._posts.clear()
+        self.ready = False
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        words = word_tokens(prefix)
+        if not words:
+            return []
+        *complete, last = words
+        # Fuzzy matching on one or two letters would match nearly everything.
+        max_edits = 0 if len(last) < 3 else 1 if len(last) < 7 else 2
+
+        best: Dict[EntryKey, int] = {}
+        if complete:
+            # Earlier words narrow the candidates to a known set; score the
+            # last word against each candidate's own words.
+            matching = self._matching_words(last, max_edits)
+            for key in self._entries_with_all(complete):
+                distances = [matching[t] for t in self._entries[key].tokens if t in matching]
+                if distances:
+                    best[key] = min(distances)
+        else:
+            for node, distance in self._fuzzy_prefix(last, max_edits):
+                for key in self._top(node):
+                    if distance < best.get(key, max_edits + 1):
+                        best[key] = distance
+
+        results = [
+            Suggestion(text=self._entries[key].text, kind=key[0], count=len(self._entries[key].posts), distance=distance)
+            for key, distance in best.items()
+        ]
+
+        return heapq.nsmallest(limit, results, key=lambda s: (s.distance, -s.count, s.kind != "tag", len(s.text), s.text))
+
+    # ---------- private ----------
+
+    def _node_for(self, token: str, create: bool = False) -> Optional[_Node]:
+        node = self._root
+        for ch in token:
+            child = node.children.get(ch)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[ch] = _Node()
+            node = child
+        return node
+
+    def _matching_words(self, word: str, max_edits: int) -> Dict[str, int]:
+        """Every indexed word that `word` is a fuzzy prefix of, with its distance."""
+        matching: Dict[str, int] = {}
+        stack = [(self._root, "", list(range(len(word) + 1)), max_edits + 1)]
+        while stack:
+            node, path, row, matched = stack.pop()
+            matched = min(matched, row[-1])
+            if node.entries and matched <= max_edits:
+                matching[path] = matched
+            if matched > max_edits and min(row) > max_edits:
+                continue
+            for ch, child in node.children.items():
+                next_row = [row[0] + 1]
+                for i, wc in enumerate(word, start=1):
+                    next_row.append(min(next_row[i - 1] + 1, row[i] + 1, row[i - 1] + (wc != ch)))
+                stack.append((child, path + ch, next_row, matched))
+        return matching
+
+    def _entries_with_all(self, tokens: List[str]) -> Set[EntryKey]:
+        sets = []
+        for token in set(tokens):
+            node = self._node_for(token)
+            if node is None or not node.entries:
+                return set()
+            sets.append(node.entries)
+        sets.sort(key=len)
+        return set(sets[0]).intersection(*sets[1:])
+
+    def _invalidate(self, tokens: List[str]) -> None:
+        for token in tokens:
+            node = self._root
+            node.top = None
+            for ch in token:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                node.top = None
+
+    def _top(self, node: _Node) -> List[EntryKey]:
+        if node.top is None:
+            keys: Set[EntryKey] = set()
+            stack = [node]
+            while stack:
+                current = stack.pop()
+                keys.update(current.entries)
+                stack.extend(current.children.values())
+            node.top = heapq.nsmallest(self.node_cache_size, keys, key=lambda k: (-len(self._entries[k].posts), k))
+        return node.top
+
+    def _fuzzy_prefix(self, word: str, max_edits: int) -> List[Tuple[_Node, int]]:
+        """
+        Trie nodes whose path is within `max_edits` of `word` (the word is
+        treated as a prefix: anything below a matching node matches too).
+        """
+        matches = []
+        first_row = list(range(len(word) + 1))
+        if first_row[-1] <= max_edits:
+            matches.append((self._root, first_row[-1]))
+
+        stack = [(child, ch, first_row) for ch, child in self._root.children.items()]
+        while stack:
+            node, ch, previous = stack.pop()
+            row = [previous[0] + 1]
+            for i, wc in enumerate(word, start=1):
+                row.append(min(row[i - 1] + 1, previous[i] + 1, previous[i - 1] + (wc != ch)))
+            if row[-1] <= max_edits:
+                matches.append((node, row[-1]))
+            if min(row) <= max_edits:
+                stack.extend((child, c, row) for c, child in node.children.items())
+        return matches
+
+
+suggest_index = SuggestIndex(node_cache_size=int(os.getenv("SUGGEST_NODE_CACHE_SIZE", "50")))
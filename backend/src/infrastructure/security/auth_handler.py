@@ -3,6 +3,8 @@ from jose import jwt, JWTError
 from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from src.infrastructure.security.password_hasher import password_hasher
+from src.infrastructure.security.token_cache import token_cache
 
 SECRET_KEY = "your-very-secret-key-change-me"
 ALGORITHM = "HS256"
@@ -24,6 +26,14 @@ class AuthHandler:
         hashed_bytes = hashed_password.encode('utf-8')
         return bcrypt.checkpw(password_bytes, hashed_bytes)
 
+    @staticmethod
+    async def hash_password_async(password: str) -> str:
+        return await password_hasher.hash(password)
+
+    @staticmethod
+    async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return await password_hasher.verify(plain_password, hashed_password)
+
     @staticmethod
     def create_access_token(data: dict) -> str:
         to_encode = data.copy()
@@ -33,11 +43,16 @@ class AuthHandler:
 
     @staticmethod
     async def get_current_user(auth: HTTPAuthorizationCredentials = Security(security)):
+        cached = token_cache.get(auth.credentials)
+        if cached is not None:
+            return cached
+
         try:
             payload = jwt.decode(auth.credentials, SECRET_KEY, algorithms=[ALGORITHM])
             username: str = payload.get("sub")
             if username is None:
                 raise HTTPException(status_code=401, detail="توکن فاقد اطلاعات کاربری است")
+            token_cache.put(auth.credentials, username, payload.get("exp"))
             return username
         except JWTError:
             raise HTTPException(status_code=401, detail="توکن نامعتبر یا منقضی شده است")
\ No newline at end of file
@@ -1,26 +1,38 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import asyncio
+import os
 import random
+from datetime import datetime
+from typing import Optional
+
+from src.infrastructure.security.email_outbox import SmtpConnection, SmtpSettings, email_outbox
 
 class EmailHandler:
-    SENDER_EMAIL = "mahsahajirahimi2003@gmail.com"  
-    APP_PASSWORD = "ouai tpaw tvdf frms"   
-    SMTP_SERVER = "smtp.gmail.com"
-    SMTP_PORT = 465
+    SENDER_EMAIL = os.getenv("SMTP_SENDER", "mahsahajirahimi2003@gmail.com")
+    APP_PASSWORD = os.getenv("SMTP_PASSWORD", "ouai tpaw tvdf frms")
+    SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
+    SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+    SMTP_USE_SSL = os.getenv("SMTP_USE_SSL", "true").lower() == "true"
+
+    VERIFICATION_SUBJECT = "Lost & Found - Your Verification Code"
 
     @staticmethod
     def generate_otp():
         return str(random.randint(100000, 999999))
 
     @staticmethod
-    async def send_verification_email(email: str, otp: str):
-        message = MIMEMultipart()
-        message["From"] = EmailHandler.SENDER_EMAIL
-        message["To"] = email
-        message["Subject"] = "Lost & Found - Your Verification Code"
+    def smtp_settings() -> SmtpSettings:
+        return SmtpSettings(
+            host=EmailHandler.SMTP_SERVER,
+            port=EmailHandler.SMTP_PORT,
+            sender=EmailHandler.SENDER_EMAIL,
+            username=EmailHandler.SENDER_EMAIL,
+            password=EmailHandler.APP_PASSWORD,
+            use_ssl=EmailHandler.SMTP_USE_SSL,
+        )
 
-        body = f"""
+    @staticmethod
+    def verification_body(otp: str) -> str:
+        return f"""
         <html>
             <body dir="rtl" style="font-family: Tahoma, Arial, sans-serif; line-height: 1.6; color: #333; text-align: right;">
                 <div style="background-color: #f4f4f4; padding: 20px; border-radius: 10px;">
@@ -40,14 +52,35 @@ class EmailHandler:
             </body>
         </html>
         """
-        message.attach(MIMEText(body, "html"))
 
+    @staticmethod
+    async def enqueue_verification_email(email: str, otp: str, expires_at: Optional[datetime] = None):
+        """
+        Queues the OTP mail in the outbox; the background sender delivers it,
+        or drops it once the code expires.
+        """
+        await email_outbox.enqueue(
+            email, EmailHandler.VERIFICATION_SUBJECT, EmailHandler.verification_body(otp), expires_at=expires_at
+        )
+
+    @staticmethod
+    async def send_verification_email(email: str, otp: str):
+        """Sends immediately on a one-off connection, off the event loop."""
         try:
-            with smtplib.SMTP_SSL(EmailHandler.SMTP_SERVER, EmailHandler.SMTP_PORT) as server:
-                server.login(EmailHandler.SENDER_EMAIL, EmailHandler.APP_PASSWORD)
-                server.sendmail(EmailHandler.SENDER_EMAIL, email, message.as_string())
+            await asyncio.to_thread(
+                EmailHandler._send_once, email, EmailHandler.VERIFICATION_SUBJECT, EmailHandler.verification_body(otp)
+            )
             print(f"✅ Real Email sent successfully to {email}")
             return True
         except Exception as e:
             print(f"❌ Failed to send email: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    @staticmethod
+    def _send_once(to: str, subject: str, html: str) -> None:
+        # Runs in the worker thread: the QUIT on close blocks just like the send.
+        connection = SmtpConnection(EmailHandler.smtp_settings())
+        try:
+            connection.send(to, subject, html)
+        finally:
+            connection.close()
@@ -0,0 +1,215 @@
+import asyncio
+import smtplib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+from src.infrastructure.database.models.email_outbox_document import EmailOutboxDocument
+
+
+@dataclass
+class SmtpSettings:
+    host: str
+    port: int
+    sender: str
+    username: Optional[str] = None
+    password: Optional[str] = None
+    use_ssl: bool = True
+    timeout: float = 10.0
+
+
+class SmtpConnection:
+    """
+    One authenticated SMTP session reused across sends. Blocking; the
+    outbox calls it from a worker thread.
+    """
+
+    def __init__(self, settings: SmtpSettings):
+        self.settings = settings
+        self._server: Optional[smtplib.SMTP] = None
+        self.connects = 0
+
+    def send(self, to: str, subject: str, html: str) -> None:
+        message = MIMEMultipart()
+        message["From"] = self.settings.sender
+        message["To"] = to
+        message["Subject"] = subject
+        message.attach(MIMEText(html, "html"))
+
+        try:
+            self._connected().sendmail(self.settings.sender, to, message.as_string())
+        except smtplib.SMTPServerDisconnected:
+            # The server dropped an idle session; reconnect once and retry.
+            self.close()
+            self._connected().sendmail(self.settings.sender, to, message.as_string())
+
+    def close(self) -> None:
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            pass
+        self._server = None
+
+    def _connected(self) -> smtplib.SMTP:
+        if self._server is None:
+            s = self.settings
+            smtp_class = smtplib.SMTP_SSL if s.use_ssl else smtplib.SMTP
+            server = smtp_class(s.host, s.port, timeout=s.timeout)
+            if s.username:
+                server.login(s.username, s.password)
+            self._server = server
+            self.connects += 1
+        return self._server
+
+
+class EmailOutbox:
+    """
+    Persisted email queue. Producers insert a document and return; a
+    background task claims due messages in batches and sends them over a
+    reused SMTP connection, retrying failures with exponential backoff.
+    Messages with an `expires_at` (OTP mails) are dropped rather than sent
+    late, and every message has its body cleared once it leaves the queue.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 20,
+        poll_interval: float = 5.0,
+        idle_timeout: float = 60.0,
+        max_attempts: int = 5,
+        backoff_base: float = 5.0,
+        backoff_max: float = 300.0,
+    ):
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.idle_timeout = idle_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._connection: Optional[SmtpConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def enqueue(
+        self, to: str, subject: str, html: str, expires_at: Optional[datetime] = None,
+    ) -> EmailOutboxDocument:
+        """Queues a message; one not delivered by `expires_at` is dropped instead of retried."""
+        if expires_at is not None and expires_at.tzinfo is not None:
+            expires_at = expires_at.astimezone(timezone.utc).replace(tzinfo=None)
+        doc = EmailOutboxDocument(to=to, subject=subject, html=html, expires_at=expires_at)
+        await doc.insert()
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return doc
+
+    async def start(self, settings: SmtpSettings) -> None:
+        self._connection = SmtpConnection(settings)
+        # Messages claimed by a worker that died mid-send go back in the queue.
+        await EmailOutboxDocument.get_motor_collection().update_many(
+            {"status": "sending"}, {"$set": {"status": "pending"}}
+        )
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._connection is not None:
+            await asyncio.to_thread(self._connection.close)
+
+    async def process_due(self, connection: Optional[SmtpConnection] = None) -> int:
+        """Claims and sends one batch of due messages; returns how many were sent."""
+        connection = connection or self._connection
+        collection = EmailOutboxDocument.get_motor_collection()
+        sent = 0
+
+        for _ in range(self.batch_size):
+            now = datetime.utcnow()
+            raw = await collection.find_one_and_update(
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"$set": {"status": "sending"}, "$inc": {"attempts": 1}},
+                sort=[("next_attempt_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER,
+            )
+            if raw is None:
+                break
+            if self._expired(raw, now):
+                await collection.update_one({"_id": raw["_id"]}, {"$set": self._finished("expired")})
+                continue
+
+            try:
+                await asyncio.to_thread(connection.send, raw["to"], raw["subject"], raw["html"])
+            except Exception as e:
+                await asyncio.to_thread(connection.close)
+                await collection.update_one({"_id": raw["_id"]}, {"$set": self._failure(raw, e)})
+                continue
+
+            await collection.update_one(
+                {"_id": raw["_id"]},
+                {"$set": {**self._finished("sent"), "sent_at": datetime.utcnow(), "last_error": None}},
+            )
+            sent += 1
+
+        return sent
+
+    def _failure(self, raw: dict, error: Exception) -> dict:
+        attempts = raw["attempts"]
+        if attempts >= self.max_attempts:
+            return {**self._finished("failed"), "last_error": str(error)}
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        if self._expired(raw, next_attempt_at):
+            return {**self._finished("expired"), "last_error": str(error)}
+        return {
+            "status": "pending",
+            "last_error": str(error),
+            "next_attempt_at": next_attempt_at,
+        }
+
+    @staticmethod
+    def _expired(raw: dict, at: datetime) -> bool:
+        return raw.get("expires_at") is not None and raw["expires_at"] <= at
+
+    @staticmethod
+    def _finished(status: str) -> dict:
+        # The body is not needed once the message leaves the queue, and OTP
+        # mails would otherwise keep their code on disk until the TTL.
+        return {"status": status, "html": "", "finished_at": datetime.utcnow()}
+
+    async def _run(self) -> None:
+        idle_since = asyncio.get_running_loop().time()
+        while True:
+            # Cleared before looking for work so an enqueue racing with an
+            # empty batch still wakes the next wait.
+            self._wakeup.clear()
+            try:
+                sent = await self.process_due()
+            except Exception as e:
+                print(f"❌ Email outbox error: {e}")
+                sent = 0
+
+            loop_time = asyncio.get_running_loop().time()
+            if sent:
+                idle_since = loop_time
+                continue
+            if loop_time - idle_since > self.idle_timeout:
+                await asyncio.to_thread(self._connection.close)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+email_outbox = EmailOutbox()
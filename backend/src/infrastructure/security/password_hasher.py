@@ -0,0 +1,88 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+
+class PasswordHasherBusyError(Exception):
+    pass
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a bounded thread pool so hashing never blocks the event
+    loop. bcrypt releases the GIL while it works, so threads give real
+    parallelism without the pickling overhead of a process pool.
+
+    At most `max_concurrency` hashes run at once; callers that wait longer
+    than `queue_timeout` seconds for a slot get PasswordHasherBusyError
+    instead of piling up behind a login burst.
+    """
+
+    def __init__(self, max_concurrency: int = 4, queue_timeout: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="bcrypt")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode("utf-8"), bcrypt.gensalt())
+        return hashed.decode("utf-8")
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            bcrypt.checkpw,
+            plain_password.encode("utf-8"),
+            hashed_password.encode("utf-8"),
+        )
+
+    async def _run(self, fn, *args):
+        slots = self._semaphore()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise PasswordHasherBusyError("Password hashing is saturated, try again shortly")
+
+        self.in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release(slots)
+            raise
+        # The slot is tied to the bcrypt call, not to the awaiting task: a
+        # cancelled caller must not free it while the thread still runs.
+        future.add_done_callback(lambda _: self._release_threadsafe(loop, slots))
+        return await asyncio.wrap_future(future)
+
+    def _release(self, slots: asyncio.Semaphore) -> None:
+        self.in_flight -= 1
+        slots.release()
+
+    def _release_threadsafe(self, loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> None:
+        try:
+            loop.call_soon_threadsafe(self._release, slots)
+        except RuntimeError:
+            # The loop is gone (shutdown); its semaphore goes with it.
+            pass
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; rebuild if the loop changed
+        # (e.g. between test cases).
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        return self._slots
+
+
+password_hasher = PasswordHasher(
+    max_concurrency=int(os.getenv("PASSWORD_HASH_WORKERS", "4")),
+    queue_timeout=float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5")),
+)
@@ -0,0 +1,62 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified tokens -> username.
+
+    Only tokens that passed signature and expiry checks are stored, and each
+    entry expires at the token's own `exp` or after `ttl_seconds`, whichever
+    comes first, so the cache never accepts a token the verifier would reject
+    on expiry.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[str]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        username, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return username
+
+    def put(self, token: str, username: str, exp: Optional[float]) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+
+        self._entries[token] = (username, expires_at)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(
+    max_entries=int(os.getenv("TOKEN_CACHE_SIZE", "10000")),
+    ttl_seconds=float(os.getenv("TOKEN_CACHE_TTL", "300")),
+)
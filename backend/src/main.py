@@ -4,7 +4,6 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware 
 from fastapi.responses import RedirectResponse 
 from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
 
 # Routes
 from src.api.routes.auth_routes import router as auth_router
@@ -12,16 +11,26 @@ from src.api.routes.category_routes import router as category_router
 from src.api.routes.post_routes import router as post_router
 from src.api.routes.interaction_routes import router as interaction_router 
 from src.api.routes.map_routes import router as map_router  
+from src.api.routes.media_routes import router as media_router
+from src.api.routes.event_routes import router as event_router
+from src.api.routes.metrics_routes import router as metrics_router
 
 # Models
+from src.infrastructure.database.models import DOCUMENT_MODELS
 from src.infrastructure.database.models.user_document import UserDocument
-from src.infrastructure.database.models.category_document import CategoryDocument
-from src.infrastructure.database.models.post_document import PostDocument
-from src.infrastructure.database.models.otp_document import OTPDocument 
-from src.infrastructure.database.models.comment_document import CommentDocument 
-from src.infrastructure.database.models.report_document import ReportDocument 
+from src.infrastructure.database.indexes import init_documents
 
 from src.infrastructure.security.auth_handler import AuthHandler
+from src.infrastructure.security.email_handler import EmailHandler
+from src.infrastructure.repositories.mongo_category_repository import MongoCategoryRepository
+from src.infrastructure.repositories.mongo_comment_repository import CommentRepository
+from src.infrastructure.repositories.mongo_post_match_repository import MongoPostMatchRepository
+from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.search.search_index import search_index
+from src.infrastructure.search.suggest_index import suggest_index
+from src.infrastructure.security.email_outbox import email_outbox
+from src.infrastructure.media.image_store import image_store
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -29,21 +38,15 @@ async def lifespan(app: FastAPI):
     mongo_db = os.getenv("MONGO_DB", "lost_and_found_v2")
     client = AsyncIOMotorClient(mongo_uri)
 
-    await init_beanie(
-        database=client[mongo_db],
-        document_models=[
-            UserDocument,
-            OTPDocument,
-            CategoryDocument,
-            PostDocument,
-            CommentDocument, 
-            ReportDocument   
-        ],
-    )
+    # Indexes are declared on each document's Settings; indexes.py creates
+    # them before serving and Beanie is initialized without its own index step.
+    for drift in await init_documents(client[mongo_db], DOCUMENT_MODELS):
+        if not drift.clean:
+            print(f"⚠️  Index drift: {drift}")
 
     existing_user = await UserDocument.find_one({"username": "admin"})
     if not existing_user:
-        hashed_pass = AuthHandler.hash_password("password123") 
+        hashed_pass = await AuthHandler.hash_password_async("password123")
         admin_user = UserDocument(
             username="admin",
             password=hashed_pass,
@@ -51,19 +54,24 @@ async def lifespan(app: FastAPI):
         )
         await admin_user.insert()
         print("✅ Test user 'admin' created successfully.")
-    
-    yield
 
-    # Text index for title + description
-    await PostDocument.get_motor_collection().create_index(
-        [
-            ("title", "text"),
-            ("description", "text"),
-        ]
-    )
+    # Categories first: map snapshot items and post responses embed them.
+    await MongoCategoryRepository().ensure_category_cache()
+    await MongoPostRepository().ensure_search_index()
+    await MongoPostMatchRepository().ensure_match_engine()
+    await MongoPostRepository().ensure_map_snapshot()
+    print(f"✅ Search indexes loaded ({len(search_index)} posts, {len(suggest_index)} suggestions, {len(map_snapshot)} map items).")
+
+    threaded = await CommentRepository().backfill_paths()
+    if threaded:
+        print(f"✅ Threaded {threaded} existing comments.")
+
+    await email_outbox.start(EmailHandler.smtp_settings())
+
+    yield
 
-    # Index for tags
-    await PostDocument.get_motor_collection().create_index("tags")
+    await email_outbox.stop()
+    image_store.shutdown()
     client.close()
 
 app = FastAPI(title="Lost and Found University System", lifespan=lifespan) 
@@ -74,6 +82,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
 )
 
 app.include_router(auth_router)
@@ -81,6 +90,9 @@ app.include_router(category_router)
 app.include_router(post_router)
 app.include_router(interaction_router) 
 app.include_router(map_router) 
+app.include_router(media_router)
+app.include_router(event_router)
+app.include_router(metrics_router)
 
 @app.get("/", include_in_schema=False)
 async def read_root():
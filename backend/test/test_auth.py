@@ -17,13 +17,14 @@ from src.infrastructure.database.models.user_document import UserDocument
 from src.infrastructure.database.models.otp_document import OTPDocument
 from src.infrastructure.security.auth_handler import AuthHandler
 from src.infrastructure.security.email_handler import EmailHandler
+from src.infrastructure.database.models.email_outbox_document import EmailOutboxDocument
 
 @pytest_asyncio.fixture(autouse=True)
 async def init_test_db():
     client = AsyncMongoMockClient()
     await init_beanie(
         database=client.test_db,
-        document_models=[UserDocument, OTPDocument]
+        document_models=[UserDocument, OTPDocument, EmailOutboxDocument]
     )
 
 @pytest.mark.asyncio
@@ -233,4 +234,124 @@ async def test_auth_handler_token_missing_sub():
     
     with pytest.raises(HTTPException) as excinfo:
         await AuthHandler.get_current_user(auth_creds)
-    assert excinfo.value.status_code == 401
\ No newline at end of file
+    assert excinfo.value.status_code == 401
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_queue_times_out():
+    import asyncio
+    from src.infrastructure.security.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+    hasher = PasswordHasher(max_concurrency=1, queue_timeout=0.01)
+    results = await asyncio.gather(
+        hasher.hash("first"), hasher.hash("second"), return_exceptions=True
+    )
+    assert sum(isinstance(r, PasswordHasherBusyError) for r in results) == 1
+    assert hasher.rejected == 1
+    ok = next(r for r in results if isinstance(r, str))
+    assert await hasher.verify("first", ok) or await hasher.verify("second", ok)
+
+@pytest.mark.asyncio
+async def test_password_hasher_keeps_slot_until_cancelled_hash_finishes():
+    import asyncio
+    import threading
+    from src.infrastructure.security.password_hasher import PasswordHasher
+
+    hasher = PasswordHasher(max_concurrency=1, queue_timeout=5)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    task = asyncio.create_task(hasher._run(slow))
+    await asyncio.to_thread(started.wait, 5)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # The bcrypt thread is still busy, so the slot must still be taken.
+    assert hasher.in_flight == 1
+    waiter = asyncio.create_task(hasher._run(lambda: "next"))
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+
+    release.set()
+    assert await waiter == "next"
+    assert hasher.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_benchmark_logins_do_not_block_other_routes():
+    """Login throughput while a probe route keeps being served."""
+    import asyncio
+    import time
+
+    password = "ValidPassword123"
+    hashed = await AuthHandler.hash_password_async(password)
+    await UserDocument(username="bench", email="bench@sharif.edu", password=hashed).insert()
+
+    start = time.perf_counter()
+    await AuthHandler.verify_password_async(password, hashed)
+    single_verify = time.perf_counter() - start
+
+    logins = 8
+    probe_latencies = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        async def login():
+            response = await ac.post("/auth/login", json={"username": "bench", "password": password})
+            assert response.status_code == 200
+
+        async def probe(stop):
+            while not stop.is_set():
+                t = time.perf_counter()
+                await ac.post("/auth/login", json={"username": "nobody", "password": "x"})
+                probe_latencies.append(time.perf_counter() - t)
+                await asyncio.sleep(0.005)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe_task
+
+    probe_latencies.sort()
+    median = probe_latencies[len(probe_latencies) // 2]
+    print(f"\nlogins: {logins / elapsed:.1f}/s, bcrypt verify {single_verify * 1000:.0f}ms, "
+          f"probe p50 {median * 1000:.1f}ms / max {probe_latencies[-1] * 1000:.1f}ms "
+          f"over {len(probe_latencies)} requests")
+    # With bcrypt on the loop each probe would wait for a whole verify. Worker
+    # threads still compete for CPU on small machines, so judge the median.
+    assert len(probe_latencies) > logins
+    assert median < single_verify / 4
+
+@pytest.mark.asyncio
+async def test_get_current_user_caches_verified_tokens():
+    from fastapi.security import HTTPAuthorizationCredentials
+    from src.infrastructure.security.token_cache import token_cache
+
+    token_cache.clear()
+    token = AuthHandler.create_access_token({"sub": "cached_user"})
+    auth_creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    with patch("src.infrastructure.security.auth_handler.jwt.decode", wraps=jwt.decode) as decode:
+        assert await AuthHandler.get_current_user(auth_creds) == "cached_user"
+        assert await AuthHandler.get_current_user(auth_creds) == "cached_user"
+    assert decode.call_count == 1
+    assert token_cache.hits == 1
+    assert token_cache.misses == 1
+
+def test_token_cache_entries_expire_with_token():
+    import time
+    from src.infrastructure.security.token_cache import TokenCache
+
+    cache = TokenCache(max_entries=2, ttl_seconds=300)
+    cache.put("expired", "u1", exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache.put("a", "u1", exp=None)
+    cache.put("b", "u2", exp=None)
+    cache.put("c", "u3", exp=None)
+    assert cache.get("a") is None
+    assert cache.get("c") == "u3"
@@ -0,0 +1,104 @@
+import gc
+import json
+import time
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from unittest.mock import patch
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.search.search_index import search_index
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+    search_index.clear()
+
+def headers(**extra):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'registrar'})}", **extra}
+
+WORDS = ["کیف", "گوشی", "کلید", "کارت", "عینک", "ساعت", "کتاب", "چتر", "دفتر", "فلش", "شارژر", "هدفون"]
+
+def item(i, **overrides):
+    words = " ".join(WORDS[(i // 12 ** k) % 12] + str(k) for k in range(3))
+    data = {
+        "type": "found", "title": words, "category_key": "bags", "tag": "",
+        "description": f"ثبت {words}", "publisher_username": "ignored",
+        "location": {"type": "Point", "coordinates": [51.38, 35.70]},
+        "created_at": "2019-03-01T10:00:00",
+    }
+    data.update(overrides)
+    return data
+
+@pytest.mark.asyncio
+async def test_bulk_json_array_reports_each_item():
+    items = [item(0), item(1, type="stolen"), item(2), item(0, image_url="http://x/y.jpg")]
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        res = await ac.post("/posts/bulk?duplicates=reject", json=items, headers=headers())
+        search = await ac.get("/posts/search", params={"query": "ثبت"})
+
+    body = res.json()
+    assert res.status_code == 200
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [r["status"] for r in body["results"]] == ["created", "invalid", "created", "duplicate"]
+    assert "type" in body["results"][1]["error"]
+    assert body["results"][3]["duplicate_of"] == body["results"][0]["id"]
+
+    stored = await PostDocument.get(body["results"][0]["id"])
+    assert stored.publisher_username == "registrar"
+    assert stored.created_at.year == 2019
+    assert stored.fingerprint_bands
+    assert len(search.json()) == 2
+
+@pytest.mark.asyncio
+async def test_bulk_ndjson_stream_in_chunks():
+    lines = [json.dumps(item(i), ensure_ascii=False) for i in range(25)]
+    lines.insert(10, "{not json")
+    body = "\n".join(lines).encode("utf-8")
+
+    async def chunks():
+        for start in range(0, len(body), 97):
+            yield body[start:start + 97]
+
+    with patch("src.api.routes.post_routes.BULK_CHUNK_SIZE", 7):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            res = await ac.post("/posts/bulk?duplicates=flag", content=chunks(), headers=headers(**{"Content-Type": "application/x-ndjson"}))
+            same = await ac.post("/posts/bulk?duplicates=off", json=[item(0), item(0)], headers=headers())
+            bad = await ac.post("/posts/bulk", json={"not": "a list"}, headers=headers())
+
+    results = res.json()["results"]
+    assert res.json()["created"] == 25
+    assert [r["index"] for r in results] == list(range(26))
+    assert results[10]["status"] == "invalid"
+    assert await PostDocument.count() == 25 + 2
+    assert bad.status_code == 400
+    assert same.json()["created"] == 2
+
+@pytest.mark.asyncio
+async def test_bulk_import_is_much_faster_than_one_by_one():
+    n = 400
+    # Collector pauses land on one side or the other and dominate the noise.
+    gc.disable()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            start = time.perf_counter()
+            for i in range(n // 4):
+                await ac.post("/posts/add", json=item(i, created_at=None), headers=headers())
+            single = (time.perf_counter() - start) / (n // 4)
+
+            bulk = float("inf")
+            for offset in (n, 2 * n):
+                start = time.perf_counter()
+                res = await ac.post("/posts/bulk?duplicates=off", json=[item(i) for i in range(offset, offset + n)], headers=headers())
+                bulk = min(bulk, (time.perf_counter() - start) / n)
+                assert res.json()["created"] == n
+    finally:
+        gc.enable()
+
+    assert bulk < single / 2
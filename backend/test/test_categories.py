@@ -0,0 +1,76 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from src.main import app
+from src.domain.entities.category import Category
+from src.infrastructure.cache.category_cache import category_cache
+from src.infrastructure.database.models.category_document import CategoryDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.repositories.mongo_category_repository import MongoCategoryRepository
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[CategoryDocument, PostDocument, PostMatchDocument])
+    category_cache.clear()
+    map_snapshot.clear()
+    yield
+    category_cache.clear()
+    map_snapshot.clear()
+
+def auth():
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'admin'})}"}
+
+async def add_post(category_key="keys"):
+    await PostDocument(
+        type="found", title="دسته کلید", category_key=category_key, description=".",
+        publisher_username="u1", created_at=datetime.now(timezone.utc), tag="کلید",
+        location={"type": "Point", "coordinates": [51.38, 35.70]},
+    ).insert()
+
+@pytest.mark.asyncio
+async def test_categories_served_from_cache_and_written_through():
+    await CategoryDocument(key="keys", title_fa="کلید", color_code="#ffe347").insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/categories/all")
+        with patch.object(CategoryDocument, "find_all", side_effect=AssertionError("database read")):
+            created = await ac.post("/categories/add", headers=auth(),
+                                    json={"key": "books", "title_fa": "کتاب", "color_code": "#ff9f43"})
+            second = await ac.get("/categories/all")
+
+    assert [c["key"] for c in first.json()] == ["keys"]
+    assert created.status_code == 200
+    assert [c["key"] for c in second.json()] == ["keys", "books"]
+
+@pytest.mark.asyncio
+async def test_posts_and_map_items_carry_category_fields():
+    await add_post("keys")
+    await add_post("unknown")
+    await MongoCategoryRepository().create(Category(key="keys", title_fa="کلید", color_code="#ffe347"))
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        posts = (await ac.get("/posts/category/keys")).json()
+        items = (await ac.get("/lostAndFoundItems")).json()
+
+    assert (posts[0]["title_fa"], posts[0]["color_code"]) == ("کلید", "#ffe347")
+    by_category = {item["category_key"]: item for item in items}
+    assert (by_category["keys"]["title_fa"], by_category["keys"]["color_code"]) == ("کلید", "#ffe347")
+    assert by_category["unknown"]["title_fa"] is None
+
+@pytest.mark.asyncio
+async def test_new_category_refreshes_cached_map_items():
+    await add_post("books")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        before = (await ac.get("/lostAndFoundItems")).json()
+        await ac.post("/categories/add", headers=auth(), json={"key": "books", "title_fa": "کتاب", "color_code": "#ff9f43"})
+        after = (await ac.get("/lostAndFoundItems")).json()
+
+    assert before[0]["title_fa"] is None
+    assert after[0]["title_fa"] == "کتاب"
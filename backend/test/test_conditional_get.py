@@ -0,0 +1,108 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from unittest.mock import patch
+
+from src.main import app
+from src.application.use_cases.list_posts import ListPostsUseCase
+from src.application.use_cases.query_posts import QueryPostsUseCase
+from src.infrastructure.cache.category_cache import category_cache
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.database.models.category_document import CategoryDocument
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.search.search_index import search_index
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[CategoryDocument, CommentDocument, PostDocument, PostMatchDocument]
+    )
+    search_index.clear()
+    category_cache.clear()
+    map_snapshot.clear()
+
+def auth():
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'u1'})}"}
+
+async def add_post(ac, title="کیف پول"):
+    response = await ac.post("/posts/add", headers=auth(), json={
+        "type": "lost", "title": title, "category_key": "bags", "tag": "کیف",
+        "description": title, "publisher_username": "x",
+        "location": {"type": "Point", "coordinates": [51.38, 35.70]},
+    })
+    return response.json()["id"]
+
+@pytest.mark.asyncio
+async def test_posts_unchanged_answer_304_without_query():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await add_post(ac)
+        first = await ac.get("/posts/all")
+        etag = first.headers["etag"]
+        with patch.object(ListPostsUseCase, "execute", side_effect=AssertionError("queried")):
+            again = await ac.get("/posts/all", headers={"If-None-Match": etag})
+        other_page = await ac.get("/posts/all", params={"limit": 1}, headers={"If-None-Match": etag})
+
+        await add_post(ac, title="گوشی سامسونگ")
+        after_write = await ac.get("/posts/all", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+    assert other_page.status_code == 200
+    assert after_write.status_code == 200 and len(after_write.json()) == 2
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path, use_case", [("/posts/all", ListPostsUseCase), ("/posts/query", QueryPostsUseCase)])
+async def test_posts_written_while_rendering_go_out_without_validators(path, use_case):
+    execute = use_case.execute
+
+    async def write_midway(self, *args, **kwargs):
+        result = await execute(self, *args, **kwargs)
+        collection_versions.bump("posts")
+        return result
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        await add_post(ac)
+        with patch.object(use_case, "execute", write_midway):
+            raced = await ac.get(path)
+        settled = await ac.get(path)
+
+    assert raced.status_code == 200 and len(raced.json()) == 1
+    assert "etag" not in raced.headers and "last-modified" not in raced.headers
+    assert raced.headers["cache-control"] == "no-cache"
+    assert "etag" in settled.headers
+
+@pytest.mark.asyncio
+async def test_map_etag_follows_comments_and_if_modified_since():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        post_id = await add_post(ac)
+        first = await ac.get("/lostAndFoundItems")
+        by_date = await ac.get("/lostAndFoundItems", headers={"If-Modified-Since": first.headers["last-modified"]})
+        unchanged = await ac.get("/lostAndFoundItems", headers={"If-None-Match": first.headers["etag"]})
+
+        await ac.post("/interact/comment", json={"post_id": post_id, "content": "پیدا شد"}, headers=auth())
+        changed = await ac.get("/lostAndFoundItems", headers={"If-None-Match": first.headers["etag"]})
+
+    assert by_date.status_code == 304
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.json()[0]["comments_count"] == 1
+
+@pytest.mark.asyncio
+async def test_categories_revalidate_until_a_category_is_added():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/categories/all")
+        unchanged = await ac.get("/categories/all", headers={"If-None-Match": f'"x", {first.headers["etag"]}'})
+        await ac.post("/categories/add", headers=auth(), json={"key": "keys", "title_fa": "کلید", "color_code": "#ffe347"})
+        changed = await ac.get("/categories/all", headers={"If-None-Match": first.headers["etag"]})
+
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200 and changed.json()[0]["key"] == "keys"
@@ -0,0 +1,103 @@
+import hashlib
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from src.main import app
+from src.infrastructure.database.fingerprints import backfill_fingerprints
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.search.fingerprint import fingerprint_bands, minhash, post_fingerprint, shingles, similarity
+from src.infrastructure.security.auth_handler import AuthHandler
+
+WALLET = ("کیف پول مشکی", "کیف پول مشکی چرمی را در کتابخانه مرکزی گم کردم، داخلش کارت دانشجویی بود")
+WALLET_AGAIN = ("كيف پول مشكي", "کیف پول مشکی چرمی را در کتابخانه مرکزی گم کردم داخلش کارت ملی بود!")
+PHONE = ("گوشی سامسونگ", "گوشی سامسونگ آبی را در سلف جا گذاشتم")
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+
+def headers(username):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': username})}"}
+
+def payload(text, type="lost"):
+    title, description = text
+    return {
+        "type": type, "title": title, "category_key": "bags", "tag": "کیف",
+        "description": description, "publisher_username": "ignored",
+        "location": {"type": "Point", "coordinates": [51.38, 35.70]},
+    }
+
+def test_minhash_separates_reposts_from_different_items():
+    wallet, again, phone = (post_fingerprint(t, d, "کیف") for t, d in (WALLET, WALLET_AGAIN, PHONE))
+    assert similarity(wallet, again) >= 0.7
+    assert similarity(wallet, phone) < 0.3
+    assert set(fingerprint_bands(wallet)) & set(fingerprint_bands(again))
+    assert post_fingerprint("", "", None) is None
+
+def test_minhash_matches_exact_integer_arithmetic():
+    from src.infrastructure.search import fingerprint
+    features = shingles(WALLET[0] + " " + WALLET[1])
+    xs = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest(), "big") for f in features]
+    p = int(fingerprint._PRIME)
+    exact = [min((int(a) * (x % p) + int(b)) % p for x in xs) for a, b in zip(fingerprint._A, fingerprint._B)]
+    assert minhash(features) == exact
+
+@pytest.mark.asyncio
+async def test_repost_by_same_publisher_is_rejected():
+    with patch("src.infrastructure.repositories.mongo_post_repository.DUPLICATE_POLICY", "reject"):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.post("/posts/add", json=payload(WALLET), headers=headers("ali"))
+            repost = await ac.post("/posts/add", json=payload(WALLET_AGAIN), headers=headers("ali"))
+            other_user = await ac.post("/posts/add", json=payload(WALLET_AGAIN), headers=headers("sara"))
+            found = await ac.post("/posts/add", json=payload(WALLET_AGAIN, type="found"), headers=headers("ali"))
+            phone = await ac.post("/posts/add", json=payload(PHONE), headers=headers("ali"))
+            edit = await ac.put(
+                f"/posts/{phone.json()['id']}",
+                json={"title": WALLET_AGAIN[0], "description": WALLET_AGAIN[1], "tag": "کیف"},
+                headers=headers("ali"),
+            )
+
+    assert first.status_code == 200
+    assert repost.status_code == 409
+    assert repost.json()["detail"]["duplicate_of"] == first.json()["id"]
+    assert other_user.status_code == 200
+    assert found.status_code == 200
+    assert phone.status_code == 200
+    assert edit.status_code == 409
+    assert await PostDocument.count() == 4
+
+@pytest.mark.asyncio
+async def test_reposts_are_flagged_by_default():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.post("/posts/add", json=payload(WALLET), headers=headers("ali"))
+        repost = await ac.post("/posts/add", json=payload(WALLET_AGAIN), headers=headers("ali"))
+
+    assert repost.status_code == 200
+    assert repost.json()["duplicate_of"] == first.json()["id"]
+    assert first.json()["duplicate_of"] is None
+
+@pytest.mark.asyncio
+async def test_backfill_fingerprints_and_flags_legacy_reposts():
+    start = datetime(2024, 1, 1)
+    for i, (text, user) in enumerate([(WALLET, "ali"), (PHONE, "ali"), (WALLET_AGAIN, "ali"), (WALLET_AGAIN, "sara")]):
+        await PostDocument(
+            type="lost", title=text[0], description=text[1], tag="کیف", category_key="bags",
+            publisher_username=user, created_at=start + timedelta(hours=i),
+        ).insert()
+
+    database = PostDocument.get_motor_collection().database
+    report = await backfill_fingerprints(database, flag_duplicates=True)
+    again = await backfill_fingerprints(database, flag_duplicates=True)
+
+    posts = await PostDocument.find({}).sort("+created_at").to_list()
+    assert (report.scanned, report.fingerprinted, report.duplicates) == (4, 4, 1)
+    assert (again.fingerprinted, again.duplicates) == (0, 1)
+    assert [p.duplicate_of for p in posts] == [None, None, str(posts[0].id), None]
+    assert all(len(p.fingerprint_bands) == 8 for p in posts)
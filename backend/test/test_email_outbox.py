@@ -0,0 +1,140 @@
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from aiosmtpd.controller import Controller
+from beanie import init_beanie
+from httpx import AsyncClient, ASGITransport
+from mongomock_motor import AsyncMongoMockClient
+
+from src.main import app
+from src.infrastructure.database.models.email_outbox_document import EmailOutboxDocument
+from src.infrastructure.database.models.otp_document import OTPDocument
+from src.infrastructure.database.models.user_document import UserDocument
+from src.infrastructure.security.email_outbox import EmailOutbox, SmtpConnection, SmtpSettings
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[EmailOutboxDocument, OTPDocument, UserDocument]
+    )
+
+class RecordingHandler:
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode("utf-8", "replace")))
+        return "250 OK"
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+def settings_for(port):
+    return SmtpSettings(host="127.0.0.1", port=port, sender="noreply@sharif.edu", use_ssl=False)
+
+@pytest.mark.asyncio
+async def test_send_otp_only_queues_the_email():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/auth/send-otp", json={"email": "queued@sharif.edu"})
+    assert response.status_code == 200
+    queued = await EmailOutboxDocument.find_one(EmailOutboxDocument.to == "queued@sharif.edu")
+    otp = await OTPDocument.find_one(OTPDocument.email == "queued@sharif.edu")
+    assert queued.status == "pending"
+    assert otp.otp_code in queued.html
+    assert abs(queued.expires_at - otp.expire_at.replace(tzinfo=None)) < timedelta(seconds=1)
+
+@pytest.mark.asyncio
+async def test_outbox_sends_batch_over_one_connection(smtp_server):
+    controller, handler = smtp_server
+    outbox = EmailOutbox(batch_size=10)
+    for i in range(3):
+        await outbox.enqueue(f"user{i}@sharif.edu", "subject", f"<p>{i}</p>")
+
+    connection = SmtpConnection(settings_for(controller.port))
+    sent = await outbox.process_due(connection)
+    connection.close()
+
+    assert sent == 3
+    assert handler.sessions == 1
+    assert sorted(rcpt[0] for rcpt, _ in handler.messages) == [f"user{i}@sharif.edu" for i in range(3)]
+    sent_docs = await EmailOutboxDocument.find(EmailOutboxDocument.status == "sent").to_list()
+    assert len(sent_docs) == 3
+    assert all(doc.html == "" and doc.finished_at for doc in sent_docs)
+
+@pytest.mark.asyncio
+async def test_outbox_drops_messages_past_their_expiry(smtp_server):
+    controller, handler = smtp_server
+    outbox = EmailOutbox()
+    stale = await outbox.enqueue("late@sharif.edu", "code", "<p>123456</p>", expires_at=datetime.utcnow() - timedelta(seconds=1))
+    fresh = await outbox.enqueue("ok@sharif.edu", "code", "<p>654321</p>", expires_at=datetime.utcnow() + timedelta(minutes=5))
+
+    connection = SmtpConnection(settings_for(controller.port))
+    assert await outbox.process_due(connection) == 1
+    connection.close()
+
+    assert [rcpt for rcpt, _ in handler.messages] == [["ok@sharif.edu"]]
+    dropped = await EmailOutboxDocument.get(stale.id)
+    assert dropped.status == "expired" and dropped.html == "" and dropped.finished_at
+    assert (await EmailOutboxDocument.get(fresh.id)).status == "sent"
+
+@pytest.mark.asyncio
+async def test_outbox_does_not_retry_past_expiry():
+    outbox = EmailOutbox(backoff_base=300)
+    doc = await outbox.enqueue("down@sharif.edu", "code", "<p>123456</p>", expires_at=datetime.utcnow() + timedelta(minutes=1))
+    connection = SmtpConnection(settings_for(free_port()))  # nothing listens here
+
+    assert await outbox.process_due(connection) == 0
+    expired = await EmailOutboxDocument.get(doc.id)
+    assert expired.status == "expired"
+    assert expired.attempts == 1 and expired.last_error
+    assert expired.html == ""
+
+def test_finished_messages_have_a_ttl():
+    ttl = [index.document for index in EmailOutboxDocument.Settings.indexes if "expireAfterSeconds" in index.document]
+    assert [list(index["key"]) for index in ttl] == [["finished_at"]]
+
+@pytest.mark.asyncio
+async def test_outbox_retries_with_backoff_then_fails():
+    outbox = EmailOutbox(max_attempts=2, backoff_base=30)
+    doc = await outbox.enqueue("down@sharif.edu", "subject", "<p>x</p>")
+    connection = SmtpConnection(settings_for(free_port()))  # nothing listens here
+
+    assert await outbox.process_due(connection) == 0
+    retried = await EmailOutboxDocument.get(doc.id)
+    assert retried.status == "pending"
+    assert retried.attempts == 1
+    assert retried.last_error
+    assert retried.next_attempt_at > datetime.utcnow()
+
+    # Not due yet, so nothing is claimed.
+    assert await outbox.process_due(connection) == 0
+    assert (await EmailOutboxDocument.get(doc.id)).attempts == 1
+
+    await EmailOutboxDocument.get_motor_collection().update_one(
+        {"_id": doc.id}, {"$set": {"next_attempt_at": datetime.utcnow()}}
+    )
+    await outbox.process_due(connection)
+    failed = await EmailOutboxDocument.get(doc.id)
+    assert failed.status == "failed"
+    assert failed.attempts == 2
+    assert failed.html == "" and failed.finished_at
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+
+from src.main import app
+from src.api.routes.event_routes import sse_events
+from src.domain.entities.geo_location import BoundingBox
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.database.models.report_document import ReportDocument
+from src.infrastructure.events.event_bus import EventBus, SlowConsumerError, event_bus
+from src.infrastructure.security.auth_handler import AuthHandler
+
+TEHRAN = {"type": "Point", "coordinates": [51.38, 35.70]}
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[PostDocument, CommentDocument, ReportDocument, PostMatchDocument]
+    )
+    event_bus.clear()
+
+def auth(username):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': username})}"}
+
+def drain(sub):
+    events = list(sub.backlog)
+    sub.backlog.clear()
+    while not sub.queue.empty():
+        events.append(sub.queue.get_nowait())
+    return events
+
+async def make_post():
+    post = PostDocument(
+        type="lost", title="کیف", category_key="bags", description=".",
+        publisher_username="owner", created_at=datetime.now(timezone.utc), tag="t", location=TEHRAN,
+    )
+    await post.insert()
+    return post
+
+@pytest.mark.asyncio
+async def test_bus_routes_by_topic_post_and_bbox():
+    bus = EventBus()
+    everything = bus.subscribe()
+    one_post = bus.subscribe(post_ids={"p1"})
+    tehran = bus.subscribe(topics={"posts"}, bbox=BoundingBox(51, 35, 52, 36))
+
+    bus.publish("posts", "post.created", {}, post_id="p1", location=TEHRAN)
+    bus.publish("posts", "post.created", {}, post_id="p2", location={"coordinates": [59.6, 36.3]})
+    bus.publish("comments", "comment.created", {}, post_id="p1", location=TEHRAN)
+
+    assert [e.id for e in drain(everything)] == [1, 2, 3]
+    assert [e.id for e in drain(one_post)] == [1, 3]
+    assert [e.id for e in drain(tehran)] == [1]
+
+    bus.unsubscribe(one_post)
+    assert len(bus) == 2
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped_and_replayed():
+    bus = EventBus(max_queue=2, history=10)
+    slow = bus.subscribe()
+    for i in range(3):
+        bus.publish("posts", "post.created", {"i": i})
+
+    assert slow.dropped and len(bus) == 0
+    with pytest.raises(SlowConsumerError):
+        await slow.next(0.01)
+
+    resumed = bus.subscribe(last_event_id=1)
+    assert [e.id for e in drain(resumed)] == [2, 3]
+
+    for i in range(10):
+        bus.publish("posts", "post.created", {"i": i})
+    too_old = bus.subscribe(last_event_id=1)
+    assert [e.name for e in drain(too_old)] == ["reset"]
+
+@pytest.mark.asyncio
+async def test_replay_longer_than_queue_is_not_dropped():
+    bus = EventBus(max_queue=2, history=10)
+    for i in range(8):
+        bus.publish("posts", "post.created", {"i": i})
+
+    resumed = bus.subscribe(last_event_id=1)
+    bus.publish("posts", "post.created", {"i": 8})
+    assert not resumed.dropped
+    assert [(await resumed.next(0.01)).id for _ in range(8)] == [2, 3, 4, 5, 6, 7, 8, 9]
+
+@pytest.mark.asyncio
+async def test_post_comment_and_report_publish_events():
+    sub = event_bus.subscribe()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        created = await ac.post("/posts/add", headers=auth("owner"), json={
+            "type": "found", "title": "دسته کلید", "category_key": "keys", "tag": "کلید",
+            "description": "جلوی کتابخانه", "publisher_username": "x", "location": TEHRAN,
+        })
+        post_id = created.json()["id"]
+        await ac.post("/interact/comment", json={"post_id": post_id, "content": "مال من است"}, headers=auth("reader"))
+        await ac.post(f"/interact/report/post/{post_id}", headers=auth("reader"))
+        await ac.delete(f"/posts/{post_id}", headers=auth("owner"))
+
+    events = drain(sub)
+    assert [e.name for e in events] == ["post.created", "comment.created", "post.reported", "post.deleted"]
+    assert all(e.post_id == post_id and e.point == (51.38, 35.70) for e in events)
+    assert events[0].data["title"] == "دسته کلید"
+    assert events[2].data["reports_count"] == 1
+
+@pytest.mark.asyncio
+async def test_sse_stream_formats_events():
+    sub = event_bus.subscribe(post_ids={"p1"})
+    stream = sse_events(sub)
+    assert await anext(stream) == "retry: 3000\n\n"
+
+    event_bus.publish("comments", "comment.created", {"content": "سلام"}, post_id="p1")
+    chunk = await anext(stream)
+    assert chunk.startswith("id: 1\nevent: comment.created\n")
+    assert json.loads(chunk.split("data: ")[1]) == {"content": "سلام"}
+
+    await stream.aclose()
+    assert len(event_bus) == 0
+
+@pytest.mark.asyncio
+async def test_sse_rejects_bad_filters():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        bad_topic = await ac.get("/events", params={"topics": "posts,likes"})
+        bad_bbox = await ac.get("/events", params={"bbox": "1,2"})
+    assert bad_topic.status_code == 400
+    assert bad_bbox.status_code == 400
+
+@pytest.mark.asyncio
+async def test_websocket_delivers_matching_events():
+    incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+    scope = {
+        "type": "websocket", "path": "/events/ws", "raw_path": b"/events/ws",
+        "query_string": b"post_id=p1", "headers": [], "scheme": "ws", "subprotocols": [],
+    }
+    await incoming.put({"type": "websocket.connect"})
+    server = asyncio.create_task(app(scope, incoming.get, outgoing.put))
+
+    assert (await asyncio.wait_for(outgoing.get(), 1))["type"] == "websocket.accept"
+    event_bus.publish("posts", "post.updated", {"id": "p2"}, post_id="p2")
+    event_bus.publish("posts", "post.updated", {"id": "p1"}, post_id="p1")
+    message = json.loads((await asyncio.wait_for(outgoing.get(), 1))["text"])
+    assert message == {"id": 2, "event": "post.updated", "data": {"id": "p1"}}
+
+    await incoming.put({"type": "websocket.disconnect", "code": 1000})
+    await asyncio.wait_for(server, 1)
+    assert len(event_bus) == 0
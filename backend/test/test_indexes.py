@@ -0,0 +1,95 @@
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from src.infrastructure.database.indexes import (
+    IndexDriftError, _normalize, check_indexes, dedupe_unique, sync_indexes,
+)
+from src.infrastructure.database.models import DOCUMENT_MODELS
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.user_document import UserDocument
+
+@pytest.mark.asyncio
+async def test_sync_creates_declared_indexes():
+    db = AsyncMongoMockClient().test_db
+    drifts = await sync_indexes(db, DOCUMENT_MODELS)
+    assert any(d.missing for d in drifts)
+
+    after = await check_indexes(db, DOCUMENT_MODELS)
+    assert all(d.clean for d in after)
+
+    users = await db.users.index_information()
+    assert users["username_1"]["unique"] is True
+    otp = await db.otp_codes.index_information()
+    assert "expireAfterSeconds" in otp["expire_at_1"]
+
+@pytest.mark.asyncio
+async def test_sync_reports_and_drops_undeclared_indexes():
+    db = AsyncMongoMockClient().test_db
+    await db.posts.create_index("tags")
+
+    drifts = await sync_indexes(db, [PostDocument])
+    assert drifts[0].extra == ["tags_1"]
+    assert "tags_1" in await db.posts.index_information()
+
+    await sync_indexes(db, [PostDocument], drop_extra=True)
+    assert "tags_1" not in await db.posts.index_information()
+
+@pytest.mark.asyncio
+async def test_sync_refuses_conflicting_index_unless_rebuilding():
+    db = AsyncMongoMockClient().test_db
+    await db.users.create_index("username")  # declared as unique
+
+    with pytest.raises(IndexDriftError):
+        await sync_indexes(db, [UserDocument])
+
+    await sync_indexes(db, [UserDocument], rebuild_conflicting=True)
+    assert (await db.users.index_information())["username_1"]["unique"] is True
+
+@pytest.mark.asyncio
+async def test_sync_reports_unique_index_blocked_by_duplicates():
+    db = AsyncMongoMockClient().test_db
+    await db.users.insert_many([
+        {"username": "sara", "email": "a@x.com"},
+        {"username": "sara", "email": "b@x.com"},
+    ])
+
+    drifts = await sync_indexes(db, [UserDocument])
+    assert [name.split(":")[0] for name in drifts[0].failed] == ["username_1"]
+    assert "email_1" in await db.users.index_information()
+    assert "--dedupe users" in str(drifts[0])
+
+    assert await dedupe_unique(db, [UserDocument], dry_run=True) == {"users.username_1": 1, "users.email_1": 0}
+    assert await db.users.count_documents({}) == 2
+    await dedupe_unique(db, [UserDocument])
+    assert [u["email"] async for u in db.users.find()] == ["a@x.com"]
+
+    drifts = await sync_indexes(db, [UserDocument])
+    assert drifts[0].failed == []
+    assert (await db.users.index_information())["username_1"]["unique"] is True
+
+@pytest.mark.asyncio
+async def test_app_boots_with_unique_index_blocked_by_duplicates(monkeypatch):
+    import src.main
+    from src.main import app
+
+    client = AsyncMongoMockClient()
+    await client.lost_and_found_v2.users.insert_many([
+        {"username": "sara", "email": "a@x.com", "password": "x"},
+        {"username": "sara", "email": "b@x.com", "password": "x"},
+    ])
+    monkeypatch.setattr(src.main, "AsyncIOMotorClient", lambda uri: client)
+    monkeypatch.setenv("MONGO_DB", "lost_and_found_v2")
+
+    async with app.router.lifespan_context(app):
+        assert await UserDocument.find({"username": "sara"}).count() == 2
+        assert await UserDocument.find_one({"username": "admin"}) is not None
+
+    assert "username_1" not in await client.lost_and_found_v2.users.index_information()
+
+def test_text_index_matches_server_representation():
+    declared = _normalize([("title", "text"), ("description", "text")], {})
+    server = _normalize(
+        [("_fts", "text"), ("_ftsx", 1)],
+        {"weights": {"title": 1, "description": 1}},
+    )
+    assert declared == server
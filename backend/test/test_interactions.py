@@ -0,0 +1,218 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import PydanticObjectId, init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.database.models.comment_document import CommentDocument
+from src.infrastructure.database.models.report_document import ReportDocument
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[PostDocument, CommentDocument, ReportDocument, PostMatchDocument]
+    )
+
+async def make_post(**overrides):
+    fields = dict(
+        type="lost", title="کیف", category_key="bags",
+        description=".", publisher_username="owner",
+        created_at=datetime.now(timezone.utc), tag="t",
+        location={"type": "Point", "coordinates": [51.38, 35.70]},
+    )
+    fields.update(overrides)
+    post = PostDocument(**fields)
+    await post.insert()
+    return post
+
+def auth(username):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': username})}"}
+
+@pytest.mark.asyncio
+async def test_report_same_user_twice_is_rejected():
+    post = await make_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.post(f"/interact/report/post/{post.id}", headers=auth("r1"))
+        second = await ac.post(f"/interact/report/post/{post.id}", headers=auth("r1"))
+    assert first.json() == {"deleted": False, "reports_count": 1}
+    assert second.status_code == 409
+    assert (await PostDocument.get(post.id)).reports_count == 1
+
+@pytest.mark.asyncio
+async def test_legacy_duplicate_reports_are_deduped_for_the_unique_index():
+    from src.infrastructure.database.counters import reconcile_post_counters
+    from src.infrastructure.database.indexes import dedupe_unique, sync_indexes
+
+    database = AsyncMongoMockClient().legacy_db
+    post_id = PydanticObjectId()
+    await database.posts.insert_one({"_id": post_id, "reports_count": 3})
+    await database.reports.insert_many([
+        {"reporter_username": "r1", "target_id": post_id, "target_type": "post", "reason": "spam"}
+        for _ in range(2)
+    ] + [{"reporter_username": "r2", "target_id": post_id, "target_type": "post", "reason": "spam"}])
+
+    drifts = await sync_indexes(database, [ReportDocument])
+    assert drifts[0].failed
+
+    assert await dedupe_unique(database, [ReportDocument]) == {"reports.reporter_username_1_target_id_1": 1}
+    assert (await sync_indexes(database, [ReportDocument]))[0].failed == []
+    await reconcile_post_counters(database)
+    assert (await database.posts.find_one({"_id": post_id}))["reports_count"] == 2
+
+@pytest.mark.asyncio
+async def test_report_threshold_deletes_post():
+    post = await make_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        responses = [await ac.post(f"/interact/report/post/{post.id}", headers=auth(f"r{i}")) for i in range(5)]
+        after = await ac.post(f"/interact/report/post/{post.id}", headers=auth("late"))
+    assert responses[-1].json() == {"deleted": True, "reports_count": 5}
+    assert await PostDocument.get(post.id) is None
+    assert after.status_code == 404
+    assert await ReportDocument.find(ReportDocument.reporter_username == "late").count() == 0
+
+@pytest.mark.asyncio
+async def test_report_unknown_target():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        bad_type = await ac.post("/interact/report/user/65f1234567890abcdef12345", headers=auth("r1"))
+        missing = await ac.post("/interact/report/comment/65f1234567890abcdef12345", headers=auth("r1"))
+    assert bad_type.status_code == 400
+    assert missing.status_code == 404
+
+@pytest.mark.asyncio
+async def test_parallel_reports_are_counted_exactly_once_each():
+    post = await make_post()
+    reporters = [f"user{i}" for i in range(300)]
+    duplicates = ["user0"] * 50
+
+    with patch("src.api.routes.interaction_routes.REPORT_DELETE_THRESHOLD", 10_000):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            responses = await asyncio.gather(*(
+                ac.post(f"/interact/report/post/{post.id}", headers=auth(name))
+                for name in reporters + duplicates
+            ))
+
+    statuses = [r.status_code for r in responses]
+    assert statuses.count(200) == len(reporters)
+    assert statuses.count(409) == len(duplicates)
+    counts = sorted(r.json()["reports_count"] for r in responses if r.status_code == 200)
+    assert counts == list(range(1, len(reporters) + 1))
+    assert (await PostDocument.get(post.id)).reports_count == len(reporters)
+    assert await ReportDocument.find(ReportDocument.target_id == post.id).count() == len(reporters)
+
+async def post_comment(ac, post, user, content, parent_id=None):
+    res = await ac.post(
+        "/interact/comment",
+        json={"post_id": str(post.id), "content": content, "parent_id": parent_id},
+        headers=auth(user),
+    )
+    assert res.status_code == 200, res.text
+    return res.json()["id"]
+
+@pytest.mark.asyncio
+async def test_comment_threads_are_paged_with_first_replies():
+    post = await make_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        roots = [await post_comment(ac, post, "u", f"root{i}") for i in range(3)]
+        a = await post_comment(ac, post, "u", "a", roots[0])
+        await post_comment(ac, post, "u", "b", roots[0])
+        a1 = await post_comment(ac, post, "u", "a1", a)
+        await post_comment(ac, post, "u", "c", roots[1])
+
+        first = (await ac.get(f"/interact/comments/{post.id}/threads?limit=2&replies=2")).json()
+        second = (await ac.get(f"/interact/comments/{post.id}/threads?limit=2&cursor={first['next_cursor']}")).json()
+        rest = (await ac.get(
+            f"/interact/comments/{post.id}/replies/{roots[0]}?cursor={first['threads'][0]['replies_cursor']}"
+        )).json()
+        flat = (await ac.get(f"/interact/comments/{post.id}")).json()
+
+    assert [t["id"] for t in first["threads"]] == roots[:2]
+    # Depth-first: a, then a's own reply, before the sibling b.
+    assert [r["content"] for r in first["threads"][0]["replies"]] == ["a", "a1"]
+    assert [(r["id"], r["depth"], r["root_id"]) for r in first["threads"][0]["replies"]][1] == (a1, 2, roots[0])
+    assert first["threads"][1]["replies_cursor"] is None
+    assert [t["id"] for t in second["threads"]] == roots[2:]
+    assert second["next_cursor"] is None
+    assert [r["content"] for r in rest["replies"]] == ["b"]
+    assert rest["next_cursor"] is None
+    assert len(flat) == 7
+
+@pytest.mark.asyncio
+async def test_reply_to_comment_on_other_post_is_rejected():
+    post, other = await make_post(), await make_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        root = await post_comment(ac, other, "u", "root")
+        res = await ac.post(
+            "/interact/comment",
+            json={"post_id": str(post.id), "content": "x", "parent_id": root},
+            headers=auth("u"),
+        )
+        bad_cursor = await ac.get(f"/interact/comments/{post.id}/threads?cursor=nope")
+    assert res.status_code == 400
+    assert bad_cursor.status_code == 400
+
+@pytest.mark.asyncio
+async def test_backfill_threads_legacy_comments():
+    from src.infrastructure.repositories.mongo_comment_repository import CommentRepository
+
+    post = await make_post()
+    root = CommentDocument(post_id=str(post.id), publisher_username="u", content="root")
+    await root.insert()
+    reply = CommentDocument(post_id=str(post.id), publisher_username="u", content="reply", parent_id=str(root.id))
+    await reply.insert()
+    orphan = CommentDocument(post_id=str(post.id), publisher_username="u", content="o", parent_id="65f1234567890abcdef12345")
+    await orphan.insert()
+
+    repo = CommentRepository()
+    assert await repo.backfill_paths() == 3
+    assert await repo.backfill_paths() == 0
+
+    threads, _ = await repo.get_threads(str(post.id), limit=10, replies_per_thread=5)
+    assert [t.comment.content for t in threads] == ["root", "o"]
+    assert [r.content for r in threads[0].replies] == ["reply"]
+    assert threads[0].replies[0].path == f"{root.id}/{reply.id}"
+
+@pytest.mark.asyncio
+async def test_comment_counters_follow_comments():
+    post = await make_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        root = await post_comment(ac, post, "u", "root")
+        reply = await post_comment(ac, post, "u", "reply", root)
+        posts = (await ac.get("/posts/all")).json()
+        with patch("src.api.routes.interaction_routes.REPORT_DELETE_THRESHOLD", 1):
+            await ac.post(f"/interact/report/comment/{reply}", headers=auth("r1"))
+
+    latest = await CommentDocument.get(PydanticObjectId(reply))
+    assert posts[0]["comments_count"] == 2
+    assert posts[0]["last_activity_at"] is not None
+    assert latest is None
+    stored = await PostDocument.get(post.id)
+    assert stored.comments_count == 1
+    assert stored.last_activity_at is not None
+
+@pytest.mark.asyncio
+async def test_reconcile_counters_fixes_drift():
+    from src.infrastructure.database.counters import reconcile_post_counters
+
+    post, quiet = await make_post(), await make_post(comments_count=4, reports_count=2)
+    for i in range(3):
+        await CommentDocument(post_id=str(post.id), publisher_username="u", content=str(i)).insert()
+    await ReportDocument(reporter_username="r", target_id=post.id, target_type="post", reason="spam").insert()
+
+    database = PostDocument.get_motor_collection().database
+    report = await reconcile_post_counters(database)
+    again = await reconcile_post_counters(database)
+
+    fixed = await PostDocument.get(post.id)
+    assert (report.scanned, report.fixed, again.fixed) == (2, 2, 0)
+    assert (fixed.comments_count, fixed.reports_count) == (3, 1)
+    assert fixed.last_activity_at is not None
+    assert (await PostDocument.get(quiet.id)).comments_count == 0
@@ -0,0 +1,426 @@
+import json
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock, AsyncMock
+from bson import ObjectId
+import time
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.infrastructure.security.auth_handler import AuthHandler
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.entities.post import Post, NearbyPost
+from src.api.routes.map_routes import _to_response
+from src.application.use_cases.get_map_items import GetMapItemsUseCase, map_item_from_row
+from src.infrastructure.map.map_snapshot import map_snapshot
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[PostDocument, PostMatchDocument]
+    )
+    map_snapshot.clear()
+
+def make_post(title="کیف", coordinates=(51.38, 35.70)):
+    return Post(
+        id="65f1234567890abcdef12345", type="lost", title=title,
+        category_key="bags", tag="کیف", description=".",
+        publisher_username="u1", created_at=datetime.now(timezone.utc),
+        location={"type": "Point", "coordinates": list(coordinates)}
+    )
+
+@pytest.mark.asyncio
+async def test_map_items_without_filters():
+    await PostDocument(
+        type="found", title="کارت", category_key="cards",
+        description=".", publisher_username="u1",
+        created_at=datetime.now(timezone.utc), tag="t1",
+        location={"type": "Point", "coordinates": [51.0, 35.0]}
+    ).insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/lostAndFoundItems")
+    assert response.status_code == 200
+    assert response.json()[0]["location"] == {"lat": 35.0, "lng": 51.0}
+
+def make_row(title="کیف", coordinates=(51.38, 35.70)):
+    return {
+        "_id": ObjectId(), "type": "lost", "title": title,
+        "category_key": "bags", "tag": "کیف", "description": ".",
+        "publisher_username": "u1", "reports_count": 0,
+        "created_at": datetime(2024, 5, 1, 10, 30, 15, 123000),
+        "location": {"type": "Point", "coordinates": list(coordinates)},
+    }
+
+@pytest.mark.asyncio
+async def test_map_items_bbox():
+    with patch.object(MongoPostRepository, "_fetch_map_rows", new_callable=AsyncMock) as m:
+        m.return_value = [make_row(), make_row(title="مشهد", coordinates=(59.6, 36.3))]
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/lostAndFoundItems", params={"bbox": "51.3,35.6,51.4,35.8"})
+            everything = await ac.get("/lostAndFoundItems")
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()] == ["کیف"]
+    assert len(everything.json()) == 2
+    # Both requests are served from one snapshot load.
+    assert m.await_count == 1
+
+@pytest.mark.asyncio
+async def test_map_items_invalid_bbox():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        bad_format = await ac.get("/lostAndFoundItems", params={"bbox": "1,2,3"})
+        inverted = await ac.get("/lostAndFoundItems", params={"bbox": "51.4,35.6,51.3,35.8"})
+        partial_near = await ac.get("/lostAndFoundItems", params={"lat": 35.7, "lng": 51.3})
+    assert bad_format.status_code == 400
+    assert inverted.status_code == 400
+    assert partial_near.status_code == 400
+
+@pytest.mark.asyncio
+async def test_map_items_near():
+    with patch.object(MongoPostRepository, "find_near", new_callable=AsyncMock) as m:
+        m.return_value = [NearbyPost(post=make_post(), distance_m=42.5)]
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/lostAndFoundItems", params={"lat": 35.7, "lng": 51.38, "radius_m": 300, "limit": 5})
+    assert response.status_code == 200
+    assert m.call_args.args == (35.7, 51.38, 300, 5)
+    assert response.json()[0]["distance_m"] == 42.5
+
+@pytest.mark.asyncio
+async def test_find_near_builds_geo_near_pipeline():
+    doc = PostDocument(
+        type="lost", title="کیف", category_key="bags",
+        description=".", publisher_username="u1",
+        created_at=datetime.now(timezone.utc), tag="t",
+        location={"type": "Point", "coordinates": [51.38, 35.70]}
+    )
+    await doc.insert()
+    raw = doc.model_dump(by_alias=True)
+    raw["distance_m"] = 12.0
+
+    query = MagicMock()
+    query.to_list = AsyncMock(return_value=[raw])
+    with patch.object(PostDocument, "aggregate", return_value=query) as m:
+        nearby = await MongoPostRepository().find_near(35.70, 51.38, 500, 10)
+
+    geo_near = m.call_args.args[0][0]["$geoNear"]
+    assert geo_near["near"]["coordinates"] == [51.38, 35.70]
+    assert geo_near["maxDistance"] == 500
+    assert nearby[0].post.id == str(doc.id)
+    assert nearby[0].distance_m == 12.0
+
+@pytest.mark.asyncio
+async def test_find_near_names_the_2dsphere_index():
+    query = MagicMock()
+    query.to_list = AsyncMock(return_value=[])
+    with patch.object(PostDocument, "aggregate", return_value=query) as m:
+        await MongoPostRepository().find_near(35.70, 51.38, 500, 10)
+
+    assert m.call_args.args[0][0]["$geoNear"] == {
+        "near": {"type": "Point", "coordinates": [51.38, 35.70]},
+        "key": "location",
+        "distanceField": "distance_m",
+        "maxDistance": 500,
+        "spherical": True,
+    }
+    # With the 2d index on location.coordinates also declared, a $geoNear
+    # without "key" would be ambiguous.
+    keys = [dict(index.document["key"]) for index in PostDocument.Settings.indexes]
+    assert {"location": "2dsphere"} in keys
+    assert {"location.coordinates": "2d"} in keys
+
+@pytest.mark.asyncio
+async def test_posts_location_has_2dsphere_index():
+    info = await PostDocument.get_motor_collection().index_information()
+    assert list(info["location_2dsphere"]["key"]) == [("location", "2dsphere")]
+
+@pytest.mark.asyncio
+async def test_map_clusters_match_wide_viewport_with_planar_box():
+    wide = BoundingBox.parse("-170,-60,170,60")
+    with patch.object(PostDocument, "aggregate") as aggregate:
+        aggregate.return_value.to_list = AsyncMock(return_value=[])
+        await MongoPostRepository().cluster(wide, cell_size_deg=45.0)
+    match = aggregate.call_args.args[0][0]["$match"]
+    assert match == {"location.coordinates": {"$geoWithin": {"$box": [[-170.0, -60.0], [170.0, 60.0]]}}}
+
+@pytest.mark.asyncio
+async def test_map_clusters_groups_posts_per_cell():
+    points = [
+        ("lost", "keys", [51.3801, 35.7001]),
+        ("found", "keys", [51.3802, 35.7002]),
+        ("found", "books", [51.3803, 35.7003]),
+        ("found", "books", [52.5, 36.5]),
+    ]
+    for post_type, category_key, coordinates in points:
+        await PostDocument(
+            type=post_type, title="x", category_key=category_key,
+            description=".", publisher_username="u1",
+            created_at=datetime.now(timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": coordinates}
+        ).insert()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/lostAndFoundItems/clusters", params={"zoom": 10})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["clustered"] is True
+    assert body["items"] == []
+
+    clusters = sorted(body["clusters"], key=lambda c: -c["count"])
+    assert [c["count"] for c in clusters] == [3, 1]
+    assert clusters[0]["lost_count"] == 1
+    assert clusters[0]["found_count"] == 2
+    assert clusters[0]["dominant_category_key"] == "keys"
+    assert clusters[0]["centroid"]["lng"] == pytest.approx(51.3802)
+
+@pytest.mark.asyncio
+async def test_map_clusters_returns_items_at_high_zoom():
+    with patch.object(MongoPostRepository, "find_in_bbox", new_callable=AsyncMock) as m:
+        m.return_value = [make_post()]
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/lostAndFoundItems/clusters", params={"zoom": 19, "bbox": "51.3,35.6,51.4,35.8"})
+    assert response.status_code == 200
+    assert response.json()["clustered"] is False
+    assert response.json()["items"][0]["title"] == "کیف"
+
+def _read_varint(buf, i):
+    shift = result = 0
+    while True:
+        b = buf[i]
+        i += 1
+        result |= (b & 0x7F) << shift
+        shift += 7
+        if not b & 0x80:
+            return result, i
+
+def _read_packed(buf):
+    i, out = 0, []
+    while i < len(buf):
+        value, i = _read_varint(buf, i)
+        out.append(value)
+    return out
+
+def _read_fields(buf):
+    """Tiny protobuf reader for the tile tests: yields (field, value)."""
+    i = 0
+    while i < len(buf):
+        key, i = _read_varint(buf, i)
+        if key & 7 == 0:
+            value, i = _read_varint(buf, i)
+            yield key >> 3, value
+        else:
+            length, i = _read_varint(buf, i)
+            yield key >> 3, buf[i:i + length]
+            i += length
+
+def decode_posts_layer(tile):
+    layers = [layer for field, layer in _read_fields(tile) if field == 3]
+    if not layers:
+        return []
+    keys, values, raw_features = [], [], []
+    for field, value in _read_fields(layers[0]):
+        if field == 2:
+            raw_features.append(value)
+        elif field == 3:
+            keys.append(value.decode())
+        elif field == 4:
+            (vfield, v), = _read_fields(value)
+            values.append(v.decode() if vfield == 1 else v)
+    features = []
+    for raw in raw_features:
+        props = {}
+        for field, value in _read_fields(raw):
+            if field == 2:
+                tags = _read_packed(value)
+                for k, v in zip(tags[::2], tags[1::2]):
+                    props[keys[k]] = values[v]
+        features.append(props)
+    return features
+
+@pytest_asyncio.fixture
+def empty_tile_cache():
+    from src.infrastructure.map.tile_cache import tile_cache
+    tile_cache.clear()
+    return tile_cache
+
+@pytest_asyncio.fixture
+def planar_find_in_bbox():
+    """mongomock has no $geoWithin: evaluate the repository's $box in Python."""
+    async def find_in_bbox(self, bbox):
+        (min_lng, min_lat), (max_lng, max_lat) = bbox.to_box()
+        page = await self.list_all()
+        return [
+            post for post in page.items
+            if min_lng <= post.location["coordinates"][0] <= max_lng
+            and min_lat <= post.location["coordinates"][1] <= max_lat
+        ]
+
+    with patch.object(MongoPostRepository, "find_in_bbox", find_in_bbox):
+        yield
+
+@pytest.mark.parametrize("bbox", ["-180,-90,180,90", "-170,-60,170,60"])
+def test_bbox_query_is_planar_at_any_width(bbox):
+    box = BoundingBox.parse(bbox)
+    query = MongoPostRepository._bbox_query(box)
+    assert query == {"location.coordinates": {"$geoWithin": {"$box": [
+        [box.min_lng, box.min_lat], [box.max_lng, box.max_lat],
+    ]}}}
+
+def test_tile_query_bounds_cover_edges():
+    from src.infrastructure.map.vector_tile import tile_bounds, tile_query_bounds
+    assert tile_query_bounds(0, 0, 0) == BoundingBox(-180.0, -90.0, 180.0, 90.0)
+
+    tile, query = tile_bounds(3, 5, 2), tile_query_bounds(3, 5, 2)
+    assert query.min_lng < tile.min_lng and query.max_lng > tile.max_lng
+    assert query.min_lat < tile.min_lat and query.max_lat > tile.max_lat
+
+@pytest.mark.asyncio
+async def test_map_tile_keeps_points_on_tile_edges(empty_tile_cache, planar_find_in_bbox):
+    from src.infrastructure.map.vector_tile import tile_bounds
+    edge = tile_bounds(3, 5, 2)
+    await PostDocument(
+        type="lost", title="لبه", category_key="bags",
+        description=".", publisher_username="u1",
+        created_at=datetime.now(timezone.utc), tag="t",
+        location={"type": "Point", "coordinates": [edge.min_lng, (edge.min_lat + edge.max_lat) / 2]}
+    ).insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/lostAndFoundItems/tiles/3/5/2.mvt")
+    assert len(decode_posts_layer(response.content)) == 1
+
+@pytest.mark.asyncio
+async def test_map_tile_encodes_posts(empty_tile_cache, planar_find_in_bbox):
+    await PostDocument(
+        type="found", title="کارت", category_key="cards",
+        description=".", publisher_username="u1", reports_count=2,
+        created_at=datetime.now(timezone.utc), tag="t1",
+        location={"type": "Point", "coordinates": [51.38, 35.70]}
+    ).insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/lostAndFoundItems/tiles/0/0/0.mvt")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.mapbox-vector-tile"
+    features = decode_posts_layer(response.content)
+    assert len(features) == 1
+    assert features[0]["type"] == "found"
+    assert features[0]["category_key"] == "cards"
+    assert features[0]["reports_count"] == 2
+
+@pytest.mark.asyncio
+async def test_map_tile_cache_invalidated_on_create(empty_tile_cache, planar_find_in_bbox):
+    from src.infrastructure.security.auth_handler import AuthHandler
+    headers = {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'u1'})}"}
+    payload = {
+        "type": "lost", "title": "کیف", "category_key": "bags", "tag": "کیف",
+        "description": ".", "publisher_username": "u1",
+        "location": {"type": "Point", "coordinates": [51.38, 35.70]},
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/lostAndFoundItems/tiles/1/1/0.mvt")
+        assert decode_posts_layer(first.content) == []
+        assert empty_tile_cache.get(1, 1, 0) == b""
+
+        await ac.post("/posts/add", json=payload, headers=headers)
+        assert empty_tile_cache.get(1, 1, 0) is None
+
+        second = await ac.get("/lostAndFoundItems/tiles/1/1/0.mvt")
+    assert len(decode_posts_layer(second.content)) == 1
+
+@pytest.mark.asyncio
+async def test_map_tile_out_of_range():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/lostAndFoundItems/tiles/2/4/0.mvt")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_map_fast_path_matches_model_path():
+    row = make_row()
+    legacy = _to_response(GetMapItemsUseCase._to_map_item(
+        MongoPostRepository()._to_entity(PostDocument.model_validate(row))
+    ))
+    assert map_item_from_row(row) == legacy.model_dump(mode="json")
+
+def test_benchmark_map_item_per_item_cost():
+    """Per-item cost of building a map item from a fetched document, before and after the fast path."""
+    rows = [make_row(title=f"item {i}", coordinates=(51.3 + i * 1e-5, 35.7)) for i in range(2000)]
+    repo = MongoPostRepository()
+
+    def legacy(row):
+        doc = PostDocument.model_validate(row)
+        return _to_response(GetMapItemsUseCase._to_map_item(repo._to_entity(doc))).model_dump(mode="json")
+
+    def timed(build):
+        start = time.perf_counter()
+        for row in rows:
+            build(row)
+        return (time.perf_counter() - start) / len(rows) * 1e6
+
+    before = timed(legacy)
+    after = timed(map_item_from_row)
+    print(f"\nmap item build: {before:.1f}us/item before, {after:.1f}us/item after ({before / after:.1f}x)")
+    assert after < before
+
+@pytest.mark.asyncio
+async def test_map_items_streamed():
+    for i in range(450):
+        await PostDocument(
+            type="lost", title=f"m{i}", category_key="c",
+            description=".", publisher_username="u1",
+            created_at=datetime.now(timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]}
+        ).insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        array = await ac.get("/lostAndFoundItems", params={"stream": "true"})
+        ndjson = await ac.get("/lostAndFoundItems", headers={"Accept": "application/x-ndjson"})
+    assert len(array.json()) == 450
+    assert array.json()[0]["location"] == {"lat": 35.0, "lng": 51.0}
+    assert len(ndjson.text.splitlines()) == 450
+
+@pytest.mark.asyncio
+async def test_map_snapshot_patched_by_writes():
+    auth = {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'u1'})}"}
+    payload = {
+        "type": "found", "title": "چتر مشکی", "category_key": "other", "tag": "چتر",
+        "description": "سلف مرکزی", "publisher_username": "x",
+        "location": {"type": "Point", "coordinates": [51.39, 35.70]},
+    }
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        empty = await ac.get("/lostAndFoundItems")
+        with patch.object(MongoPostRepository, "_fetch_map_rows", new_callable=AsyncMock) as m:
+            post_id = (await ac.post("/posts/add", json=payload, headers=auth)).json()["id"]
+            await ac.put(f"/posts/{post_id}", json={"title": "چتر آبی"}, headers=auth)
+            after_writes = await ac.get("/lostAndFoundItems")
+            await ac.delete(f"/posts/{post_id}", headers=auth)
+            after_delete = await ac.get("/lostAndFoundItems")
+            status = (await ac.get("/lostAndFoundItems/snapshot")).json()
+        m.assert_not_awaited()
+
+    assert empty.json() == []
+    assert [item["title"] for item in after_writes.json()] == ["چتر آبی"]
+    assert after_writes.json()[0]["location"] == {"lat": 35.70, "lng": 51.39}
+    assert int(after_delete.headers["x-map-snapshot-version"]) > int(after_writes.headers["x-map-snapshot-version"])
+    assert after_delete.json() == []
+    assert status["loaded"] and status["items"] == 0
+
+@pytest.mark.asyncio
+async def test_map_snapshot_row_matches_database_row():
+    post = await MongoPostRepository().create(make_post())
+    stored = (await MongoPostRepository()._fetch_map_rows())[0]
+    doc = await PostDocument.get(post.id)
+    assert map_item_from_row(MongoPostRepository._map_row(doc)) == map_item_from_row(stored)
+
+def test_map_snapshot_replays_writes_made_during_load():
+    first, second = make_row(title="a"), make_row(title="b")
+    map_snapshot.begin_load()
+    map_snapshot.upsert(second)
+    map_snapshot.patch(str(first["_id"]), reports_count=3)
+    map_snapshot.finish_load([dict(first)])
+
+    items = json.loads(map_snapshot.render(map_item_from_row))
+    assert [(i["title"], i["reports_count"]) for i in items] == [("a", 3), ("b", 0)]
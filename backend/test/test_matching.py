@@ -0,0 +1,94 @@
+import time
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timedelta
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.matching.match_engine import MatchEngine, match_engine
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+    match_engine.clear()
+
+def headers(username="u"):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': username})}"}
+
+def payload(type, title, description=".", tag="t", category_key="bags", coordinates=(51.3890, 35.6892)):
+    return {
+        "type": type, "title": title, "category_key": category_key, "tag": tag,
+        "description": description, "publisher_username": "u",
+        "location": {"type": "Point", "coordinates": list(coordinates)},
+    }
+
+def test_engine_prefers_similar_close_recent_posts():
+    engine = MatchEngine()
+    now = datetime(2024, 5, 1)
+    engine.add("near", "lost", "bags", [51.3890, 35.6892], now, "کیف پول مشکی", "جلوی کتابخانه")
+    engine.add("far", "lost", "bags", [51.5000, 35.7500], now, "کیف پول مشکی", "جلوی کتابخانه")
+    engine.add("other", "lost", "bags", [51.3890, 35.6892], now, "کلید ماشین", ".")
+    engine.add("old", "lost", "bags", [51.3890, 35.6892], now - timedelta(days=90), "کیف پول مشکی", ".")
+    engine.add("phone", "lost", "phones", [51.3890, 35.6892], now, "کیف پول مشکی", ".")
+
+    matches = engine.score("f", "found", "bags", [51.3891, 35.6893], now + timedelta(days=1), "كيف پول", "مشکی")
+
+    assert [m.lost_id for m in matches][:2] == ["near", "far"]
+    assert all(m.found_id == "f" for m in matches)
+    assert "old" not in [m.lost_id for m in matches]
+    assert "phone" not in [m.lost_id for m in matches]
+    assert matches[0].distance_m < 20
+    assert matches[1].distance_m > 5_000
+
+    engine.remove("near")
+    assert engine.score("f", "found", "bags", [51.3891, 35.6893], now, "کیف پول")[0].lost_id == "far"
+
+def test_engine_scores_tens_of_thousands_in_milliseconds():
+    engine = MatchEngine()
+    now = datetime(2024, 5, 1)
+    words = ["کیف", "گوشی", "کلید", "کارت", "عینک", "ساعت", "کتاب", "لپتاپ"]
+    for i in range(30_000):
+        engine.add(
+            str(i), "lost", "bags",
+            [51.3 + (i % 100) * 0.002, 35.6 + (i // 100 % 100) * 0.002],
+            now - timedelta(hours=i % 1000),
+            f"{words[i % 8]} {words[i // 8 % 8]}", f"رنگ {i % 13}",
+        )
+
+    engine.score("f", "found", "bags", [51.39, 35.69], now, "کیف مشکی", ".")
+    start = time.perf_counter()
+    for _ in range(10):
+        matches = engine.score("f", "found", "bags", [51.39, 35.69], now, "کیف مشکی", ".")
+    per_query_ms = (time.perf_counter() - start) * 100
+    assert len(matches) == 10
+    assert per_query_ms < 50
+
+@pytest.mark.asyncio
+async def test_matches_are_stored_on_create_and_served_both_ways():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        lost = (await ac.post("/posts/add", json=payload("lost", "کیف پول مشکی", "گم شد"), headers=headers())).json()
+        await ac.post("/posts/add", json=payload("lost", "گوشی", category_key="phones"), headers=headers())
+        found = (await ac.post("/posts/add", json=payload("found", "كيف پول", "مشکی"), headers=headers())).json()
+
+        from_found = (await ac.get(f"/posts/{found['id']}/matches")).json()
+        from_lost = (await ac.get(f"/posts/{lost['id']}/matches")).json()
+
+        await ac.delete(f"/posts/{found['id']}", headers=headers())
+        after_delete = (await ac.get(f"/posts/{lost['id']}/matches")).json()
+        missing = await ac.get("/posts/65f1234567890abcdef12345/matches")
+        malformed = await ac.get("/posts/notanid/matches")
+
+    assert [m["post"]["id"] for m in from_found] == [lost["id"]]
+    assert [m["post"]["id"] for m in from_lost] == [found["id"]]
+    assert from_found[0]["score"] == from_lost[0]["score"] > 0.5
+    assert from_found[0]["distance_m"] == 0
+    assert after_delete == []
+    assert await PostMatchDocument.count() == 0
+    assert missing.status_code == 404
+    assert malformed.status_code == 400
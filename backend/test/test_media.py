@@ -0,0 +1,169 @@
+import asyncio
+import io
+import os
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.media.image_store import (
+    ImageStore, ImageTooLargeError, InvalidImageError, _make_thumbnails, image_store,
+)
+from src.infrastructure.security.auth_handler import AuthHandler
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db(tmp_path, monkeypatch):
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+    monkeypatch.setattr(image_store, "root", str(tmp_path))
+
+def headers(username="owner"):
+    return {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': username})}"}
+
+async def chunks(*parts):
+    for part in parts:
+        yield part
+
+async def insert_post(publisher="owner"):
+    post = PostDocument(
+        type="found", title="کیف", category_key="bags", description=".",
+        publisher_username=publisher, created_at=datetime.now(timezone.utc), tag="t",
+        location={"type": "Point", "coordinates": [51.0, 35.0]},
+    )
+    await post.insert()
+    return post
+
+@pytest.mark.asyncio
+async def test_store_deduplicates_by_content(tmp_path):
+    store = ImageStore(str(tmp_path))
+    with patch.object(ImageStore, "_thumbnails", AsyncMock(return_value={})):
+        first = await store.save(chunks(PNG_BYTES[:5], PNG_BYTES[5:]))
+        second = await store.save(chunks(PNG_BYTES))
+
+    assert first.digest == second.digest and first.extension == "png"
+    assert first.image_url == f"/media/originals/{first.digest[:2]}/{first.digest}.png"
+    assert len(os.listdir(tmp_path / "originals" / first.digest[:2])) == 1
+    assert os.listdir(tmp_path / "tmp") == []
+
+@pytest.mark.asyncio
+async def test_store_rejects_unknown_and_oversized_bytes(tmp_path):
+    store = ImageStore(str(tmp_path), max_bytes=32)
+    with pytest.raises(InvalidImageError):
+        await store.save(chunks(b"<html>not an image</html>"))
+    with pytest.raises(ImageTooLargeError):
+        await store.save(chunks(PNG_BYTES))
+    assert os.listdir(tmp_path / "tmp") == []
+
+@pytest.mark.asyncio
+async def test_store_discards_original_when_thumbnails_fail(tmp_path):
+    store = ImageStore(str(tmp_path))
+    with patch.object(ImageStore, "_thumbnails", AsyncMock(side_effect=InvalidImageError("Unreadable image"))):
+        with pytest.raises(InvalidImageError):
+            await store.save(chunks(PNG_BYTES))
+    assert os.listdir(tmp_path / "originals" / os.listdir(tmp_path / "originals")[0]) == []
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [InvalidImageError("Unreadable image"), asyncio.CancelledError()])
+async def test_store_keeps_original_it_did_not_create(tmp_path, error):
+    store = ImageStore(str(tmp_path))
+    with patch.object(ImageStore, "_thumbnails", AsyncMock(return_value={})):
+        first = await store.save(chunks(PNG_BYTES))
+    with patch.object(ImageStore, "_thumbnails", AsyncMock(side_effect=error)):
+        with pytest.raises(type(error)):
+            await store.save(chunks(PNG_BYTES))
+    assert os.path.exists(store.original_path(first.digest, "png"))
+
+@pytest.mark.asyncio
+async def test_store_keeps_new_original_when_cancelled(tmp_path):
+    store = ImageStore(str(tmp_path))
+    with patch.object(ImageStore, "_thumbnails", AsyncMock(side_effect=asyncio.CancelledError())):
+        with pytest.raises(asyncio.CancelledError):
+            await store.save(chunks(PNG_BYTES))
+    assert len(os.listdir(tmp_path / "originals" / os.listdir(tmp_path / "originals")[0])) == 1
+
+@pytest.mark.asyncio
+async def test_failed_thumbnails_remove_only_what_they_wrote(tmp_path, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from src.infrastructure.media import image_store as module
+
+    def half_written(source, targets, quality):
+        with open(targets[0][1], "wb") as out:
+            out.write(b"partial")
+        raise OSError("truncated")
+
+    store = ImageStore(str(tmp_path))
+    existing = store.thumbnail_path("ab" * 32, "small")
+    os.makedirs(os.path.dirname(existing))
+    with open(existing, "wb") as out:
+        out.write(b"kept")
+    for size in ("medium", "large"):
+        os.makedirs(os.path.dirname(store.thumbnail_path("ab" * 32, size)))
+    monkeypatch.setattr(module, "_make_thumbnails", half_written)
+    monkeypatch.setattr(store, "_executor", lambda: ThreadPoolExecutor(max_workers=1))
+
+    with pytest.raises(InvalidImageError):
+        await store._thumbnails("ab" * 32, str(tmp_path / "source.png"))
+    assert os.path.exists(existing)
+    assert not os.path.exists(store.thumbnail_path("ab" * 32, "medium"))
+
+def test_decompression_bomb_is_too_large(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    source = tmp_path / "bomb.png"
+    Image.new("L", (400, 400)).save(source)
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(ImageTooLargeError):
+        _make_thumbnails(str(source), [(160, str(tmp_path / "thumb.jpg"))], 80)
+
+@pytest.mark.asyncio
+async def test_media_served_with_immutable_cache(tmp_path):
+    folder = tmp_path / "originals" / "ab"
+    folder.mkdir(parents=True)
+    (folder / "abc.png").write_bytes(PNG_BYTES)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/media/originals/ab/abc.png")
+        escaped = await ac.get("/media/../../etc/passwd")
+    assert response.status_code == 200
+    assert response.content == PNG_BYTES
+    assert "immutable" in response.headers["cache-control"]
+    assert escaped.status_code == 404
+
+@pytest.mark.asyncio
+async def test_upload_checks_owner_and_content():
+    post = await insert_post()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        foreign = await ac.post(f"/posts/{post.id}/image", content=PNG_BYTES, headers=headers("someone"))
+        not_image = await ac.post(f"/posts/{post.id}/image", content=b"plain text", headers=headers())
+        with patch.object(image_store, "max_bytes", 16):
+            too_large = await ac.post(f"/posts/{post.id}/image", content=PNG_BYTES, headers=headers())
+        malformed = await ac.post("/posts/notanid/image", content=PNG_BYTES, headers=headers())
+    assert malformed.status_code == 400
+    assert foreign.status_code == 403
+    assert not_image.status_code == 415
+    assert too_large.status_code == 413
+
+@pytest.mark.asyncio
+async def test_upload_generates_thumbnails(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = io.BytesIO()
+    Image.new("RGB", (2000, 1000), "red").save(buffer, "JPEG")
+    post = await insert_post()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post(f"/posts/{post.id}/image", content=buffer.getvalue(), headers=headers())
+        assert response.status_code == 200
+        body = response.json()
+        thumb = await ac.get(body["thumbnails"]["small"])
+
+    assert set(body["thumbnails"]) == {"small", "medium", "large"}
+    assert body["image_url"].startswith("/media/originals/")
+    assert Image.open(io.BytesIO(thumb.content)).size == (160, 80)
+    stored = await PostDocument.get(post.id)
+    assert stored.image_hash and stored.thumbnails == body["thumbnails"]
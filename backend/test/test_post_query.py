@@ -0,0 +1,231 @@
+import itertools
+import os
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from bson import ObjectId
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from src.main import app
+from src.domain.entities.geo_location import BoundingBox
+from src.domain.entities.post import PostQuery
+from src.infrastructure.cache.single_flight import single_flight
+from src.infrastructure.database.indexes import sync_indexes
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.database.models.user_document import UserDocument
+from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.infrastructure.search.search_index import search_index
+
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test_db,
+        document_models=[PostDocument, UserDocument, PostMatchDocument]
+    )
+    search_index.clear()
+    single_flight.clear()
+
+async def _post(title, minute, type="lost", category_key="bags", tag="t", publisher="u1", description="."):
+    doc = PostDocument(
+        type=type, title=title, category_key=category_key,
+        description=description, publisher_username=publisher,
+        created_at=datetime(2024, 1, 1, 12, minute), tag=tag,
+        location={"type": "Point", "coordinates": [51.0, 35.0]}
+    )
+    await doc.insert()
+    return doc
+
+async def _query(**params):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        return await ac.get("/posts/query", params=params)
+
+@pytest.mark.asyncio
+async def test_query_combines_filters():
+    await _post("match-old", 1)
+    await _post("match-new", 5)
+    await _post("other-type", 3, type="found")
+    await _post("other-category", 3, category_key="keys")
+    await _post("other-tag", 3, tag="x")
+    await _post("too-late", 30)
+
+    response = await _query(
+        type="lost", category_key="bags", tag="t", publisher="u1",
+        created_from="2024-01-01T12:00:00", created_to="2024-01-01T12:10:00",
+    )
+    assert response.status_code == 200
+    assert [p["title"] for p in response.json()] == ["match-new", "match-old"]
+    assert "etag" in response.headers
+
+@pytest.mark.asyncio
+async def test_query_pages_oldest_first():
+    for i in range(5):
+        await _post(f"p{i}", i)
+
+    titles = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/posts/query", params={"sort": "oldest", "limit": 2})
+        titles += [p["title"] for p in response.json()]
+        while "x-next-cursor" in response.headers:
+            response = await ac.get("/posts/query", params={
+                "sort": "oldest", "limit": 2, "cursor": response.headers["x-next-cursor"],
+            })
+            titles += [p["title"] for p in response.json()]
+
+    assert titles == ["p0", "p1", "p2", "p3", "p4"]
+
+@pytest.mark.asyncio
+async def test_query_text_by_relevance_with_filters():
+    await _post("کیف چرم", 1, description="کیف چرم مشکی کیف")
+    await _post("کیف", 2, description="پیدا شد")
+    await _post("کیف چرم", 3, type="found", description="کیف چرم")
+    await _post("عینک", 4)
+
+    response = await _query(text="کیف چرم", type="lost", sort="relevance", limit=1)
+    assert response.status_code == 200
+    assert [p["description"] for p in response.json()] == ["کیف چرم مشکی کیف"]
+
+    response = await _query(text="کیف چرم", type="lost", sort="relevance", cursor=response.headers["x-next-cursor"])
+    assert [p["description"] for p in response.json()] == ["پیدا شد"]
+    assert "x-next-cursor" not in response.headers
+
+    newest = await _query(text="کیف", type="lost")
+    assert [p["created_at"][:16] for p in newest.json()] == ["2024-01-01T12:02", "2024-01-01T12:01"]
+
+async def _all_pages(**params):
+    titles, cursor = [], None
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        while True:
+            response = await ac.get("/posts/query", params={**params, **({"cursor": cursor} if cursor else {})})
+            titles += [p["title"] for p in response.json()]
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                return titles
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sort", ["newest", "relevance"])
+async def test_query_text_beyond_candidate_limits_is_complete(sort, monkeypatch):
+    from src.infrastructure.repositories import mongo_post_repository
+    monkeypatch.setattr(mongo_post_repository, "QUERY_TEXT_IN_LIMIT", 2)
+    monkeypatch.setattr(mongo_post_repository, "QUERY_RANKED_CHUNK", 2)
+    for i in range(9):
+        await _post(f"کیف {i}", i, type="found" if i % 3 == 0 else "lost", description="کیف " * (i + 1))
+
+    titles = await _all_pages(text="کیف", type="lost", sort=sort, limit=2)
+    assert sorted(titles) == sorted(f"کیف {i}" for i in range(9) if i % 3)
+    if sort == "newest":
+        assert titles == [f"کیف {i}" for i in (8, 7, 5, 4, 2, 1)]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [
+    {"sort": "relevance"},
+    {"created_from": "2024-02-01T00:00:00", "created_to": "2024-01-01T00:00:00"},
+    {"bbox": "1,2,3"},
+    {"cursor": "not-a-cursor"},
+])
+async def test_query_rejects_invalid_criteria(params):
+    response = await _query(**params)
+    assert response.status_code == 400
+
+def test_build_query_emits_one_filter():
+    query = PostQuery(
+        type="found", tag="t",
+        created_from=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        bbox=BoundingBox(51.0, 35.0, 52.0, 36.0),
+        sort="oldest",
+    )
+    mongo_filter, sort = MongoPostRepository.build_query(query)
+    assert mongo_filter["type"] == "found"
+    assert mongo_filter["tag"] == "t"
+    assert mongo_filter["created_at"] == {"$gte": datetime(2024, 1, 1)}
+    assert "$box" in mongo_filter["location.coordinates"]["$geoWithin"]
+    assert sort == [("created_at", 1), ("_id", 1)]
+
+# Every criterion /posts/query accepts, as build_query inputs.
+CRITERIA = {
+    "type": {"type": "lost"},
+    "category": {"category_key": "bags"},
+    "tag": {"tag": "t"},
+    "publisher": {"publisher_username": "u1"},
+    "range": {"created_from": datetime(2024, 1, 1), "created_to": datetime(2024, 2, 1)},
+    "bbox": {"bbox": BoundingBox(51.0, 35.0, 52.0, 36.0)},
+    "text": {"text": "کیف"},
+}
+# Combinations the clients send most; these must also avoid a blocking SORT.
+SORT_FREE = [(), ("type",), ("type", "category"), ("category",), ("tag",), ("publisher",), ("type", "range"), ("range",)]
+
+def _build(names, sort="newest"):
+    fields = {"sort": sort}
+    for name in names:
+        fields.update(CRITERIA[name])
+    query = PostQuery(**fields)
+    return MongoPostRepository.build_query(query, [str(ObjectId())] if query.text else None)
+
+def _plans(mongo_filter, sort):
+    """(index fields, sort_free) for each index the planner can scan instead of the collection."""
+    declared = [list(model.document["key"]) for model in PostDocument.Settings.indexes] + [["_id"]]
+    sort_keys = [name for name, _ in sort]
+    plans = []
+    for fields in declared:
+        leading = list(itertools.takewhile(lambda f: f != "created_at", fields))
+        sort_free = all(
+            f in mongo_filter and not isinstance(mongo_filter[f], dict) for f in leading
+        ) and fields[len(leading):] == sort_keys
+        if fields[0] in mongo_filter or sort_free:
+            plans.append((fields, sort_free))
+    return plans
+
+@pytest.mark.parametrize("sort", ["newest", "oldest"])
+def test_every_combination_has_an_index(sort):
+    for size in range(len(CRITERIA) + 1):
+        for names in itertools.combinations(CRITERIA, size):
+            assert _plans(*_build(names, sort)), f"{names} would scan the collection"
+
+@pytest.mark.parametrize("names", SORT_FREE)
+def test_common_combinations_need_no_sort_stage(names):
+    assert any(sort_free for _, sort_free in _plans(*_build(names)))
+
+def _stages(plan):
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from _stages(value)
+
+@pytest.mark.skipif(not MONGO_TEST_URI, reason="explain needs a real MongoDB (set MONGO_TEST_URI)")
+@pytest.mark.asyncio
+async def test_explain_has_no_collscan():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGO_TEST_URI)
+    db = client["lost_and_found_query_test"]
+    try:
+        await db.posts.drop()
+        await sync_indexes(db, [PostDocument])
+        await db.posts.insert_many([
+            {
+                "type": "lost", "title": f"p{i}", "category_key": "bags", "tag": "t",
+                "description": ".", "publisher_username": "u1",
+                "created_at": datetime(2024, 1, 1, 12, i),
+                "location": {"type": "Point", "coordinates": [51.5, 35.5]},
+            }
+            for i in range(20)
+        ])
+
+        for size in range(len(CRITERIA) + 1):
+            for names in itertools.combinations(CRITERIA, size):
+                mongo_filter, sort = _build(names)
+                plan = await db.posts.find(mongo_filter).sort(sort).explain()
+                assert "COLLSCAN" not in set(_stages(plan["queryPlanner"]["winningPlan"])), names
+    finally:
+        await client.drop_database("lost_and_found_query_test")
+        client.close()
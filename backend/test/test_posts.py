@@ -1,3 +1,4 @@
+import json
 import pytest
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
@@ -8,17 +9,20 @@ from unittest.mock import patch
 
 from src.main import app
 from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
 from src.infrastructure.database.models.user_document import UserDocument
 from src.infrastructure.security.auth_handler import AuthHandler
-from src.domain.entities.post import Post
+from src.domain.entities.post import Post, PostPage
+from src.infrastructure.search.search_index import search_index
 
 @pytest_asyncio.fixture(autouse=True)
 async def init_test_db():
     client = AsyncMongoMockClient()
     await init_beanie(
         database=client.test_db,
-        document_models=[PostDocument, UserDocument]
+        document_models=[PostDocument, UserDocument, PostMatchDocument]
     )
+    search_index.clear()
 
 @pytest_asyncio.fixture
 def mock_user_token():
@@ -140,8 +144,88 @@ async def test_search_posts_mocked():
         location={"type": "Point", "coordinates": [51.0, 35.0]}
     )
     with patch("src.infrastructure.repositories.mongo_post_repository.MongoPostRepository.search_in_title_and_description") as m:
-        m.return_value = [mock_post]
+        m.return_value = PostPage(items=[mock_post])
         async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
             response = await ac.get("/posts/search", params={"query": "سامسونگ"})
         assert response.status_code == 200
-        assert response.json()[0]["title"] == "گوشی سامسونگ"
\ No newline at end of file
+        assert response.json()[0]["title"] == "گوشی سامسونگ"
+
+@pytest.mark.asyncio
+async def test_get_all_posts_cursor_pagination():
+    for i in range(5):
+        await PostDocument(
+            type="lost", title=f"p{i}", category_key="c",
+            description=".", publisher_username="u1",
+            created_at=datetime(2024, 1, 1, 12, i, tzinfo=timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]}
+        ).insert()
+
+    titles = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/posts/all", params={"limit": 2})
+        titles += [p["title"] for p in response.json()]
+        while "x-next-cursor" in response.headers:
+            response = await ac.get("/posts/all", params={"limit": 2, "cursor": response.headers["x-next-cursor"]})
+            assert response.status_code == 200
+            titles += [p["title"] for p in response.json()]
+
+    assert titles == ["p4", "p3", "p2", "p1", "p0"]
+
+@pytest.mark.asyncio
+async def test_list_routes_without_paging_params_return_everything(monkeypatch):
+    from src.api.routes import post_routes
+    monkeypatch.setattr(post_routes, "DEFAULT_PAGE_SIZE", 2)
+    for i in range(5):
+        await PostDocument(
+            type="lost", title=f"p{i}", category_key="c",
+            description=".", publisher_username="u1",
+            created_at=datetime(2024, 1, 1, 12, i, tzinfo=timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]}
+        ).insert()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        for path in ["/posts/all", "/posts/category/c", "/posts/publisher/u1", "/posts/tag/t"]:
+            response = await ac.get(path)
+            assert len(response.json()) == 5, path
+            assert "x-next-cursor" not in response.headers, path
+
+        first = await ac.get("/posts/all", params={"limit": 4})
+        rest = await ac.get("/posts/all", params={"cursor": first.headers["x-next-cursor"]})
+    assert [p["title"] for p in rest.json()] == ["p0"]
+
+@pytest.mark.asyncio
+async def test_get_all_posts_invalid_cursor():
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/posts/all", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_all_posts_streamed_as_json_array():
+    for i in range(3):
+        await PostDocument(
+            type="lost", title=f"s{i}", category_key="c",
+            description=".", publisher_username="u1",
+            created_at=datetime(2024, 1, 1, 12, i, tzinfo=timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]}
+        ).insert()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/posts/all", params={"stream": "true", "limit": 1})
+    assert response.status_code == 200
+    assert [p["title"] for p in response.json()] == ["s2", "s1", "s0"]
+
+@pytest.mark.asyncio
+async def test_get_posts_by_category_streamed_as_ndjson():
+    for category_key in ("bags", "bags", "keys"):
+        await PostDocument(
+            type="found", title="x", category_key=category_key,
+            description=".", publisher_username="u1",
+            created_at=datetime.now(timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]}
+        ).insert()
+    headers = {"Accept": "application/x-ndjson"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/posts/category/bags", headers=headers)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert all(line["category_key"] == "bags" for line in lines)
@@ -0,0 +1,154 @@
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+
+from src.main import app
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.search.persian_text import normalize, tokenize
+from src.infrastructure.search.search_index import SearchIndex, search_index
+from src.infrastructure.search.suggest_index import SuggestIndex
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+    search_index.clear()
+
+async def make_post(title, description=".", tag="t", **overrides):
+    post = PostDocument(
+        type="lost", title=title, category_key="c", tag=tag,
+        description=description, publisher_username="u",
+        created_at=datetime.now(timezone.utc),
+        location={"type": "Point", "coordinates": [51.0, 35.0]},
+        **overrides,
+    )
+    await post.insert()
+    return post
+
+def test_normalize_unifies_arabic_forms_digits_and_zwnj():
+    assert normalize("كيف") == normalize("کیف")
+    assert normalize("کتاب‌ها") == normalize("کتابها")
+    assert normalize("۱۲۳") == normalize("١٢٣") == "123"
+    assert normalize("کِتاب") == "کتاب"
+    assert tokenize("کیف و کفش در دانشکده") == ["کیف", "کفش", "دانشکده"]
+
+def test_bm25_ranks_title_matches_and_rare_terms_first():
+    index = SearchIndex()
+    index.add("a", "کیف پول", "کیف مشکی در کتابخانه")
+    index.add("b", "گوشی", "داخل کیف بود")
+    index.add("c", "کلید", "سه کلید")
+
+    hits, total = index.search("كيف")
+    assert total == 2
+    assert [doc_id for doc_id, _ in hits] == ["a", "b"]
+
+    index.remove("a")
+    hits, total = index.search("کیف")
+    assert [doc_id for doc_id, _ in hits] == ["b"]
+    assert index.search("و")[1] == 0
+
+def test_top_k_pagination_is_stable():
+    index = SearchIndex()
+    for i in range(25):
+        index.add(f"{i:02d}", "کیف", "." * i)
+    everything, total = index.search("کیف")
+    pages = [index.search("کیف", offset=o, limit=10)[0] for o in (0, 10, 20)]
+    assert total == 25
+    assert [hit for page in pages for hit in page] == everything
+
+@pytest.mark.asyncio
+async def test_search_endpoint_tracks_writes_and_pages():
+    await make_post("کيف پول", "قهوه‌ای")
+    await make_post("گوشی", "کیف گوشی هم بود")
+    await make_post("کلید")
+
+    headers = {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'u'})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        first = await ac.get("/posts/search", params={"query": "کیف", "limit": 1})
+        second = await ac.get("/posts/search", params={"query": "کیف", "limit": 1, "cursor": first.headers["X-Next-Cursor"]})
+
+        created = await ac.post("/posts/add", headers=headers, json={
+            "type": "found", "title": "کیف مدارک", "category_key": "c", "tag": "کیف",
+            "description": "۲ کارت", "publisher_username": "u",
+            "location": {"type": "Point", "coordinates": [51.0, 35.0]},
+        })
+        new_id = created.json()["id"]
+        by_digit = await ac.get("/posts/search", params={"query": "2"})
+        await ac.delete(f"/posts/{new_id}", headers=headers)
+        after_delete = await ac.get("/posts/search", params={"query": "مدارک"})
+        bad = await ac.get("/posts/search", params={"query": "کیف", "cursor": "x"})
+
+    assert [p["title"] for p in first.json()] == ["کيف پول"]
+    assert [p["title"] for p in second.json()] == ["گوشی"]
+    assert "X-Next-Cursor" not in second.headers
+    assert [p["id"] for p in by_digit.json()] == [new_id]
+    assert after_delete.json() == []
+    assert bad.status_code == 400
+
+def test_suggest_completes_any_word_and_ranks_by_posts():
+    index = SuggestIndex()
+    index.add("1", "گوشی سامسونگ", "موبایل")
+    index.add("2", "گوشی سامسونگ", "موبایل")
+    index.add("3", "سوییچ ماشین", "سوییچ")
+    index.add("4", "کیف پول", None)
+
+    assert [(s.text, s.kind, s.count) for s in index.suggest("سام")] == [("گوشی سامسونگ", "title", 2)]
+    assert [s.text for s in index.suggest("سو")] == ["سوییچ", "سوییچ ماشین"]
+    assert [s.text for s in index.suggest("گوشی سا")] == ["گوشی سامسونگ"]
+    assert [s.text for s in index.suggest("كي")] == ["کیف پول"]
+
+    index.remove("1")
+    index.remove("2")
+    assert index.suggest("سام") == []
+
+def test_suggest_tolerates_a_typo_after_three_letters():
+    index = SuggestIndex()
+    index.add("1", "سوییچ ماشین", None)
+    index.add("2", "سوپ", None)
+
+    typo = index.suggest("سوییج")
+    assert [(s.text, s.distance) for s in typo] == [("سوییچ ماشین", 1)]
+    assert index.suggest("سی") == []
+
+def test_suggest_is_fast_on_a_large_index():
+    import time
+
+    index = SuggestIndex()
+    words = ["کیف", "کفش", "کتاب", "کلید", "کارت", "گوشی", "ساعت", "سوییچ", "عینک", "لپتاپ"]
+    for i in range(20_000):
+        index.add(str(i), f"{words[i % 10]} {words[(i // 10) % 10]} {i}", words[(i * 7) % 10])
+
+    prefixes = ("ک", "کی", "کیف", "کیف گ", "سوییج", "عینک")
+    for prefix in prefixes:
+        assert index.suggest(prefix)
+    # Node caches are warm now, as they are between writes in production.
+    start = time.perf_counter()
+    for prefix in prefixes:
+        index.suggest(prefix)
+    assert (time.perf_counter() - start) / len(prefixes) < 0.01
+
+@pytest.mark.asyncio
+async def test_suggest_endpoint_follows_post_writes():
+    await make_post("کیف پول", tag="کیف")
+
+    headers = {"Authorization": f"Bearer {AuthHandler.create_access_token({'sub': 'u'})}"}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        before = await ac.get("/posts/suggest", params={"prefix": "کي"})
+        created = await ac.post("/posts/add", headers=headers, json={
+            "type": "found", "title": "کیف مدارک", "category_key": "c", "tag": "کیف",
+            "description": ".", "publisher_username": "u",
+            "location": {"type": "Point", "coordinates": [51.0, 35.0]},
+        })
+        after = await ac.get("/posts/suggest", params={"prefix": "کی", "limit": 2})
+        empty = await ac.get("/posts/suggest", params={"prefix": ""})
+
+    assert created.status_code == 200
+    assert [s["text"] for s in before.json()] == ["کیف", "کیف پول"]
+    assert after.json()[0] == {"text": "کیف", "kind": "tag", "count": 2}
+    assert len(after.json()) == 2
+    assert empty.status_code == 422
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from src.main import app
+from src.infrastructure.cache.collection_versions import collection_versions
+from src.infrastructure.cache.single_flight import SingleFlight, single_flight
+from src.infrastructure.database.models.post_document import PostDocument
+from src.infrastructure.database.models.post_match_document import PostMatchDocument
+from src.infrastructure.map.map_snapshot import map_snapshot
+from src.infrastructure.repositories.mongo_post_repository import MongoPostRepository
+from src.infrastructure.security.auth_handler import AuthHandler
+
+@pytest_asyncio.fixture(autouse=True)
+async def init_test_db():
+    client = AsyncMongoMockClient()
+    await init_beanie(database=client.test_db, document_models=[PostDocument, PostMatchDocument])
+    single_flight.clear()
+    map_snapshot.clear()
+    for i in range(3):
+        await PostDocument(
+            type="lost", title=f"p{i}", category_key="c", description=".",
+            publisher_username="u1", created_at=datetime(2024, 1, 1, 12, i, tzinfo=timezone.utc), tag="t",
+            location={"type": "Point", "coordinates": [51.0, 35.0]},
+        ).insert()
+
+def slowed(method):
+    """Wraps a repository method so calls overlap long enough to coalesce."""
+    calls = []
+
+    async def wrapper(self, *args, **kwargs):
+        calls.append(args)
+        await asyncio.sleep(0.05)
+        return await method(self, *args, **kwargs)
+
+    return wrapper, calls
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    runs = []
+
+    async def load():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": 3}
+
+    results = await asyncio.gather(*(flight.do("k", load) for _ in range(5)))
+    again = await flight.do("k", load)
+
+    assert len(runs) == 2 and results[0] is results[4] and again == {"rows": 3}
+    assert flight.stats() == [{"key": "k", "flights": 2, "callers": 6, "merged": 4}]
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flight = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("k", load))
+    second = asyncio.ensure_future(flight.do("k", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "done"
+
+@pytest.mark.asyncio
+async def test_identical_post_pages_share_query_and_rendering():
+    wrapper, calls = slowed(MongoPostRepository._query_page)
+    with patch.object(MongoPostRepository, "_query_page", wrapper):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            responses = await asyncio.gather(*(ac.get("/posts/all", params={"limit": 2}) for _ in range(10)))
+            stats = (await ac.get("/metrics/coalescing")).json()
+
+    assert len(calls) == 1
+    assert all(r.json() == responses[0].json() for r in responses)
+    assert all(r.headers["x-next-cursor"] == responses[0].headers["x-next-cursor"] for r in responses)
+    version = f"{collection_versions.version('posts')}.{collection_versions.version('categories')}"
+    assert {"key": f"posts.all v={version} limit=2 cursor=None", "flights": 1, "callers": 10, "merged": 9} in stats
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/posts/all", "/posts/query"])
+async def test_read_after_write_does_not_join_an_older_flight(path):
+    wrapper, calls = slowed(MongoPostRepository._query_page)
+    token = AuthHandler.create_access_token({"sub": "u1"})
+    with patch.object(MongoPostRepository, "_query_page", wrapper):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            before = asyncio.ensure_future(ac.get(path))
+            await asyncio.sleep(0.01)
+            created = await ac.post("/posts/add", headers={"Authorization": f"Bearer {token}"}, json={
+                "type": "found", "title": "written", "category_key": "c", "tag": "t",
+                "description": "written mid-read", "publisher_username": "u1",
+                "location": {"type": "Point", "coordinates": [51.0, 35.0]},
+            })
+            after = await ac.get(path)
+            revalidated = await ac.get(path, headers={"If-None-Match": after.headers["etag"]})
+            await before
+
+    assert created.status_code == 200
+    assert len(calls) == 2
+    assert "written" in [p["title"] for p in after.json()]
+    assert revalidated.status_code == 304
+
+@pytest.mark.asyncio
+async def test_concurrent_first_map_requests_share_one_snapshot_load():
+    wrapper, calls = slowed(MongoPostRepository._fetch_map_rows)
+    with patch.object(MongoPostRepository, "_fetch_map_rows", wrapper):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            responses = await asyncio.gather(*(ac.get("/lostAndFoundItems") for _ in range(10)))
+
+    assert len(calls) == 1
+    assert all(len(r.json()) == 3 for r in responses)